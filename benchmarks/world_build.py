@@ -0,0 +1,80 @@
+"""Benchmark of worlds construction time for growing numbers of transformations.
+
+Transformations are randomly generated over a fixed pool of items and zones,
+so that construction time should grow linearly with the number of transformations.
+
+Usage:
+    python benchmarks/world_build.py --sizes 1000 10000 100000
+
+"""
+
+import argparse
+import random
+import time
+from typing import List
+
+from hcraft.elements import Item, Zone
+from hcraft.transformation import PLAYER, CURRENT_ZONE, Transformation, Use, Yield
+from hcraft.world import world_from_transformations
+
+
+def random_transformations(
+    n_transformations: int, n_items: int = 100, n_zones: int = 10, seed: int = 0
+) -> List[Transformation]:
+    """Random transformations over a fixed pool of items and zones."""
+    rng = random.Random(seed)
+    items = [Item(f"item_{index}") for index in range(n_items)]
+    zones = [Zone(f"zone_{index}") for index in range(n_zones)]
+
+    # A chain of transformations makes sure every item and zone is reachable.
+    transformations = [
+        Transformation(
+            inventory_changes=[Use(PLAYER, items[index - 1]), Yield(PLAYER, item)]
+        )
+        for index, item in enumerate(items)
+        if index > 0
+    ]
+    transformations.append(Transformation(inventory_changes=[Yield(PLAYER, items[0])]))
+    transformations += [Transformation(destination=zone) for zone in zones]
+
+    while len(transformations) < n_transformations:
+        # The first item is the only one obtained from nothing.
+        consumed, produced = rng.sample(items[1:], 2)
+        transformations.append(
+            Transformation(
+                inventory_changes=[
+                    Use(PLAYER, consumed, consume=rng.randint(1, 3)),
+                    Yield(PLAYER, produced),
+                    Yield(CURRENT_ZONE, consumed),
+                ],
+                zone=rng.choice(zones + [None]),
+            )
+        )
+    return transformations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000]
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'transformations':>15} {'create (s)':>11} {'world (s)':>10} {'µs/transfo':>11}"
+    )
+    for size in args.sizes:
+        start = time.perf_counter()
+        transformations = random_transformations(size)
+        created = time.perf_counter()
+        world_from_transformations(transformations, start_zone=Zone("zone_0"))
+        built = time.perf_counter()
+        per_transformation = 1e6 * (built - start) / size
+        print(
+            f"{size:>15} {created - start:>11.3f} {built - created:>10.3f}"
+            f" {per_transformation:>11.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
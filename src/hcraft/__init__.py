@@ -37,23 +37,27 @@ See [`hcraft.requirements`](https://irll.github.io/HierarchyCraft/hcraft/require
 
 """
 
+import importlib
+from typing import TYPE_CHECKING
+
 import hcraft.state as state
-import hcraft.solving_behaviors as solving_behaviors
-import hcraft.purpose as purpose
 import hcraft.transformation as transformation
-import hcraft.requirements as requirements
-import hcraft.env as env
-import hcraft.examples as examples
-import hcraft.world as world
-import hcraft.planning as planning
-
 from hcraft.elements import Item, Stack, Zone
-from hcraft.transformation import Transformation
-from hcraft.env import HcraftEnv, HcraftState
-from hcraft.purpose import Purpose
-from hcraft.render.human import get_human_action, render_env_with_human
+from hcraft.state import HcraftState
 from hcraft.task import GetItemTask, GoToZoneTask, PlaceItemTask
+from hcraft.transformation import Transformation
 
+if TYPE_CHECKING:
+    import hcraft.env as env
+    import hcraft.examples as examples
+    import hcraft.planning as planning
+    import hcraft.purpose as purpose
+    import hcraft.requirements as requirements
+    import hcraft.solving_behaviors as solving_behaviors
+    import hcraft.world as world
+    from hcraft.env import HcraftEnv
+    from hcraft.purpose import Purpose
+    from hcraft.render.human import get_human_action, render_env_with_human
 
 __all__ = [
     "HcraftState",
@@ -78,3 +82,36 @@ __all__ = [
     "planning",
     "examples",
 ]
+
+# Subsystems relying on slow to import libraries (networkx, matplotlib, hebg, pygame, ...)
+# and examples are only imported when first accessed.
+_LAZY_SUBMODULES = {
+    "env",
+    "examples",
+    "planning",
+    "purpose",
+    "requirements",
+    "solving_behaviors",
+    "world",
+}
+_LAZY_ATTRIBUTES = {
+    "HcraftEnv": "hcraft.env",
+    "Purpose": "hcraft.purpose",
+    "get_human_action": "hcraft.render.human",
+    "render_env_with_human": "hcraft.render.human",
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_SUBMODULES:
+        return importlib.import_module(f"hcraft.{name}")
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module 'hcraft' has no attribute '{name}'")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
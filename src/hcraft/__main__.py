@@ -1,9 +1,36 @@
-from hcraft.cli import hcraft_cli
-from hcraft.render.human import render_env_with_human
+import sys
+
+from hcraft.cli import hcraft_cli, hcraft_serve_cli
 
 
 def main():
     """Run hcraftommand line interface."""
+    if sys.argv[1:2] == ["serve"]:
+        server = hcraft_serve_cli(sys.argv[2:])
+        print(f"Serving {server.env.num_envs} environments on {server.socket_path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        return
+    if sys.argv[1:2] == ["dataset"]:
+        # pylint: disable=import-outside-toplevel
+        from hcraft.dataset import hcraft_dataset_cli
+
+        manifest = hcraft_dataset_cli(sys.argv[2:])
+        stored = [entry for entry in manifest if "shard" in entry]
+        successes = sum(entry["success"] for entry in stored)
+        print(
+            f"{len(manifest)} episodes in the manifest, {len(stored)} stored"
+            f" of which {successes} successful."
+        )
+        return
+
+    # pylint: disable=import-outside-toplevel
+    from hcraft.render.human import render_env_with_human
+
     env = hcraft_cli()
     render_env_with_human(env)
 
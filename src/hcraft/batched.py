@@ -0,0 +1,993 @@
+"""# Batched environments
+
+Simulate many independent copies of the same HierarchyCraft environment at once
+with vectorized NumPy operations instead of one Python loop per environment.
+
+All transformations of a world are compiled into stacked arrays
+(see `CompiledTransformations`) so that legal actions of every environment
+and their effects can be computed for the whole batch in a few array operations.
+
+The batched state (see `BatchedHcraftState`) holds the same arrays as `hcraft.state.HcraftState`
+with a leading batch dimension, and can be built on top of preallocated buffers
+(for example in shared memory, see `hcraft.vector`).
+
+## Example
+
+```python
+from hcraft.batched import BatchedHcraftEnv
+from hcraft.examples import MineHcraftEnv
+
+env = BatchedHcraftEnv(MineHcraftEnv(max_step=50), num_envs=1024)
+observations, infos = env.reset(seed=42)
+for _ in range(100):
+    actions = env.sample_legal_actions()
+    observations, rewards, terminated, truncated, infos = env.step(actions)
+```
+
+Done environments are automaticaly reset at the end of the step,
+their last observation being given in `infos["final_obs"]` for rows flagged in `infos["_final_obs"]`.
+
+Only purposes made of `hcraft.task.AchievementTask` can be batched.
+
+## Successors
+
+Search algorithms can get all successors of states without stepping environments:
+`CompiledTransformations.expand` gives the legal actions of a state with the states they lead to,
+and `CompiledTransformations.expand_frontier` does the same for a whole batch of states at once.
+
+```python
+from hcraft.batched import CompiledTransformations
+
+compiled = CompiledTransformations(env.world)
+successors = compiled.expand(env.state)
+for action, inventory in zip(successors.actions, successors.player_inventory):
+    ...
+```
+
+## Multithreading
+
+Most of the time of large batches is spent in NumPy kernels that release the GIL.
+Giving `num_threads` splits the environments in as many chunks stepped concurrently
+on a thread pool, using multiple cores without the cost of process-based vector environments:
+
+```python
+env = BatchedHcraftEnv(MineHcraftEnv(max_step=50), num_envs=4096, num_threads=4)
+```
+
+Environments being deterministic, results do not depend on the number of threads.
+
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+import numpy as np
+
+from hcraft.env import LegalActionsInfo
+from hcraft.state import HcraftState
+from hcraft.task import AchievementTask
+from hcraft.transformation import InventoryOperation, InventoryOwner
+
+if TYPE_CHECKING:
+    from hcraft.env import HcraftEnv
+    from hcraft.world import World
+
+
+INVENTORY_DTYPE = np.int32
+NO_MIN = np.iinfo(INVENTORY_DTYPE).min
+"""Minimum of transformations without minimum constraint on an item."""
+NO_MAX = np.iinfo(INVENTORY_DTYPE).max
+"""Maximum of transformations without maximum constraint on an item."""
+MAX_BLOCK_SIZE = 2**22
+"""Maximum number of elements of intermediate arrays when computing actions masks."""
+
+
+class Successors(NamedTuple):
+    """Successors of a batch of states, one for each of their legal actions.
+
+    Successors are grouped by parent state, in increasing order of actions.
+    """
+
+    parents: np.ndarray
+    """Index of the expanded state each successor comes from, of shape (M,)."""
+    actions: np.ndarray
+    """Transformation applied to get each successor, of shape (M,)."""
+    player_inventory: np.ndarray
+    """Players inventories of the successors, of shape (M, n_items)."""
+    position: np.ndarray
+    """One-hot encoded players positions of the successors, of shape (M, n_zones)."""
+    zones_inventories: np.ndarray
+    """Zones inventories of the successors, of shape (M, n_zones, n_zones_items)."""
+
+
+class CompiledTransformations:
+    """Array operations of all the transformations of a world stacked together.
+
+    Arrays have the transformations as first dimension.
+    Missing constraints are represented by the smallest (for minimums)
+    or largest (for maximums) value of the inventories dtype.
+    """
+
+    def __init__(self, world: "World") -> None:
+        """
+        Args:
+            world: Built world to compile the transformations of.
+        """
+        n_transfo = len(world.transformations)
+        n_items, n_zones, n_zones_items = (
+            world.n_items,
+            world.n_zones,
+            world.n_zones_items,
+        )
+
+        self.zone = np.full(n_transfo, -1, dtype=np.int64)
+        """Slot of the zone each transformation is restricted to, -1 if unrestricted."""
+        self.destination = np.full(n_transfo, -1, dtype=np.int64)
+        """Slot of the destination of each transformation, -1 if none."""
+
+        self.player_min = np.full((n_transfo, n_items), NO_MIN, INVENTORY_DTYPE)
+        self.player_max = np.full((n_transfo, n_items), NO_MAX, INVENTORY_DTYPE)
+        self.player_apply = np.zeros((n_transfo, n_items), INVENTORY_DTYPE)
+
+        zones_items_shape = (n_transfo, n_zones_items)
+        self.current_min = np.full(zones_items_shape, NO_MIN, INVENTORY_DTYPE)
+        self.current_max = np.full(zones_items_shape, NO_MAX, INVENTORY_DTYPE)
+        self.current_apply = np.zeros(zones_items_shape, INVENTORY_DTYPE)
+
+        self.destination_min = np.full(zones_items_shape, NO_MIN, INVENTORY_DTYPE)
+        self.destination_max = np.full(zones_items_shape, NO_MAX, INVENTORY_DTYPE)
+        self.destination_apply = np.zeros(zones_items_shape, INVENTORY_DTYPE)
+
+        # Operations on specific zones are rare and heavy,
+        # so they are only stored for the transformations having some.
+        zones_transfo = [
+            index
+            for index, transfo in enumerate(world.transformations)
+            if InventoryOwner.ZONES in transfo._inventory_operations
+        ]
+        self.zones_transformations = np.array(zones_transfo, dtype=np.int64)
+        """Indexes of the transformations with operations on specific zones."""
+        zones_shape = (len(zones_transfo), n_zones, n_zones_items)
+        self.zones_min = np.full(zones_shape, NO_MIN, INVENTORY_DTYPE)
+        self.zones_max = np.full(zones_shape, NO_MAX, INVENTORY_DTYPE)
+        self.zones_apply = np.zeros(zones_shape, INVENTORY_DTYPE)
+        self.zones_slot = np.full(n_transfo, -1, dtype=np.int64)
+        """Index of each transformation in the zones operations arrays, -1 if none."""
+        self.zones_slot[self.zones_transformations] = np.arange(len(zones_transfo))
+
+        for index, transfo in enumerate(world.transformations):
+            self._compile(index, transfo)
+
+        self.n_transformations = n_transfo
+        self.check_zones = n_zones * n_zones_items > 0
+
+    def _compile(self, index: int, transfo) -> None:
+        if transfo._zone is not None:
+            self.zone[index] = np.flatnonzero(transfo._zone)[0]
+        if transfo._destination is not None:
+            self.destination[index] = np.flatnonzero(transfo._destination)[0]
+
+        owners_arrays = {
+            InventoryOwner.PLAYER: (
+                self.player_min,
+                self.player_max,
+                self.player_apply,
+            ),
+            InventoryOwner.CURRENT: (
+                self.current_min,
+                self.current_max,
+                self.current_apply,
+            ),
+            InventoryOwner.ZONES: (self.zones_min, self.zones_max, self.zones_apply),
+        }
+        if transfo._destination is not None:
+            owners_arrays[InventoryOwner.DESTINATION] = (
+                self.destination_min,
+                self.destination_max,
+                self.destination_apply,
+            )
+
+        for owner, operations in transfo._inventory_operations.items():
+            if owner not in owners_arrays:
+                continue
+            arrays_index = index
+            if owner is InventoryOwner.ZONES:
+                arrays_index = self.zones_slot[index]
+            min_arr, max_arr, apply_arr = owners_arrays[owner]
+            if operations.get(InventoryOperation.MIN) is not None:
+                min_arr[arrays_index] = operations[InventoryOperation.MIN]
+            if operations.get(InventoryOperation.MAX) is not None:
+                max_op = operations[InventoryOperation.MAX]
+                max_arr[arrays_index] = np.where(np.isinf(max_op), NO_MAX, max_op)
+            if operations.get(InventoryOperation.APPLY) is not None:
+                apply_arr[arrays_index] = operations[InventoryOperation.APPLY]
+
+    def action_masks(
+        self,
+        player_inventory: np.ndarray,
+        position_slots: np.ndarray,
+        zones_inventories: np.ndarray,
+    ) -> np.ndarray:
+        """Boolean masks of valid transformations for a batch of states.
+
+        Args:
+            player_inventory: Players inventories of shape (N, n_items).
+            position_slots: Slots of the players positions of shape (N,), -1 if no zone.
+            zones_inventories: Zones inventories of shape (N, n_zones, n_zones_items).
+
+        Returns:
+            Boolean array of shape (N, n_transformations).
+        """
+        n_envs = player_inventory.shape[0]
+        masks = np.empty((n_envs, self.n_transformations), dtype=bool)
+        width = max(player_inventory.shape[1], zones_inventories.shape[-1], 1)
+        block = max(1, MAX_BLOCK_SIZE // max(1, n_envs * width))
+        for start in range(0, self.n_transformations, block):
+            transfo = slice(start, start + block)
+            masks[:, transfo] = self._block_masks(
+                transfo, player_inventory, position_slots, zones_inventories
+            )
+        if self.check_zones and self.zones_transformations.size > 0:
+            self._zones_masks(masks, zones_inventories)
+        return masks
+
+    def actions_validity(
+        self,
+        player_inventory: np.ndarray,
+        position_slots: np.ndarray,
+        zones_inventories: np.ndarray,
+        actions: np.ndarray,
+    ) -> np.ndarray:
+        """Whether a single given transformation is valid in each state of a batch.
+
+        Much cheaper than `action_masks` when only one action per state matters.
+
+        Args:
+            player_inventory: Players inventories of shape (N, n_items).
+            position_slots: Slots of the players positions of shape (N,), -1 if no zone.
+            zones_inventories: Zones inventories of shape (N, n_zones, n_zones_items).
+            actions: Index of the transformation to check in each state, of shape (N,).
+
+        Returns:
+            Boolean array of shape (N,).
+        """
+        zone = self.zone[actions]
+        destination = self.destination[actions]
+        valid = (zone < 0) | (zone == position_slots)
+        valid &= (destination < 0) | (destination != position_slots)
+        valid &= np.all(player_inventory >= self.player_min[actions], axis=-1)
+        valid &= np.all(player_inventory <= self.player_max[actions], axis=-1)
+        if not self.check_zones:
+            return valid
+
+        valid &= np.all(zones_inventories >= 0, axis=(1, 2))
+        env_indexes = np.arange(zones_inventories.shape[0])
+        current_inventory = zones_inventories[env_indexes, position_slots]
+        valid &= np.all(current_inventory >= self.current_min[actions], axis=-1)
+        valid &= np.all(current_inventory <= self.current_max[actions], axis=-1)
+        destination_inventory = zones_inventories[
+            env_indexes, np.maximum(destination, 0)
+        ]
+        valid &= np.all(destination_inventory >= self.destination_min[actions], axis=-1)
+        valid &= np.all(destination_inventory <= self.destination_max[actions], axis=-1)
+
+        zones_slot = self.zones_slot[actions]
+        with_zones_ops = np.flatnonzero(zones_slot >= 0)
+        if with_zones_ops.size > 0:
+            zones_inventories = zones_inventories[with_zones_ops]
+            zones_slot = zones_slot[with_zones_ops]
+            valid[with_zones_ops] &= np.all(
+                zones_inventories >= self.zones_min[zones_slot], axis=(1, 2)
+            )
+            valid[with_zones_ops] &= np.all(
+                zones_inventories <= self.zones_max[zones_slot], axis=(1, 2)
+            )
+        return valid
+
+    def expand(self, state: HcraftState) -> Successors:
+        """Legal actions of a state and the states they lead to.
+
+        Args:
+            state: State to expand, left unchanged.
+
+        Returns:
+            Successors of the state, stacked in the order of their actions.
+        """
+        return self.expand_frontier(
+            np.asarray(state.player_inventory, dtype=INVENTORY_DTYPE)[np.newaxis],
+            np.asarray(state.position, dtype=INVENTORY_DTYPE)[np.newaxis],
+            np.asarray(state.zones_inventories, dtype=INVENTORY_DTYPE)[np.newaxis],
+        )
+
+    def expand_frontier(
+        self,
+        player_inventory: np.ndarray,
+        position: np.ndarray,
+        zones_inventories: np.ndarray,
+        masks: Optional[np.ndarray] = None,
+    ) -> Successors:
+        """Legal actions of each state of a batch and the states they lead to.
+
+        Successors of all states are computed together: legal actions come from
+        one `action_masks` call and are all applied at once on copies of their states.
+
+        Args:
+            player_inventory: Players inventories of shape (N, n_items).
+            position: One-hot encoded players positions of shape (N, n_zones).
+            zones_inventories: Zones inventories of shape (N, n_zones, n_zones_items).
+            masks: Legal actions masks of the states if already known.
+
+        Returns:
+            Successors of the states, the given arrays being left unchanged.
+        """
+        if masks is None:
+            masks = self.action_masks(
+                player_inventory, _position_slots(position), zones_inventories
+            )
+        parents, actions = np.nonzero(masks)
+        player_inventory = player_inventory[parents]
+        position = position[parents]
+        zones_inventories = zones_inventories[parents]
+        self.apply(
+            player_inventory,
+            position,
+            zones_inventories,
+            np.arange(actions.size),
+            actions,
+        )
+        return Successors(
+            parents, actions, player_inventory, position, zones_inventories
+        )
+
+    def _block_masks(
+        self,
+        transfo: slice,
+        player_inventory: np.ndarray,
+        position_slots: np.ndarray,
+        zones_inventories: np.ndarray,
+    ) -> np.ndarray:
+        position_slots = position_slots[:, np.newaxis]
+        zone = self.zone[np.newaxis, transfo]
+        destination = self.destination[np.newaxis, transfo]
+        masks = (zone < 0) | (zone == position_slots)
+        masks &= (destination < 0) | (destination != position_slots)
+
+        player_inventory = player_inventory[:, np.newaxis, :]
+        masks &= np.all(player_inventory >= self.player_min[transfo], axis=-1)
+        masks &= np.all(player_inventory <= self.player_max[transfo], axis=-1)
+        if not self.check_zones:
+            return masks
+
+        masks &= np.all(zones_inventories >= 0, axis=(1, 2))[:, np.newaxis]
+
+        env_indexes = np.arange(zones_inventories.shape[0])
+        current_inventory = zones_inventories[env_indexes, position_slots[:, 0]]
+        current_inventory = current_inventory[:, np.newaxis, :]
+        masks &= np.all(current_inventory >= self.current_min[transfo], axis=-1)
+        masks &= np.all(current_inventory <= self.current_max[transfo], axis=-1)
+
+        destination_inventory = zones_inventories[:, np.maximum(destination[0], 0)]
+        masks &= np.all(destination_inventory >= self.destination_min[transfo], axis=-1)
+        masks &= np.all(destination_inventory <= self.destination_max[transfo], axis=-1)
+        return masks
+
+    def _zones_masks(self, masks: np.ndarray, zones_inventories: np.ndarray) -> None:
+        zones_inventories = zones_inventories[:, np.newaxis]
+        valid = np.all(zones_inventories >= self.zones_min, axis=(-2, -1))
+        valid &= np.all(zones_inventories <= self.zones_max, axis=(-2, -1))
+        masks[:, self.zones_transformations] &= valid
+
+    def apply(
+        self,
+        player_inventory: np.ndarray,
+        position: np.ndarray,
+        zones_inventories: np.ndarray,
+        envs: np.ndarray,
+        actions: np.ndarray,
+    ) -> None:
+        """Apply the given transformations in place on the given environments.
+
+        Transformations are expected to be valid.
+
+        Args:
+            player_inventory: Players inventories of shape (N, n_items).
+            position: One-hot encoded players positions of shape (N, n_zones).
+            zones_inventories: Zones inventories of shape (N, n_zones, n_zones_items).
+            envs: Indexes of the environments to apply transformations on.
+            actions: Index of the transformation to apply for each of the envs.
+        """
+        player_inventory[envs] += self.player_apply[actions]
+        if position.shape[1] == 0:
+            return
+
+        position_slots = np.argmax(position[envs], axis=1)
+        zones_inventories[envs, position_slots] += self.current_apply[actions]
+
+        destination = self.destination[actions]
+        moving = destination >= 0
+        moving_envs, destination = envs[moving], destination[moving]
+        zones_inventories[moving_envs, destination] += self.destination_apply[
+            actions[moving]
+        ]
+
+        zones_slot = self.zones_slot[actions]
+        with_zones_ops = zones_slot >= 0
+        zones_inventories[envs[with_zones_ops]] += self.zones_apply[
+            zones_slot[with_zones_ops]
+        ]
+
+        position[moving_envs] = 0
+        position[moving_envs, destination] = 1
+
+
+class BatchedHcraftState:
+    """Batch of independent HierarchyCraft states of the same world.
+
+    Arrays are the same as in `hcraft.state.HcraftState` with a leading batch dimension:
+    * The players inventories: `state.player_inventory`
+    * The one-hot encoded players positions: `state.position`
+    * All zones inventories of each environment: `state.zones_inventories`
+
+    Discoveries are not tracked.
+    """
+
+    def __init__(
+        self,
+        world: "World",
+        num_envs: int,
+        buffers: Optional[Mapping[str, np.ndarray]] = None,
+        compiled: Optional[CompiledTransformations] = None,
+    ) -> None:
+        """
+        Args:
+            world: World to build the states for.
+            num_envs: Number of states in the batch.
+            buffers: Preallocated arrays to hold the state,
+                by name ('player_inventory', 'position' and 'zones_inventories').
+                Missing arrays are allocated. Defaults to None.
+            compiled: Already compiled transformations of the world to share.
+                Defaults to None, hence compiled from the world.
+        """
+        self.world = world
+        self.num_envs = num_envs
+        self.compiled = (
+            compiled if compiled is not None else CompiledTransformations(world)
+        )
+        shapes = state_shapes(world, num_envs)
+        buffers = allocate_buffers(
+            {name: (shape, INVENTORY_DTYPE) for name, shape in shapes.items()}, buffers
+        )
+        self.player_inventory: np.ndarray = buffers["player_inventory"]
+        self.position: np.ndarray = buffers["position"]
+        self.zones_inventories: np.ndarray = buffers["zones_inventories"]
+
+        self._start_player_inventory, self._start_position, self._start_zones = (
+            start_arrays(world)
+        )
+        self.reset()
+
+    @property
+    def position_slots(self) -> np.ndarray:
+        """Slot of the zone where each player is, -1 if there is no zone."""
+        if self.position.shape[1] == 0:
+            return np.full(self.num_envs, -1, dtype=np.int64)
+        return np.argmax(self.position, axis=1)
+
+    @property
+    def current_zone_inventory(self) -> np.ndarray:
+        """Inventory of the zone where each player is."""
+        if self.position.shape[1] == 0:
+            return np.zeros((self.num_envs, 0), dtype=INVENTORY_DTYPE)
+        env_indexes = np.arange(self.num_envs)
+        return self.zones_inventories[env_indexes, self.position_slots]
+
+    @property
+    def observation(self) -> np.ndarray:
+        """Observations of all players, see `hcraft.state.HcraftState.observation`."""
+        return np.concatenate(
+            (self.player_inventory, self.position, self.current_zone_inventory),
+            axis=1,
+        )
+
+    def write_observation(self, out: np.ndarray) -> np.ndarray:
+        """Write observations of all players in the given array."""
+        n_items, n_zones = self.world.n_items, self.world.n_zones
+        out[:, :n_items] = self.player_inventory
+        out[:, n_items : n_items + n_zones] = self.position
+        out[:, n_items + n_zones :] = self.current_zone_inventory
+        return out
+
+    def action_masks(self) -> np.ndarray:
+        """Boolean masks of valid actions of shape (N, n_transformations)."""
+        return self.compiled.action_masks(
+            self.player_inventory, self.position_slots, self.zones_inventories
+        )
+
+    def expand(self) -> Successors:
+        """Successors of every state of the batch, see `CompiledTransformations.expand_frontier`."""
+        return self.compiled.expand_frontier(
+            self.player_inventory, self.position, self.zones_inventories
+        )
+
+    def apply(
+        self, actions: np.ndarray, masks: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Apply the given actions to update each state of the batch.
+
+        Args:
+            actions: Index of the transformation to apply in each state, of shape (N,).
+            masks: Legal actions masks of the current states if already known.
+
+        Returns:
+            Boolean array of shape (N,), True where the transformation was applied.
+        """
+        actions = np.asarray(actions, dtype=np.int64).reshape(self.num_envs)
+        if np.any((actions < 0) | (actions >= self.compiled.n_transformations)):
+            raise ValueError(f"Actions out of the action space: {actions}")
+        if masks is None:
+            masks = self.action_masks()
+        success = masks[np.arange(self.num_envs), actions]
+        envs = np.flatnonzero(success)
+        self.compiled.apply(
+            self.player_inventory,
+            self.position,
+            self.zones_inventories,
+            envs,
+            actions[envs],
+        )
+        return success
+
+    def reset(self, envs: Optional[np.ndarray] = None) -> None:
+        """Reset the given states (all if None) to the world initial state."""
+        if envs is None:
+            envs = slice(None)
+        self.player_inventory[envs] = self._start_player_inventory
+        self.position[envs] = self._start_position
+        self.zones_inventories[envs] = self._start_zones
+
+    def __getitem__(self, index: int) -> "HcraftState":
+        """Copy of the state at the given index of the batch as an HcraftState."""
+        state = HcraftState(self.world)
+        state.player_inventory[...] = self.player_inventory[index]
+        state.position[...] = self.position[index]
+        state.zones_inventories[...] = self.zones_inventories[index]
+        state._update_discoveries()
+        return state
+
+    def __len__(self) -> int:
+        return self.num_envs
+
+
+class BaseBatchedHcraftEnv:
+    """Resets, steps and infos shared by batches of HierarchyCraft environments.
+
+    Subclasses build the batched `state` and the `buffers` it is written in,
+    and give the rewards and maximum steps of each environment
+    as `_timestep_rewards`, `_invalid_rewards` and `_max_steps`
+    (either one value for all environments or one per environment).
+    Achieved tasks and terminated purposes are given by
+    `_tasks_terminal`, `_tasks_rewards_of` and `_purpose_terminated`.
+    """
+
+    def __init__(
+        self,
+        num_envs: int,
+        autoreset: bool,
+        legal_actions_info: LegalActionsInfo,
+        buffers: Dict[str, np.ndarray],
+    ) -> None:
+        """
+        Args:
+            num_envs: Number of environments in the batch.
+            autoreset: If True, reset done environments at the end of each step.
+            legal_actions_info: Which infos about legal actions to give.
+            buffers: Arrays by name, as given by `batched_buffers_shapes`.
+        """
+        self.num_envs = num_envs
+        self.autoreset = autoreset
+        self.legal_actions_info = legal_actions_info
+        self.np_random = np.random.default_rng()
+        self.buffers = buffers
+        self.tasks_terminated = buffers["tasks_terminated"]
+        """Which tasks are terminated in each environment."""
+        self.current_step = buffers["current_step"]
+        """Steps done in the current episode of each environment."""
+        self.valid = buffers["valid"]
+        """Whether the last action of each environment was valid."""
+        self._masks: Optional[np.ndarray] = None
+
+    def reset(
+        self, *, seed: Optional[int] = None, envs: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, dict]:
+        """Reset the given environments (all if None).
+
+        Returns:
+            Observations of shape (N, observation_size) and infos.
+        """
+        if seed is not None:
+            self.np_random = np.random.default_rng(seed)
+        self._reset(envs)
+        self.state.write_observation(self.buffers["observation"])
+        return self.buffers["observation"], self._infos()
+
+    def _reset(self, envs: Optional[np.ndarray]) -> None:
+        rows = slice(None) if envs is None else envs
+        self.state.reset(envs)
+        self.tasks_terminated[rows] = False
+        self.current_step[rows] = 0
+        self._masks = None
+
+    def step(
+        self, actions: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, dict]:
+        """Perform one step in every environment given the index of their transformation.
+
+        Returns:
+            observations, rewards, terminated, truncated and infos of every environment.
+        """
+        actions = np.asarray(actions, dtype=np.int64).reshape(self.num_envs)
+        infos = self._step(actions)
+        infos.update(self._infos())
+        buffers = self.buffers
+        return (
+            buffers["observation"],
+            buffers["rewards"],
+            buffers["terminated"],
+            buffers["truncated"],
+            infos,
+        )
+
+    def _step(self, actions: np.ndarray) -> dict:
+        buffers = self.buffers
+        rewards, terminated, truncated = (
+            buffers["rewards"],
+            buffers["terminated"],
+            buffers["truncated"],
+        )
+
+        self.current_step += 1
+        success = self.state.apply(actions, masks=self.action_masks())
+        self._masks = None
+        self.valid[:] = success
+
+        tasks_terminal = self._tasks_terminal()
+        newly_terminated = tasks_terminal & ~self.tasks_terminated
+        rewards[:] = np.where(
+            success,
+            self._timestep_rewards + self._tasks_rewards_of(newly_terminated),
+            self._invalid_rewards,
+        )
+        self.tasks_terminated |= tasks_terminal
+        terminated[:] = self._purpose_terminated()
+        truncated[:] = self.current_step >= self._max_steps
+
+        infos = {}
+        if self.autoreset:
+            done = terminated | truncated
+            if np.any(done):
+                infos["final_obs"] = self.state.observation
+                infos["_final_obs"] = done.copy()
+                self._reset(np.flatnonzero(done))
+
+        self.state.write_observation(buffers["observation"])
+        return infos
+
+    def action_masks(self) -> np.ndarray:
+        """Boolean masks of valid actions of shape (N, n_transformations)."""
+        if self._masks is None:
+            self.buffers["action_masks"][...] = self.state.action_masks()
+            self._masks = self.buffers["action_masks"]
+        return self._masks
+
+    def sample_legal_actions(
+        self, rng: Optional[np.random.Generator] = None
+    ) -> np.ndarray:
+        """Sample uniformly one of the valid actions of each environment.
+
+        Args:
+            rng: Random generator to sample with.
+                Defaults to the environment random generator.
+
+        Returns:
+            Index of the sampled valid action of each environment.
+        """
+        if rng is None:
+            rng = self.np_random
+        return sample_from_masks(self.action_masks(), rng)
+
+    def _tasks_terminal(self) -> np.ndarray:
+        """Which tasks are terminal in the current state of each environment."""
+        raise NotImplementedError
+
+    def _tasks_rewards_of(self, tasks: np.ndarray) -> np.ndarray:
+        """Sum of the rewards of the given tasks of each environment."""
+        raise NotImplementedError
+
+    def _purpose_terminated(self) -> np.ndarray:
+        """Whether the purpose of each environment is terminated."""
+        raise NotImplementedError
+
+    def _infos(self) -> dict:
+        infos = {}
+        if self.legal_actions_info is LegalActionsInfo.MASK:
+            infos["action_is_legal"] = self.action_masks()
+        elif self.legal_actions_info is LegalActionsInfo.BITSET:
+            infos["legal_actions_bitset"] = np.packbits(self.action_masks(), axis=1)
+        return infos
+
+
+class BatchedHcraftEnv(BaseBatchedHcraftEnv):
+    """Batch of independent copies of an HierarchyCraft environment stepped together.
+
+    Rewards, terminations and truncations follow exactly those of `hcraft.env.HcraftEnv`.
+    Arrays returned by `reset` and `step` may be buffers overwritten by the next call.
+    """
+
+    def __init__(
+        self,
+        env: "HcraftEnv",
+        num_envs: int,
+        autoreset: bool = True,
+        buffers: Optional[Mapping[str, np.ndarray]] = None,
+        num_threads: Optional[int] = None,
+        compiled: Optional[CompiledTransformations] = None,
+    ) -> None:
+        """
+        Args:
+            env: Environment to batch, its world, purpose, invalid reward, maximum steps
+                and legal actions infos are used.
+            num_envs: Number of environments in the batch.
+            autoreset: If True, reset done environments at the end of each step.
+                Defaults to True.
+            buffers: Preallocated arrays by name, see `batched_buffers_shapes`.
+                Missing arrays are allocated. Defaults to None.
+            num_threads: If greater than one, environments are split in as many chunks
+                stepped concurrently on a thread pool. Results do not depend on it.
+                Defaults to None, hence stepping all environments at once.
+            compiled: Already compiled transformations of the world to share.
+                Defaults to None, hence compiled from the world.
+        """
+        check_batchable(env)
+        buffers = allocate_buffers(batched_buffers_shapes(env, num_envs), buffers)
+        super().__init__(num_envs, autoreset, env.legal_actions_info, buffers)
+
+        self.env = env
+        self.world = env.world
+        self.purpose = env.purpose
+        self.invalid_reward = env.invalid_reward
+        self.max_step = env.max_step
+        self.state = BatchedHcraftState(
+            self.world, num_envs, buffers=buffers, compiled=compiled
+        )
+
+        tasks = self.purpose.tasks
+        self._tasks_rewards = np.array([task._reward for task in tasks], dtype=float)
+        self._terminal_groups = np.array(
+            [
+                [task in group.tasks for task in tasks]
+                for group in self.purpose.terminal_groups
+            ],
+            dtype=np.int64,
+        ).reshape(len(self.purpose.terminal_groups), len(tasks))
+        self._timestep_rewards = self.purpose.timestep_reward
+        self._invalid_rewards = self.invalid_reward
+        self._max_steps = np.inf if self.max_step is None else self.max_step
+
+        self.num_threads = 1 if num_threads is None else max(1, num_threads)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._chunks: List[Tuple[slice, "BatchedHcraftEnv"]] = []
+        n_chunks = min(self.num_threads, num_envs)
+        if n_chunks > 1:
+            self._executor = ThreadPoolExecutor(max_workers=n_chunks)
+            bounds = np.linspace(0, num_envs, n_chunks + 1).astype(int)
+            for start, stop in zip(bounds, bounds[1:]):
+                rows = slice(start, stop)
+                chunk = BatchedHcraftEnv(
+                    env,
+                    num_envs=stop - start,
+                    autoreset=autoreset,
+                    buffers={name: array[rows] for name, array in buffers.items()},
+                    compiled=self.state.compiled,
+                )
+                self._chunks.append((rows, chunk))
+
+    @property
+    def observation_space(self):
+        """Observation space of a single environment."""
+        return self.env.observation_space
+
+    @property
+    def action_space(self):
+        """Action space of a single environment."""
+        return self.env.action_space
+
+    def _reset(self, envs: Optional[np.ndarray]) -> None:
+        super()._reset(envs)
+        for _rows, chunk in self._chunks:
+            chunk._masks = None
+
+    def _step(self, actions: np.ndarray) -> dict:
+        if not self._chunks:
+            return super()._step(actions)
+        chunks_infos = self._map_chunks(lambda rows, chunk: chunk._step(actions[rows]))
+        self._masks = None
+        infos = {}
+        if any("_final_obs" in chunk_infos for chunk_infos in chunks_infos):
+            observation = self.buffers["observation"]
+            infos["final_obs"] = np.zeros_like(observation)
+            infos["_final_obs"] = np.zeros(self.num_envs, dtype=bool)
+            for (rows, _chunk), chunk_infos in zip(self._chunks, chunks_infos):
+                if "_final_obs" in chunk_infos:
+                    infos["final_obs"][rows] = chunk_infos["final_obs"]
+                    infos["_final_obs"][rows] = chunk_infos["_final_obs"]
+        return infos
+
+    def _map_chunks(
+        self, function: Callable[[slice, "BatchedHcraftEnv"], Any]
+    ) -> List[Any]:
+        futures = [
+            self._executor.submit(function, rows, chunk) for rows, chunk in self._chunks
+        ]
+        return [future.result() for future in futures]
+
+    def action_masks(self) -> np.ndarray:
+        """Boolean masks of valid actions of shape (N, n_transformations)."""
+        if self._masks is None and self._chunks:
+            self._map_chunks(lambda _rows, chunk: chunk.action_masks())
+            self._masks = self.buffers["action_masks"]
+        return super().action_masks()
+
+    def close(self) -> None:
+        """Shut down the thread pool if any."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+            self._chunks = []
+
+    def _tasks_terminal(self) -> np.ndarray:
+        if not self.purpose.tasks:
+            return self.tasks_terminated.copy()
+        return np.stack(
+            [task._is_terminal(self.state) for task in self.purpose.tasks], axis=1
+        )
+
+    def _tasks_rewards_of(self, tasks: np.ndarray) -> np.ndarray:
+        return tasks @ self._tasks_rewards
+
+    def _purpose_terminated(self) -> np.ndarray:
+        if self._terminal_groups.shape[0] == 0:
+            return np.zeros(self.num_envs, dtype=bool)
+        missing_tasks = (~self.tasks_terminated).astype(np.int64)
+        return np.any(missing_tasks @ self._terminal_groups.T == 0, axis=1)
+
+
+def state_shapes(world: "World", num_envs: int) -> Dict[str, Tuple[int, ...]]:
+    """Shapes of the arrays of a batch of states of the given world."""
+    return {
+        "player_inventory": (num_envs, world.n_items),
+        "position": (num_envs, world.n_zones),
+        "zones_inventories": (num_envs, world.n_zones, world.n_zones_items),
+    }
+
+
+def batched_buffers_shapes(
+    env: "HcraftEnv", num_envs: int
+) -> Dict[str, Tuple[Tuple[int, ...], np.dtype]]:
+    """Shapes and dtypes of every array used by a `BatchedHcraftEnv`.
+
+    The purpose of the environment is expected to be built.
+    """
+    world = env.world
+    observation_size = world.n_items + world.n_zones + world.n_zones_items
+    shapes = {
+        name: (shape, np.dtype(INVENTORY_DTYPE))
+        for name, shape in state_shapes(world, num_envs).items()
+    }
+    shapes.update(
+        {
+            "observation": ((num_envs, observation_size), np.dtype(INVENTORY_DTYPE)),
+            "action_masks": (
+                (num_envs, len(world.transformations)),
+                np.dtype(bool),
+            ),
+            "rewards": ((num_envs,), np.dtype(np.float64)),
+            "valid": ((num_envs,), np.dtype(bool)),
+            "terminated": ((num_envs,), np.dtype(bool)),
+            "truncated": ((num_envs,), np.dtype(bool)),
+            "tasks_terminated": (
+                (num_envs, len(env.purpose.tasks)),
+                np.dtype(bool),
+            ),
+            "current_step": ((num_envs,), np.dtype(np.int64)),
+        }
+    )
+    return shapes
+
+
+def sample_from_masks(
+    masks: np.ndarray, rng: Optional[np.random.Generator] = None
+) -> np.ndarray:
+    """Sample uniformly one True index in each row of a boolean masks array.
+
+    Raises:
+        ValueError: If a row has no True value.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    n_legal = masks.sum(axis=1)
+    if np.any(n_legal == 0):
+        raise ValueError(
+            "No legal action to sample from in environments "
+            f"{np.flatnonzero(n_legal == 0).tolist()}."
+        )
+    chosen = (rng.random(masks.shape[0]) * n_legal).astype(np.int64)
+    cumulated = np.cumsum(masks, axis=1)
+    return np.argmax(cumulated > chosen[:, np.newaxis], axis=1)
+
+
+def _position_slots(position: np.ndarray) -> np.ndarray:
+    """Slots of one-hot encoded positions, -1 where there is no zone."""
+    if position.shape[1] == 0:
+        return np.full(position.shape[0], -1, dtype=np.int64)
+    return np.where(np.any(position > 0, axis=1), np.argmax(position, axis=1), -1)
+
+
+def allocate_buffers(
+    shapes: Mapping[str, Tuple[Tuple[int, ...], np.dtype]],
+    buffers: Optional[Mapping[str, np.ndarray]] = None,
+) -> Dict[str, np.ndarray]:
+    """Check preallocated buffers and allocate the missing ones.
+
+    Args:
+        shapes: Shape and dtype of each buffer by name.
+        buffers: Preallocated arrays by name. Defaults to None.
+
+    Returns:
+        Arrays of all the given shapes by name, the preallocated ones included.
+
+    Raises:
+        ValueError: If a preallocated array does not have the expected shape.
+    """
+    buffers = dict(buffers) if buffers is not None else {}
+    for name, (shape, dtype) in shapes.items():
+        if buffers.get(name) is None:
+            buffers[name] = np.zeros(shape, dtype=dtype)
+        elif buffers[name].shape != shape:
+            raise ValueError(
+                f"Buffer {name} should have shape {shape}, got {buffers[name].shape}."
+            )
+    return buffers
+
+
+def start_arrays(world: "World") -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Player inventory, position and zones inventories of the world initial state."""
+    start_state = HcraftState(world)
+    return (
+        start_state.player_inventory,
+        start_state.position,
+        start_state.zones_inventories,
+    )
+
+
+def check_batchable(env: "HcraftEnv") -> None:
+    """Build the purpose of the environment and check that it can be batched.
+
+    Raises:
+        TypeError: If the purpose has tasks that are not achievement tasks.
+    """
+    env._build_purpose()
+    for task in env.purpose.tasks:
+        if not isinstance(task, AchievementTask):
+            raise TypeError(
+                f"Only achievement tasks can be batched, got {type(task).__name__}."
+            )
@@ -0,0 +1,250 @@
+"""# Build cache
+
+Creating the same environment again, in a new process or in every worker,
+builds the same world again: ordering its elements by requirements level,
+compiling its transformations and computing its requirements graph,
+from which reward shaping subtasks and solving behaviors are derived.
+
+An opt-in on-disk `BuildCache` stores those artifacts keyed by the world fingerprint
+(see `hcraft.world.World.fingerprint`), so they are loaded instead of built the next time.
+
+## Example
+
+```python
+from hcraft.build_cache import enable_build_cache
+from hcraft.examples import TowerHcraftEnv
+
+enable_build_cache("~/.cache/hcraft")
+env = TowerHcraftEnv(height=30, width=30)  # Built, then saved in the cache.
+env = TowerHcraftEnv(height=30, width=30)  # Loaded from the cache.
+```
+
+The cache can also be enabled for every process, including workers,
+by setting the `HCRAFT_BUILD_CACHE` environment variable to the cache directory.
+
+## Entries
+
+Each world definition has its own entry directory, holding a world file (see `hcraft.world_file`)
+and, once it was needed, the pickled requirements graph.
+Cached worlds are memory-mapped, so all processes loading the same entry share its arrays.
+
+Entries record the hcraft version, the world file format version
+and the cache layout version they were written with.
+Entries written with any other version are rebuilt and overwritten.
+
+## Transformations of cached worlds
+
+Worlds loaded from the cache hold their own transformations, loaded from the entry,
+in the same order as the given ones but not the given objects themselves:
+mapping the given transformations back would mean building them again.
+With the cache enabled, look transformations up by their index or name
+rather than by identity (for example with `list.index` or as dictionary keys):
+
+```python
+transformations = [...]
+world = world_from_transformations(transformations)
+index = [transfo.name for transfo in world.transformations].index(transformations[0].name)
+```
+
+"""
+
+import os
+import pickle
+import shutil
+import tempfile
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Union
+
+from hcraft.requirements import Requirements
+from hcraft.world_file import (
+    WORLD_FILE_VERSION,
+    load_world,
+    read_world_descriptor,
+    save_world,
+)
+
+if TYPE_CHECKING:
+    from hcraft.world import World
+
+
+BUILD_CACHE_VERSION = 1
+"""Version of the layout of build cache entries."""
+
+BUILD_CACHE_ENV_VAR = "HCRAFT_BUILD_CACHE"
+"""Environment variable enabling the build cache in the given directory."""
+
+
+class BuildCache:
+    """On-disk cache of built worlds and their requirements graphs."""
+
+    def __init__(self, directory: Union[str, Path]) -> None:
+        """
+        Args:
+            directory: Directory of the cache entries, created if needed.
+        """
+        self.directory = Path(directory).expanduser()
+        self.hits = 0
+        self.misses = 0
+
+    def entry(self, fingerprint: str, order_world: bool) -> "BuildCacheEntry":
+        """Entry of the world definition with the given fingerprint."""
+        ordering = "ordered" if order_world else "unordered"
+        return BuildCacheEntry(self.directory / f"{fingerprint}-{ordering}")
+
+    def world(
+        self, fingerprint: str, order_world: bool, build: Callable[[], "World"]
+    ) -> "World":
+        """Load the world with the given fingerprint, or build it and save it.
+
+        Args:
+            fingerprint: Fingerprint of the world definition.
+            order_world: Whether the world elements are ordered by requirements level.
+            build: Function building the world on cache misses.
+        """
+        entry = self.entry(fingerprint, order_world)
+        world = entry.load_world()
+        if world is not None:
+            self.hits += 1
+            return world
+        self.misses += 1
+        world = build()
+        entry.save_world(world)
+        world._build_cache = entry
+        return world
+
+    def clear(self) -> None:
+        """Remove all the cache entries."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class BuildCacheEntry:
+    """Directory of the cached artifacts of a world definition."""
+
+    WORLD_FILE = "world.json"
+    REQUIREMENTS_FILE = "requirements.pkl"
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+    def load_world(self) -> Optional["World"]:
+        """Cached world, or None if it is missing or was written by another version."""
+        world_path = self.path / self.WORLD_FILE
+        try:
+            metadata = read_world_descriptor(world_path)["metadata"]
+        except (OSError, ValueError):
+            return None
+        if metadata.get("build_cache") != _versions():
+            return None
+        world = load_world(world_path, mmap=True)
+        world._build_cache = self
+        return world
+
+    def save_world(self, world: "World") -> None:
+        """Save the given built world as this entry, replacing any stale entry."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.rmtree(self.path, ignore_errors=True)
+        staging = Path(tempfile.mkdtemp(dir=self.path.parent, prefix=".staging-"))
+        save_world(
+            world, staging / self.WORLD_FILE, metadata={"build_cache": _versions()}
+        )
+        try:
+            os.replace(staging, self.path)
+        except OSError:
+            # Another process saved this entry concurrently.
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def requirements(self, world: "World") -> Requirements:
+        """Cached requirements of the given world, computed and saved if missing."""
+        requirements_path = self.path / self.REQUIREMENTS_FILE
+        try:
+            with open(requirements_path, "rb") as requirements_file:
+                return _WorldUnpickler(requirements_file, world).load()
+        except (OSError, EOFError, pickle.UnpicklingError):
+            pass
+
+        requirements = Requirements(world)
+        # Also cache the graphs derived for reward shaping.
+        requirements.acydigraph  # pylint: disable=pointless-statement
+        try:
+            with tempfile.NamedTemporaryFile(
+                dir=self.path, prefix=".staging-", delete=False
+            ) as staging_file:
+                _WorldPickler(staging_file, world).dump(requirements)
+            os.replace(staging_file.name, requirements_path)
+        except OSError:
+            # The entry was removed in the meantime, requirements are not cached.
+            pass
+        return requirements
+
+
+class _WorldPickler(pickle.Pickler):
+    """Pickler referencing the world and its transformations instead of copying them."""
+
+    def __init__(self, file, world: "World") -> None:
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.world = world
+        self.transformations_indexes = {
+            id(transfo): index for index, transfo in enumerate(world.transformations)
+        }
+
+    def persistent_id(self, obj: Any) -> Optional[Any]:
+        if obj is self.world:
+            return "world"
+        index = self.transformations_indexes.get(id(obj))
+        if index is not None and obj is self.world.transformations[index]:
+            return index
+        return None
+
+
+class _WorldUnpickler(pickle.Unpickler):
+    def __init__(self, file, world: "World") -> None:
+        super().__init__(file)
+        self.world = world
+
+    def persistent_load(self, pid: Any) -> Any:
+        if pid == "world":
+            return self.world
+        return self.world.transformations[pid]
+
+
+def enable_build_cache(directory: Union[str, Path]) -> BuildCache:
+    """Cache worlds built by `hcraft.world.world_from_transformations` in the given directory.
+
+    Worlds loaded from the cache do not hold the given transformation objects
+    but equivalent ones in the same order, see the module documentation.
+    """
+    global _build_cache  # pylint: disable=global-statement
+    _build_cache = BuildCache(directory)
+    return _build_cache
+
+
+def disable_build_cache() -> None:
+    """Stop caching built worlds, even if `HCRAFT_BUILD_CACHE` is set."""
+    global _build_cache  # pylint: disable=global-statement
+    _build_cache = None
+
+
+def get_build_cache() -> Optional[BuildCache]:
+    """Enabled build cache if any, by default in the `HCRAFT_BUILD_CACHE` directory."""
+    global _build_cache  # pylint: disable=global-statement
+    if _build_cache is _FROM_ENVIRONMENT:
+        directory = os.environ.get(BUILD_CACHE_ENV_VAR)
+        _build_cache = BuildCache(directory) if directory else None
+    return _build_cache
+
+
+def _versions() -> Dict[str, Any]:
+    try:
+        hcraft_version = version("hcraft")
+    except PackageNotFoundError:
+        hcraft_version = "unknown"
+    return {
+        "hcraft": hcraft_version,
+        "world_file": WORLD_FILE_VERSION,
+        "build_cache": BUILD_CACHE_VERSION,
+    }
+
+
+_FROM_ENVIRONMENT = object()
+_build_cache: Any = _FROM_ENVIRONMENT
@@ -0,0 +1,162 @@
+"""# Transition cache
+
+HierarchyCraft environments are fully deterministic:
+applying a given transformation in a given state always leads to the same next state
+and gives the same reward.
+
+Rollouts that revisit the same states many times (MCTS, repeated evaluations, ...)
+can thus skip validity checks, state updates and reward computations
+by memoizing them in a bounded LRU `TransitionCache`.
+
+## Example
+
+```python
+from hcraft.examples import TowerHcraftEnv
+
+env = TowerHcraftEnv(height=3, width=2, transition_cache_size=10_000)
+for episode in range(100):
+    env.reset(seed=episode % 10)
+    done = False
+    while not done:
+        action = env.sample_legal_action()
+        _obs, _reward, terminated, truncated, _infos = env.step(action)
+        done = terminated or truncated
+
+print(env.transition_cache.stats)
+```
+
+Cache keys are compact bytes representations of the state (see `hcraft.state.HcraftState.key`)
+along with which tasks of the purpose are already terminated,
+as rewards depend on them.
+
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Hashable, Optional
+
+import numpy as np
+
+
+@dataclass
+class CachedTransition:
+    """Memoized result of applying an action in a given state."""
+
+    next_key: Hashable
+    """Key of the state reached."""
+    reward: float
+    """Reward obtained."""
+    success: bool
+    """Whether the transformation was valid and applied."""
+
+
+@dataclass
+class CacheEntry:
+    """Everything memoized about a given state."""
+
+    mask: Optional[np.ndarray] = None
+    """Boolean mask of legal actions in this state."""
+    transitions: Dict[int, CachedTransition] = field(default_factory=dict)
+    """Memoized transitions for each action already applied in this state."""
+
+
+class TransitionCache:
+    """Bounded LRU cache of legal actions masks and transitions."""
+
+    def __init__(self, maxsize: int = 100_000) -> None:
+        """
+        Args:
+            maxsize: Maximum number of states to memoize.
+                Least recently used states are evicted first. Defaults to 100_000.
+        """
+        if maxsize <= 0:
+            raise ValueError(f"Cache maxsize must be positive, got {maxsize}.")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+
+    def mask(self, key: Hashable) -> Optional[np.ndarray]:
+        """Copy of the memoized legal actions mask of the given state if any."""
+        entry = self._get(key)
+        if entry is None or entry.mask is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry.mask.copy()
+
+    def add_mask(self, key: Hashable, mask: np.ndarray) -> None:
+        """Memoize a read-only copy of the legal actions mask of the given state.
+
+        The given mask is left untouched, so callers may keep modifying it.
+        """
+        memoized = mask.copy()
+        memoized.flags.writeable = False
+        self._get_or_create(key).mask = memoized
+
+    def transition(self, key: Hashable, action: int) -> Optional[CachedTransition]:
+        """Memoized transition of the given action in the given state if any."""
+        entry = self._get(key)
+        transition = None if entry is None else entry.transitions.get(action)
+        if transition is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return transition
+
+    def add_transition(
+        self,
+        key: Hashable,
+        action: int,
+        next_key: Hashable,
+        reward: float,
+        success: bool,
+    ) -> None:
+        """Memoize the transition of the given action in the given state."""
+        transition = CachedTransition(next_key, reward, success)
+        self._get_or_create(key).transitions[action] = transition
+
+    def clear(self) -> None:
+        """Remove all memoized states, statistics are kept."""
+        self._entries.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        """Ratio of lookups that were found in the cache."""
+        return self.hits / max(1, self.hits + self.misses)
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        """Statistics of the cache usage to tune its size."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "evictions": self.evictions,
+            "size": len(self),
+            "maxsize": self.maxsize,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def _get(self, key: Hashable) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def _get_or_create(self, key: Hashable) -> CacheEntry:
+        entry = self._get(key)
+        if entry is not None:
+            return entry
+        entry = CacheEntry()
+        self._entries[key] = entry
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return entry
@@ -0,0 +1,197 @@
+"""# Environment checkpoints
+
+Save the progress of an `hcraft.env.HcraftEnv` to a small binary file and resume it later,
+for example after the preemption of a long evaluation run.
+
+## Example
+
+```python
+from hcraft.examples import MineHcraftEnv
+
+env = MineHcraftEnv()
+env.reset()
+env.step(0)
+env.save_checkpoint("mine.ckpt")
+
+resumed = MineHcraftEnv()
+resumed.load_checkpoint("mine.ckpt")
+```
+
+The world is not saved in checkpoints: they are loaded in an environment built
+with the same world, checked using the world fingerprint (see `hcraft.world.World.fingerprint`),
+and the same purpose, checked using the names of its tasks.
+
+## Format
+
+A checkpoint is an uncompressed NumPy archive holding:
+
+| Array | Content |
+|---|---|
+| `header` | UTF-8 JSON with the format, its version, the world fingerprint, tasks names, \
+step counters, scores and random generator state |
+| `state/<name>` | Inventories, position and discoveries of `hcraft.state.HcraftState` |
+| `tasks_terminated` | Whether each task of the purpose is terminated |
+| `<counter>/episodes`, `<counter>/successes` | Windows of recent episodes \
+of `hcraft.metrics.SuccessCounter` of tasks and terminal groups |
+
+Loading a checkpoint of an unknown format version raises a `ValueError`.
+
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Union
+
+import numpy as np
+
+from hcraft.metrics import SuccessCounter
+
+if TYPE_CHECKING:
+    from hcraft.env import HcraftEnv
+
+CHECKPOINT_FORMAT = "hcraft-checkpoint"
+CHECKPOINT_VERSION = 1
+"""Version of the checkpoints format written by `save_checkpoint`."""
+
+STATE_ARRAYS = (
+    "player_inventory",
+    "position",
+    "zones_inventories",
+    "discovered_items",
+    "discovered_zones",
+    "discovered_zones_items",
+    "discovered_transformations",
+)
+"""Arrays of `hcraft.state.HcraftState` saved in checkpoints."""
+
+_COUNTERS = ("task_successes", "terminal_successes")
+
+
+def save_checkpoint(env: "HcraftEnv", path: Union[str, Path]) -> Path:
+    """Save the progress of the environment to a checkpoint file.
+
+    The file is replaced atomically, so an interrupted save leaves the previous checkpoint.
+
+    Args:
+        env: Environment to save.
+        path: Path of the checkpoint file.
+
+    Returns:
+        Path of the checkpoint file.
+    """
+    path = Path(path)
+    env._sync_with_world()
+    rng = getattr(env, "np_random", None)
+    header = {
+        "format": CHECKPOINT_FORMAT,
+        "version": CHECKPOINT_VERSION,
+        "fingerprint": env.world.fingerprint,
+        "tasks": [task.name for task in env.purpose.tasks],
+        "current_step": env.current_step,
+        "current_score": float(env.current_score),
+        "cumulated_score": float(env.cumulated_score),
+        "episodes": env.episodes,
+        "last_action_valid": env.last_action_valid,
+        "rng": rng.bit_generator.state if rng is not None else None,
+    }
+    arrays = {"header": np.frombuffer(json.dumps(header).encode("utf-8"), np.uint8)}
+    for name in STATE_ARRAYS:
+        arrays[f"state/{name}"] = getattr(env.state, name)
+    arrays["tasks_terminated"] = np.array(
+        [task.terminated for task in env.purpose.tasks], dtype=bool
+    )
+    for name in _COUNTERS:
+        counter: SuccessCounter = getattr(env, name)
+        if counter is not None:
+            arrays.update(_counter_arrays(counter, name))
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    staging = path.with_name(f".{path.name}.tmp")
+    with open(staging, "wb") as checkpoint_file:
+        np.savez(checkpoint_file, **arrays)
+    os.replace(staging, path)
+    return path
+
+
+def load_checkpoint(env: "HcraftEnv", path: Union[str, Path]) -> None:
+    """Resume the environment from a checkpoint file written by `save_checkpoint`.
+
+    Args:
+        env: Environment to resume, with the same world and purpose as the saved one.
+        path: Path of the checkpoint file.
+
+    Raises:
+        ValueError: If the file is not a checkpoint of a supported version,
+            or if it was saved with a different world or purpose.
+    """
+    with np.load(path, allow_pickle=False) as archive:
+        arrays = {name: archive[name] for name in archive.files}
+    header = json.loads(arrays.pop("header").tobytes().decode("utf-8"))
+    if header.get("format") != CHECKPOINT_FORMAT:
+        raise ValueError(f"{path} is not an hcraft checkpoint.")
+    version = header.get("version")
+    if not isinstance(version, int) or version > CHECKPOINT_VERSION:
+        raise ValueError(
+            f"Unsupported checkpoint version {version} in {path},"
+            f" this version of hcraft reads versions up to {CHECKPOINT_VERSION}."
+        )
+    env._sync_with_world()
+    if header["fingerprint"] != env.world.fingerprint:
+        raise ValueError(
+            f"Checkpoint {path} was saved with a different world"
+            f" (fingerprint {header['fingerprint']}, expected {env.world.fingerprint})."
+        )
+    if header["episodes"] > 0:
+        # The purpose is built on the first reset.
+        env._build_purpose()
+    tasks = [task.name for task in env.purpose.tasks]
+    if header["tasks"] != tasks:
+        raise ValueError(
+            f"Checkpoint {path} was saved with a different purpose"
+            f" (tasks {header['tasks']}, expected {tasks})."
+        )
+
+    for name in STATE_ARRAYS:
+        setattr(env.state, name, arrays[f"state/{name}"])
+    for task, terminated in zip(env.purpose.tasks, arrays["tasks_terminated"]):
+        task.terminated = bool(terminated)
+    for name in _COUNTERS:
+        counter: SuccessCounter = getattr(env, name)
+        if counter is not None and f"{name}/episodes" in arrays:
+            _load_counter(counter, arrays, name)
+
+    env.current_step = header["current_step"]
+    env.current_score = header["current_score"]
+    env.cumulated_score = header["cumulated_score"]
+    env.episodes = header["episodes"]
+    env.last_action_valid = header["last_action_valid"]
+    if header["rng"] is not None:
+        bit_generator = getattr(np.random, header["rng"]["bit_generator"])()
+        bit_generator.state = header["rng"]
+        env.np_random = np.random.Generator(bit_generator)
+
+
+def _counter_arrays(counter: SuccessCounter, name: str) -> Dict[str, np.ndarray]:
+    # Every element of a counter has the same window of episodes.
+    windows = [counter.successes[element] for element in counter.elements]
+    window_size = len(windows[0]) if windows else 0
+    return {
+        f"{name}/episodes": np.array(
+            [list(window.keys()) for window in windows], dtype=np.int64
+        ).reshape(len(windows), window_size),
+        f"{name}/successes": np.array(
+            [list(window.values()) for window in windows], dtype=bool
+        ).reshape(len(windows), window_size),
+    }
+
+
+def _load_counter(
+    counter: SuccessCounter, arrays: Dict[str, np.ndarray], name: str
+) -> None:
+    episodes, successes = arrays[f"{name}/episodes"], arrays[f"{name}/successes"]
+    for element, element_episodes, element_successes in zip(
+        counter.elements, episodes.tolist(), successes.tolist()
+    ):
+        counter.successes[element] = dict(zip(element_episodes, element_successes))
+    counter.step_reset()
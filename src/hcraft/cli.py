@@ -1,5 +1,5 @@
 from argparse import ArgumentParser, Namespace, _SubParsersAction
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
 
 from hcraft.elements import Item
 from hcraft.env import HcraftEnv
@@ -13,16 +13,20 @@ from hcraft.examples import (
 from hcraft.examples.minicraft import MINICRAFT_NAME_TO_ENV
 from hcraft.examples.treasure import TreasureEnv
 from hcraft.purpose import Purpose
-from hcraft.render.render import HcraftWindow
-from hcraft.render.widgets import ContentMode, DisplayMode
+from hcraft.render.modes import ContentMode, DisplayMode
 from hcraft.task import GetItemTask
 
+if TYPE_CHECKING:
+    from hcraft.render.render import HcraftWindow
+    from hcraft.server import HcraftServer
 
-def hcraft_cli(args: Optional[List[str]] = None) -> HcraftEnv:
+
+def hcraft_cli(args: Optional[List[str]] = None, with_window: bool = True) -> HcraftEnv:
     """Parse arguments to build a hcraft environment.
 
     Args:
         args: Optional list of arguments to parse. Parses argv if None. Defaults to None.
+        with_window: If False, the environment has no render window. Defaults to True.
     """
     parser = ArgumentParser()
 
@@ -106,6 +110,7 @@ def hcraft_cli(args: Optional[List[str]] = None) -> HcraftEnv:
         help="When to display transformation's content.",
     )
     args = parser.parse_args(args)
+    args.with_window = with_window
     if "func" in args:
         env: "HcraftEnv" = args.func(args)
         return env
@@ -114,7 +119,52 @@ def hcraft_cli(args: Optional[List[str]] = None) -> HcraftEnv:
     )
 
 
-def _window_from_cli(args: Namespace):
+def hcraft_serve_cli(args: Optional[List[str]] = None) -> "HcraftServer":
+    """Parse arguments to build a server of hcraft environments.
+
+    Arguments following the serve options describe the environment, see `hcraft_cli`.
+
+    Args:
+        args: Optional list of arguments to parse. Parses argv if None. Defaults to None.
+    """
+    parser = ArgumentParser(prog="hcraft serve")
+    parser.add_argument(
+        "--socket",
+        type=str,
+        default="hcraft.sock",
+        help="Path of the Unix domain socket to listen to. Default to 'hcraft.sock'.",
+    )
+    parser.add_argument(
+        "--num-envs",
+        type=int,
+        default=1,
+        help="Number of environments stepped together. Default to 1.",
+    )
+    parser.add_argument(
+        "--num-threads",
+        type=int,
+        default=None,
+        help="Number of threads stepping environments. Default to None.",
+    )
+    args, env_args = parser.parse_known_args(args)
+    env = hcraft_cli(env_args, with_window=False)
+
+    # pylint: disable=import-outside-toplevel
+    from hcraft.server import HcraftServer
+
+    return HcraftServer(
+        args.socket, env, num_envs=args.num_envs, num_threads=args.num_threads
+    )
+
+
+def _window_from_cli(args: Namespace) -> Optional["HcraftWindow"]:
+    if not args.with_window:
+        return None
+
+    # Rendering dependencies are only loaded when a window is needed.
+    # pylint: disable=import-outside-toplevel
+    from hcraft.render.render import HcraftWindow
+
     return HcraftWindow(
         window_shape=args.window_shape,
         player_inventory_display=args.player_inventory_display,
@@ -0,0 +1,496 @@
+"""# Demonstration datasets
+
+Generate datasets of expert demonstrations for imitation learning and offline reinforcement learning,
+running (environment, task, seed) jobs over a pool of processes.
+
+Experts can be:
+* `"behavior"`: the solving behavior of the task (see `hcraft.env.HcraftEnv.solving_behavior`).
+* `"planner"`: plans of the `hcraft.planning.HcraftPlanningProblem` of the task
+    (needs the planning dependencies).
+* `"random"`: uniformly sampled legal actions.
+
+## Command line
+
+```bash
+hcraft dataset --output mine_demos --expert behavior --seeds 100 --num-workers 8 minecraft
+```
+
+Every argument after the dataset options describes the environment as for `hcraft --help`.
+By default, one job is created for each task of the best terminal group of the environment purpose
+and each seed, `--task` only keeps the tasks of the given names.
+
+## Python API
+
+```python
+from functools import partial
+
+from hcraft.dataset import generate_dataset
+from hcraft.examples import TowerHcraftEnv
+
+manifest = generate_dataset(
+    "tower_demos",
+    envs={"tower": partial(TowerHcraftEnv, height=3, width=3), "mine": ["minecraft"]},
+    seeds=range(100),
+    expert="random",
+    num_workers=8,
+)
+```
+
+Environments are given by name, either as command line arguments or as a picklable factory.
+
+## Output
+
+Episodes are written in shards, each shard being a recording of a `hcraft.trajectories.TrajectoryRecorder`
+in the `shards` directory of the dataset, holding the episodes of one environment and task.
+The manifest `manifest.jsonl` has one JSON line per episode with its environment, task, seed and expert,
+its number of steps, return, success and where it is stored ('shard' and 'first_step').
+
+Generating a dataset again in the same directory resumes it:
+jobs already in the manifest are skipped.
+
+Identical episodes (same world, task and actions) are only stored once,
+the manifest entries of duplicates having a 'duplicate_of' key
+with the digest of the stored episode instead of a 'shard'.
+
+"""
+
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import time
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import numpy as np
+
+from hcraft.purpose import Purpose
+
+if TYPE_CHECKING:
+    from hcraft.env import HcraftEnv
+    from hcraft.task import Task
+
+
+EXPERTS = ("behavior", "planner", "random")
+"""Available experts."""
+
+MANIFEST_FILE = "manifest.jsonl"
+SHARDS_DIRECTORY = "shards"
+
+EnvSpec = Union[Sequence[str], Callable[[], "HcraftEnv"]]
+"""Command line arguments (see `hcraft.cli.hcraft_cli`) or picklable factory of an environment."""
+
+
+class ShardJob(NamedTuple):
+    """Episodes of an environment and task with given seeds, stored in one shard."""
+
+    shard: str
+    env_name: str
+    env_spec: EnvSpec
+    task: Optional[str]
+    seeds: Tuple[int, ...]
+    expert: str
+    max_episode_steps: int
+    keyframe_interval: int
+    known_digests: FrozenSet[str]
+
+
+def generate_dataset(
+    directory: Union[str, Path],
+    envs: Mapping[str, EnvSpec],
+    seeds: Iterable[int],
+    expert: str = "behavior",
+    tasks: Optional[Sequence[str]] = None,
+    num_workers: Optional[int] = None,
+    episodes_per_shard: int = 64,
+    max_episode_steps: int = 1000,
+    keyframe_interval: int = 256,
+    context: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Generate or resume a dataset of expert demonstrations.
+
+    Args:
+        directory: Directory of the dataset, created if needed.
+        envs: Environments to generate episodes in, by name.
+        seeds: Seeds of the episodes of each environment and task.
+        expert: Expert choosing actions, one of `EXPERTS`. Defaults to "behavior".
+        tasks: Names of the tasks to keep. Defaults to None,
+            hence all the tasks of the best terminal group of each environment purpose.
+        num_workers: Number of worker processes. Defaults to None, hence one per CPU.
+            Jobs run in the current process if set to 0.
+        episodes_per_shard: Maximum number of episodes of each shard. Defaults to 64.
+        max_episode_steps: Steps after which episodes are stopped if the environment
+            does not truncate them before. Defaults to 1000.
+        keyframe_interval: Steps between two keyframes of the recordings. Defaults to 256.
+        context: Multiprocessing start method of the workers. Defaults to None.
+
+    Returns:
+        Entries of the whole manifest, including those of previous generations.
+
+    Raises:
+        ValueError: If the expert is unknown.
+    """
+    if expert not in EXPERTS:
+        raise ValueError(f"Unknown expert {expert}, expected one of {EXPERTS}.")
+    directory = Path(directory)
+    (directory / SHARDS_DIRECTORY).mkdir(parents=True, exist_ok=True)
+    manifest = read_manifest(directory)
+    done_jobs = {_job_key(entry) for entry in manifest}
+    digests = {entry["digest"] for entry in manifest if "shard" in entry}
+    seeds = list(seeds)
+
+    jobs: List[ShardJob] = []
+    shard_index = _next_shard_index(directory)
+    for env_name, env_spec in envs.items():
+        for task in _env_tasks(env_spec, tasks):
+            remaining_seeds = [
+                seed
+                for seed in seeds
+                if (env_name, task, seed, expert) not in done_jobs
+            ]
+            for start in range(0, len(remaining_seeds), episodes_per_shard):
+                jobs.append(
+                    ShardJob(
+                        shard=f"{SHARDS_DIRECTORY}/shard-{shard_index:05d}",
+                        env_name=env_name,
+                        env_spec=env_spec,
+                        task=task,
+                        seeds=tuple(
+                            remaining_seeds[start : start + episodes_per_shard]
+                        ),
+                        expert=expert,
+                        max_episode_steps=max_episode_steps,
+                        keyframe_interval=keyframe_interval,
+                        known_digests=frozenset(digests),
+                    )
+                )
+                shard_index += 1
+
+    _rewrite_manifest(directory, manifest)
+    with open(directory / MANIFEST_FILE, "a", encoding="utf-8") as manifest_file:
+        for entries in _run_jobs(directory, jobs, num_workers, context):
+            for entry in entries:
+                # Shards running concurrently may have found the same episode.
+                if "shard" in entry and entry["digest"] in digests:
+                    entry = _as_duplicate(entry)
+                if "shard" in entry:
+                    digests.add(entry["digest"])
+                manifest_file.write(json.dumps(entry) + "\n")
+                manifest.append(entry)
+            manifest_file.flush()
+    return manifest
+
+
+def _rewrite_manifest(directory: Path, manifest: List[Dict[str, Any]]) -> None:
+    """Drop any line left incomplete by an interrupted generation.
+
+    The manifest is replaced at once so an interruption while rewriting it
+    never loses the entries of the episodes already generated.
+    """
+    path = directory / MANIFEST_FILE
+    temporary_path = path.with_name(path.name + ".tmp")
+    with open(temporary_path, "w", encoding="utf-8") as manifest_file:
+        for entry in manifest:
+            manifest_file.write(json.dumps(entry) + "\n")
+        manifest_file.flush()
+        os.fsync(manifest_file.fileno())
+    os.replace(temporary_path, path)
+
+
+def read_manifest(directory: Union[str, Path]) -> List[Dict[str, Any]]:
+    """Entries of the manifest of a dataset, empty if there is none yet.
+
+    A last line left incomplete by an interrupted generation is ignored.
+    """
+    path = Path(directory) / MANIFEST_FILE
+    if not path.exists():
+        return []
+    entries = []
+    with open(path, "r", encoding="utf-8") as manifest_file:
+        for line in manifest_file:
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                break
+    return entries
+
+
+def run_shard_job(directory: Union[str, Path], job: ShardJob) -> List[Dict[str, Any]]:
+    """Run the episodes of a job, record the new ones and return their manifest entries."""
+    # pylint: disable=import-outside-toplevel
+    from hcraft.trajectories import TrajectoryRecorder
+
+    env = build_env(job.env_spec)
+    task = _find_task(env, job.task)
+    fingerprint = env.world.fingerprint
+    recorder: Optional[TrajectoryRecorder] = None
+    digests = set(job.known_digests)
+    entries = []
+    for seed in job.seeds:
+        start_time = time.perf_counter()
+        episode = _run_episode(env, task, seed, job.expert, job.max_episode_steps)
+        digest = _episode_digest(fingerprint, job.task, episode["actions"])
+        entry = {
+            "env": job.env_name,
+            "task": job.task,
+            "seed": seed,
+            "expert": job.expert,
+            "digest": digest,
+            "steps": len(episode["actions"]),
+            "return": float(np.sum(episode["rewards"])),
+            "success": episode["success"],
+            "terminated": bool(np.any(episode["terminated"])),
+            "truncated": bool(np.any(episode["truncated"])),
+            "invalid_actions": int(np.sum(~episode["valid"])),
+            "duration": time.perf_counter() - start_time,
+        }
+        if digest in digests:
+            entries.append(_as_duplicate(entry))
+            continue
+        digests.add(digest)
+        if recorder is None:
+            recorder = TrajectoryRecorder(
+                env,
+                Path(directory) / job.shard,
+                keyframe_interval=job.keyframe_interval,
+                metadata={"env": job.env_name, "task": job.task},
+            )
+        entry["shard"] = job.shard
+        entry["first_step"] = recorder.total_steps
+        recorder.record_episode(
+            episode["actions"],
+            episode["rewards"],
+            episode["valid"],
+            episode["terminated"],
+            episode["truncated"],
+        )
+        entries.append(entry)
+    if recorder is not None:
+        recorder.close()
+    return entries
+
+
+def build_env(env_spec: EnvSpec) -> "HcraftEnv":
+    """Build an environment from its command line arguments or its factory."""
+    if callable(env_spec):
+        return env_spec()
+    from hcraft.cli import hcraft_cli  # pylint: disable=import-outside-toplevel
+
+    return hcraft_cli(list(env_spec), with_window=False)
+
+
+def hcraft_dataset_cli(args: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Parse arguments to generate a dataset of expert demonstrations.
+
+    Arguments following the dataset options describe the environment, see `hcraft.cli.hcraft_cli`.
+
+    Args:
+        args: Optional list of arguments to parse. Parses argv if None. Defaults to None.
+
+    Returns:
+        Entries of the dataset manifest.
+    """
+    parser = ArgumentParser(prog="hcraft dataset")
+    parser.add_argument(
+        "--output", "-o", type=str, required=True, help="Directory of the dataset."
+    )
+    parser.add_argument(
+        "--expert",
+        type=str,
+        default="behavior",
+        choices=EXPERTS,
+        help="Expert choosing actions. Default to 'behavior'.",
+    )
+    parser.add_argument(
+        "--seeds", type=int, default=10, help="Number of seeds. Default to 10."
+    )
+    parser.add_argument(
+        "--first-seed", type=int, default=0, help="First seed. Default to 0."
+    )
+    parser.add_argument(
+        "--task",
+        action="append",
+        type=str,
+        default=None,
+        help="Name of a task of the environment purpose to keep. Default to all.",
+    )
+    parser.add_argument(
+        "--num-workers",
+        type=int,
+        default=None,
+        help="Number of worker processes. Default to one per CPU.",
+    )
+    parser.add_argument(
+        "--episodes-per-shard",
+        type=int,
+        default=64,
+        help="Maximum number of episodes per shard. Default to 64.",
+    )
+    parser.add_argument(
+        "--max-episode-steps",
+        type=int,
+        default=1000,
+        help="Steps after which episodes are stopped. Default to 1000.",
+    )
+    args, env_args = parser.parse_known_args(args)
+    env_name = " ".join(env_args)
+    return generate_dataset(
+        args.output,
+        envs={env_name: env_args},
+        seeds=range(args.first_seed, args.first_seed + args.seeds),
+        expert=args.expert,
+        tasks=args.task,
+        num_workers=args.num_workers,
+        episodes_per_shard=args.episodes_per_shard,
+        max_episode_steps=args.max_episode_steps,
+    )
+
+
+def _run_jobs(
+    directory: Path,
+    jobs: List[ShardJob],
+    num_workers: Optional[int],
+    context: Optional[str],
+) -> Iterable[List[Dict[str, Any]]]:
+    """Entries of each job, in the order they complete."""
+    if not jobs:
+        return
+    if num_workers == 0:
+        for job in jobs:
+            yield run_shard_job(directory, job)
+        return
+    with ProcessPoolExecutor(
+        max_workers=num_workers, mp_context=mp.get_context(context)
+    ) as executor:
+        futures = [executor.submit(run_shard_job, directory, job) for job in jobs]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def _run_episode(
+    env: "HcraftEnv",
+    task: Optional["Task"],
+    seed: int,
+    expert: str,
+    max_episode_steps: int,
+) -> Dict[str, Any]:
+    observation, _infos = env.reset(seed=seed)
+    choose_action = _expert_policy(env, task, expert)
+    steps: Dict[str, list] = {
+        name: [] for name in ("actions", "rewards", "valid", "terminated", "truncated")
+    }
+    done = False
+    while not done and len(steps["actions"]) < max_episode_steps:
+        if task is not None and task.terminated:
+            break
+        action = choose_action(observation)
+        if not isinstance(action, (int, np.integer)):
+            break  # The expert has no action to take.
+        observation, reward, terminated, truncated, _infos = env.step(action)
+        done = terminated or truncated
+        steps["actions"].append(int(action))
+        steps["rewards"].append(reward)
+        steps["valid"].append(env.last_action_valid)
+        steps["terminated"].append(terminated)
+        steps["truncated"].append(truncated)
+
+    episode = {
+        "actions": np.array(steps["actions"], dtype=np.int64),
+        "rewards": np.array(steps["rewards"], dtype=np.float64),
+        "valid": np.array(steps["valid"], dtype=bool),
+        "terminated": np.array(steps["terminated"], dtype=bool),
+        "truncated": np.array(steps["truncated"], dtype=bool),
+    }
+    if task is not None:
+        episode["success"] = bool(task.terminated)
+    else:
+        episode["success"] = bool(env.purpose.terminated)
+    return episode
+
+
+def _expert_policy(
+    env: "HcraftEnv", task: Optional["Task"], expert: str
+) -> Callable[[np.ndarray], Any]:
+    if expert == "random":
+        return lambda _observation: (
+            env.sample_legal_action() if env.legal_actions().size > 0 else None
+        )
+    if task is None:
+        raise ValueError(f"The {expert} expert needs a task.")
+    if expert == "behavior":
+        return env.solving_behavior(task)
+
+    # pylint: disable=import-outside-toplevel
+    from hcraft.planning import HcraftPlanningProblem
+
+    problem = HcraftPlanningProblem(env.state, env.name, Purpose(task))
+    return lambda _observation: problem.action_from_plan(env.state)
+
+
+def _env_tasks(
+    env_spec: EnvSpec, tasks: Optional[Sequence[str]]
+) -> List[Optional[str]]:
+    env = build_env(env_spec)
+    if not env.purpose.built:
+        env.reset()  # Builds the purpose.
+    group = env.purpose.best_terminal_group
+    if group is None:
+        return [None]
+    names = [task.name for task in group.tasks]
+    if tasks is not None:
+        names = [name for name in names if name in tasks]
+    return names
+
+
+def _find_task(env: "HcraftEnv", name: Optional[str]) -> Optional["Task"]:
+    if name is None:
+        return None
+    if not env.purpose.built:
+        env.reset()  # Builds the purpose.
+    for task in env.purpose.tasks:
+        if task.name == name:
+            return task
+    raise ValueError(f"No task named {name} in the environment purpose.")
+
+
+def _episode_digest(fingerprint: str, task: Optional[str], actions: np.ndarray) -> str:
+    digest = hashlib.sha256(fingerprint.encode("utf-8"))
+    digest.update(json.dumps(task).encode("utf-8"))
+    digest.update(np.asarray(actions, dtype="<i8").tobytes())
+    return digest.hexdigest()
+
+
+def _as_duplicate(entry: Dict[str, Any]) -> Dict[str, Any]:
+    entry = {
+        key: value for key, value in entry.items() if key not in ("shard", "first_step")
+    }
+    entry["duplicate_of"] = entry["digest"]
+    return entry
+
+
+def _job_key(entry: Dict[str, Any]) -> Tuple[str, Optional[str], int, str]:
+    return entry["env"], entry["task"], entry["seed"], entry["expert"]
+
+
+def _next_shard_index(directory: Path) -> int:
+    indexes = [
+        int(path.name.split("-")[-1])
+        for path in (directory / SHARDS_DIRECTORY).glob("shard-*")
+    ]
+    return max(indexes, default=-1) + 1
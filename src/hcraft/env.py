@@ -271,23 +271,24 @@ That's it for this small customized env if you want more, be sure to check Trans
 """
 
 import collections
+from enum import Enum
+from pathlib import Path
 from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
 
 import numpy as np
 
+from hcraft.cache import TransitionCache
 from hcraft.metrics import SuccessCounter
 from hcraft.purpose import Purpose
-from hcraft.render.render import HcraftWindow
-from hcraft.render.utils import surface_to_rgb_array
-from hcraft.solving_behaviors import (
-    Behavior,
-    build_all_solving_behaviors,
-    task_to_behavior_name,
-)
-from hcraft.planning import HcraftPlanningProblem
 from hcraft.state import HcraftState
 
+# Rendering, solving behaviors and planning rely on slow to import libraries,
+# so they are only imported when first used.
 if TYPE_CHECKING:
+    from hebg import Behavior
+
+    from hcraft.planning import HcraftPlanningProblem
+    from hcraft.render.render import HcraftWindow
     from hcraft.task import Task
     from hcraft.world import World
 
@@ -308,6 +309,17 @@ except ImportError:
     Env = object
 
 
+class LegalActionsInfo(Enum):
+    """Enumeration of the ways legal actions can be given in the step infos."""
+
+    MASK = "mask"
+    """Dense boolean mask of legal actions under the 'action_is_legal' key."""
+    BITSET = "bitset"
+    """Mask packed in bits (uint8) under the 'legal_actions_bitset' key."""
+    NONE = "none"
+    """Legal actions are not given in infos."""
+
+
 class HcraftEnv(Env):
     """Environment to simulate inventory management."""
 
@@ -316,9 +328,11 @@ class HcraftEnv(Env):
         world: "World",
         purpose: Optional[Union[Purpose, List["Task"], "Task"]] = None,
         invalid_reward: float = -1.0,
-        render_window: Optional[HcraftWindow] = None,
+        render_window: Optional["HcraftWindow"] = None,
         name: str = "HierarchyCraft",
         max_step: Optional[int] = None,
+        legal_actions_info: Union[str, LegalActionsInfo] = LegalActionsInfo.MASK,
+        transition_cache_size: Optional[int] = None,
     ) -> None:
         """
         Args:
@@ -331,8 +345,15 @@ class HcraftEnv(Env):
             name: Name of the environement. Defaults to 'HierarchyCraft'.
             max_step: (Optional[int], optional): Maximum number of steps before episode truncation.
                 If None, never truncates the episode. Defaults to None.
+            legal_actions_info: How legal actions are given in the step infos.
+                Bitsets are much lighter than masks to copy for huge action spaces,
+                see `LegalActionsInfo`. Defaults to the dense boolean mask.
+            transition_cache_size: If given, memoize up to this number of states
+                legal actions masks and transitions in a `hcraft.cache.TransitionCache`.
+                Defaults to None, hence no cache.
         """
         self.world = world
+        self.legal_actions_info = LegalActionsInfo(legal_actions_info)
         self.invalid_reward = invalid_reward
         self.max_step = max_step
         self.name = name
@@ -342,13 +363,20 @@ class HcraftEnv(Env):
         self.render_mode = "rgb_array"
 
         self.state = HcraftState(self.world)
+        self._world_version = self.world.version
         self.current_step = 0
         self.current_score = 0
         self.cumulated_score = 0
         self.episodes = 0
+        self.last_action_valid: Optional[bool] = None
+        """Whether the action of the last step was valid, None before any step."""
         self.task_successes: Optional[SuccessCounter] = None
         self.terminal_successes: Optional[SuccessCounter] = None
 
+        self.transition_cache: Optional[TransitionCache] = None
+        if transition_cache_size is not None:
+            self.transition_cache = TransitionCache(maxsize=transition_cache_size)
+
         if purpose is None:
             purpose = Purpose(None)
         if not isinstance(purpose, Purpose):
@@ -356,6 +384,21 @@ class HcraftEnv(Env):
         self.purpose = purpose
         self.metadata = {}
 
+    def __getstate__(self) -> dict:
+        # Derived structures are left out and rebuilt lazily.
+        state = self.__dict__.copy()
+        state["render_window"] = None
+        state["_all_behaviors"] = None
+        if self.transition_cache is not None:
+            state["transition_cache"] = TransitionCache(self.transition_cache.maxsize)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        if self.purpose.built:
+            for task in self.purpose.tasks:
+                task.build(self.world)
+
     @property
     def truncated(self) -> bool:
         """Whether the time limit has been exceeded."""
@@ -389,9 +432,82 @@ class HcraftEnv(Env):
         """
         return DiscreteSpace(len(self.world.transformations))
 
+    def candidate_actions(self) -> np.ndarray:
+        """Indexes of actions that may be valid in the current zone.
+
+        Only the transformations restricted to the current zone and the unrestricted ones
+        are candidates, see `hcraft.world.World.candidate_transformations`.
+        """
+        return self.world.candidate_transformations(self.state.current_zone_slot)
+
     def action_masks(self) -> np.ndarray:
         """Return boolean mask of valid actions."""
-        return np.array([t.is_valid(self.state) for t in self.world.transformations])
+        self._sync_with_world()
+        if self.transition_cache is not None:
+            key = self._transition_key()
+            mask = self.transition_cache.mask(key)
+            if mask is None:
+                mask = self._compute_action_masks()
+                self.transition_cache.add_mask(key, mask)
+            return mask
+        return self._compute_action_masks()
+
+    def _compute_action_masks(self) -> np.ndarray:
+        mask = np.zeros(len(self.world.transformations), dtype=bool)
+        for action in self.candidate_actions():
+            mask[action] = self.world.transformations[action].is_valid(self.state)
+        return mask
+
+    def legal_actions(self) -> np.ndarray:
+        """Return the indexes of valid actions.
+
+        Indexes are given with the smallest unsigned integer dtype
+        able to hold any action of the action space.
+        """
+        self._sync_with_world()
+        if self.transition_cache is not None:
+            return np.flatnonzero(self.action_masks()).astype(self._actions_dtype)
+        candidates = self.candidate_actions()
+        legal = [
+            action
+            for action in candidates
+            if self.world.transformations[action].is_valid(self.state)
+        ]
+        return np.array(legal, dtype=self._actions_dtype)
+
+    def legal_actions_bitset(self) -> np.ndarray:
+        """Return the mask of valid actions packed in bits.
+
+        Use `np.unpackbits(bitset, count=env.action_space.n)` to get back the mask.
+        """
+        return np.packbits(self.action_masks())
+
+    def sample_legal_action(self, rng: Optional[np.random.Generator] = None) -> int:
+        """Sample uniformly one of the valid actions.
+
+        Args:
+            rng: Random generator to sample with.
+                Defaults to the environment random generator.
+
+        Returns:
+            int: Index of the sampled valid action.
+        """
+        legal_actions = self.legal_actions()
+        if legal_actions.size == 0:
+            raise ValueError("No legal action to sample from in the current state.")
+        if rng is None:
+            rng = self._rng
+        return int(legal_actions[rng.integers(legal_actions.size)])
+
+    @property
+    def _actions_dtype(self) -> np.dtype:
+        return np.min_scalar_type(max(len(self.world.transformations) - 1, 0))
+
+    @property
+    def _rng(self) -> np.random.Generator:
+        if getattr(self, "np_random", None) is None:
+            self.np_random = np.random.default_rng()
+        return self.np_random
 
     def step(
         self, action: Union[int, str, np.ndarray]
@@ -418,18 +534,17 @@ class HcraftEnv(Env):
                 "Actions should be integers corresponding the a transformation index."
             ) from e
 
+        self._sync_with_world()
         self.current_step += 1
 
         self.task_successes.step_reset()
         self.terminal_successes.step_reset()
 
-        success = self.state.apply(action)
-        if success:
-            reward = self.purpose.reward(self.state)
+        if self.transition_cache is not None:
+            success, reward, terminated = self._cached_transition(action)
         else:
-            reward = self.invalid_reward
-
-        terminated = self.purpose.is_terminal(self.state)
+            success, reward, terminated = self._transition(action)
+        self.last_action_valid = success
 
         self.task_successes.update(self.episodes)
         self.terminal_successes.update(self.episodes)
@@ -444,6 +559,53 @@ class HcraftEnv(Env):
             self.infos(),
         )
 
+    def _sync_with_world(self) -> None:
+        """Update structures derived from the world if elements were added to it."""
+        if self._world_version == self.world.version:
+            return
+        self._world_version = self.world.version
+        if self.purpose.built:
+            for task in self.purpose.tasks:
+                task.build(self.world)
+        if self.transition_cache is not None:
+            self.transition_cache.clear()
+        self._all_behaviors = None
+
+    def _transition(self, action: int) -> Tuple[bool, float, bool]:
+        success = self.state.apply(action)
+        if success:
+            reward = self.purpose.reward(self.state)
+        else:
+            reward = self.invalid_reward
+        terminated = self.purpose.is_terminal(self.state)
+        return success, reward, terminated
+
+    def _cached_transition(self, action: int) -> Tuple[bool, float, bool]:
+        key = self._transition_key()
+        transition = self.transition_cache.transition(key, action)
+        if transition is None:
+            success, reward, terminated = self._transition(action)
+            self.transition_cache.add_transition(
+                key, action, self._transition_key(), reward, success
+            )
+            return success, reward, terminated
+
+        state_key, tasks_key = transition.next_key
+        self.state.load_key(state_key)
+        if transition.success:
+            self.state.discovered_transformations[action] = 1
+        tasks_terminated = np.unpackbits(
+            np.frombuffer(tasks_key, dtype=np.uint8), count=len(self.purpose.tasks)
+        )
+        for task, terminated in zip(self.purpose.tasks, tasks_terminated):
+            task.terminated = bool(terminated)
+        return transition.success, transition.reward, self.purpose.terminated
+
+    def _transition_key(self) -> Tuple[bytes, bytes]:
+        tasks_terminated = [task.terminated for task in self.purpose.tasks]
+        tasks_key = np.packbits(np.array(tasks_terminated, dtype=bool)).tobytes()
+        return self.state.key, tasks_key
+
     def render(self, mode: Optional[str] = None, **_kwargs) -> Union[str, np.ndarray]:
         """Render the observation of the agent in a format depending on `render_mode`."""
         if mode is not None:
@@ -467,10 +629,14 @@ class HcraftEnv(Env):
             (np.ndarray): The first observation.
         """
 
-        if not self.purpose.built:
-            self.purpose.build(self)
-            self.task_successes = SuccessCounter(self.purpose.tasks)
-            self.terminal_successes = SuccessCounter(self.purpose.terminal_groups)
+        if Env is not object:
+            super().reset(seed=seed)
+        elif seed is not None:
+            # Without gymnasium, seed the generator as gymnasium would.
+            self.np_random = np.random.default_rng(seed)
+        self._sync_with_world()
+
+        self._build_purpose()
 
         self.current_step = 0
         self.current_score = 0
@@ -483,6 +649,43 @@ class HcraftEnv(Env):
         self.purpose.reset()
         return self.state.observation, self.infos()
 
+    def _build_purpose(self) -> None:
+        if not self.purpose.built:
+            self.purpose.build(self)
+        # The purpose may have been built without its counters.
+        if self.task_successes is None:
+            self.task_successes = SuccessCounter(self.purpose.tasks)
+            self.terminal_successes = SuccessCounter(self.purpose.terminal_groups)
+
+    def save_checkpoint(self, path: Union[str, Path]) -> Path:
+        """Save the progress of the environment to a small binary checkpoint file.
+
+        The state, step counters, scores, tasks terminations and success rates windows are saved,
+        but not the world. See `hcraft.checkpoint` for details.
+
+        Args:
+            path: Path of the checkpoint file.
+
+        Returns:
+            Path of the checkpoint file.
+        """
+        from hcraft.checkpoint import save_checkpoint  # pylint: disable=import-outside-toplevel
+
+        return save_checkpoint(self, path)
+
+    def load_checkpoint(self, path: Union[str, Path]) -> None:
+        """Resume the environment from a checkpoint file written by `save_checkpoint`.
+
+        Args:
+            path: Path of the checkpoint file.
+
+        Raises:
+            ValueError: If the checkpoint was saved with a different world or purpose.
+        """
+        from hcraft.checkpoint import load_checkpoint  # pylint: disable=import-outside-toplevel
+
+        load_checkpoint(self, path)
+
     def close(self):
         """Closes the environment."""
         if self.render_window is not None:
@@ -492,6 +695,9 @@ class HcraftEnv(Env):
     def all_behaviors(self) -> Dict[str, "Behavior"]:
         """All solving behaviors using hebg."""
         if self._all_behaviors is None:
+            # pylint: disable=import-outside-toplevel
+            from hcraft.solving_behaviors import build_all_solving_behaviors
+
             self._all_behaviors = build_all_solving_behaviors(self)
         return self._all_behaviors
 
@@ -519,9 +725,12 @@ class HcraftEnv(Env):
             assert task.is_terminated # Task is successfuly terminated
             ```
         """
+        # pylint: disable=import-outside-toplevel
+        from hcraft.solving_behaviors import task_to_behavior_name
+
         return self.all_behaviors[task_to_behavior_name(task)]
 
-    def planning_problem(self, **kwargs) -> HcraftPlanningProblem:
+    def planning_problem(self, **kwargs) -> "HcraftPlanningProblem":
         """Build this hcraft environment planning problem.
 
         Returns:
@@ -553,14 +762,18 @@ class HcraftEnv(Env):
             assert env.purpose.is_terminated # Purpose is achieved
             ```
         """
+        from hcraft.planning import HcraftPlanningProblem  # pylint: disable=import-outside-toplevel
+
         return HcraftPlanningProblem(self.state, self.name, self.purpose, **kwargs)
 
     def infos(self) -> dict:
-        infos = {
-            "action_is_legal": self.action_masks(),
-            "score": self.current_score,
-            "score_average": self.cumulated_score / self.episodes,
-        }
+        infos = {}
+        if self.legal_actions_info is LegalActionsInfo.MASK:
+            infos["action_is_legal"] = self.action_masks()
+        elif self.legal_actions_info is LegalActionsInfo.BITSET:
+            infos["legal_actions_bitset"] = self.legal_actions_bitset()
+        infos["score"] = self.current_score
+        infos["score_average"] = self.cumulated_score / self.episodes
         infos.update(self._tasks_infos())
         return infos
 
@@ -577,6 +790,10 @@ class HcraftEnv(Env):
 
         Create the rendering window if not existing yet.
         """
+        # pylint: disable=import-outside-toplevel
+        from hcraft.render.render import HcraftWindow
+        from hcraft.render.utils import surface_to_rgb_array
+
         if self.render_window is None:
             self.render_window = HcraftWindow()
         if not self.render_window.built:
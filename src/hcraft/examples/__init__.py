@@ -54,6 +54,12 @@ See `hcraft.examples.minecraft` for more details.
 |:---------------------------------|:------------------|:------------------------------------------------|
 | Treasure-v1                      | `treasure`        | `hcraft.examples.treasure`                      |
 
+## Gymnasium registration
+
+Importing `hcraft.examples` registers all the gym names above,
+which can also be made without importing it first as `gym.make("hcraft.examples:MineHcraft-v1")`.
+Registrations only hold entry points and lightweight arguments,
+worlds and purposes are only created when an environment is made.
 
 """
 
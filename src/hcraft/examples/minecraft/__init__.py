@@ -13,8 +13,7 @@ from typing import Optional
 import hcraft.examples.minecraft.items as items
 from hcraft.examples.minecraft.env import ALL_ITEMS, MineHcraftEnv
 
-from hcraft.purpose import Purpose, RewardShaping
-from hcraft.task import GetItemTask
+from hcraft.purpose import RewardShaping
 
 MINEHCRAFT_GYM_ENVS = []
 __all__ = ["MineHcraftEnv"]
@@ -25,6 +24,7 @@ try:
     import gymnasium as gym
 
     ENV_PATH = "hcraft.examples.minecraft.env:MineHcraftEnv"
+    SINGLE_ITEM_ENV_PATH = "hcraft.examples.minecraft.env:single_item_minehcraft_env"
 
     # Simple MineHcraft with no reward, only penalty on illegal actions
     gym.register(
@@ -53,18 +53,20 @@ try:
         reward_shaping: RewardShaping = RewardShaping.REQUIREMENTS_ACHIVEMENTS,
         version: int = 1,
     ):
-        purpose = Purpose(timestep_reward=timestep_reward)
-        purpose.add_task(
-            GetItemTask(item, reward=success_reward),
-            reward_shaping=reward_shaping,
-        )
+        # Only lightweight arguments are registered,
+        # the purpose is created by the entry point when the environment is made.
         if name is None:
             name = _to_camel_case(item.name)
         gym_name = f"MineHcraft-{name}-v{version}"
         gym.register(
             id=gym_name,
-            entry_point=ENV_PATH,
-            kwargs={"purpose": purpose},
+            entry_point=SINGLE_ITEM_ENV_PATH,
+            kwargs={
+                "item": item,
+                "success_reward": success_reward,
+                "timestep_reward": timestep_reward,
+                "reward_shaping": reward_shaping,
+            },
         )
         MINEHCRAFT_GYM_ENVS.append(gym_name)
 
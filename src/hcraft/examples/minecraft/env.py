@@ -4,11 +4,16 @@
 
 HierarchyCraft environment adapted to the Minecraft inventory
 
+The MineHcraft world is built once per process and start zone as a frozen template
+(see `minehcraft_world`) shared by all MineHcraft environments,
+each environment only creating its own state and purpose.
+
 """
 
 from pathlib import Path
+from typing import Dict
 
-from hcraft.elements import Stack
+from hcraft.elements import Item, Stack, Zone
 from hcraft.env import HcraftEnv
 from hcraft.examples.minecraft.items import (
     CLOSE_ENDER_PORTAL,
@@ -22,8 +27,9 @@ from hcraft.examples.minecraft.transformations import (
     build_minehcraft_transformations,
 )
 from hcraft.examples.minecraft.zones import FOREST, MC_ZONES, NETHER, STRONGHOLD
-from hcraft.purpose import platinium_purpose
-from hcraft.world import world_from_transformations
+from hcraft.purpose import Purpose, RewardShaping, platinium_purpose
+from hcraft.task import GetItemTask
+from hcraft.world import World, world_from_transformations
 
 ALL_ITEMS = set(
     MC_TOOLS + CRAFTABLE_ITEMS + [mcitem.item for mcitem in MC_FINDABLE_ITEMS]
@@ -39,13 +45,31 @@ class MineHcraftEnv(HcraftEnv):
     """
 
     def __init__(self, **kwargs):
-        mc_transformations = build_minehcraft_transformations()
         start_zone = kwargs.pop("start_zone", FOREST)
         purpose = kwargs.pop("purpose", None)
         if purpose == "all":
             purpose = get_platinum_purpose()
+        mc_world = minehcraft_world(start_zone)
+        super().__init__(world=mc_world, name="MineHcraft", purpose=purpose, **kwargs)
+        self.metadata["video.frames_per_second"] = kwargs.pop("fps", 10)
+
+
+_MINEHCRAFT_WORLDS: Dict[Zone, World] = {}
+
+
+def minehcraft_world(start_zone: Zone = FOREST) -> World:
+    """Frozen MineHcraft world template, built once per process and start zone.
+
+    Its compiled transformations and requirements graph are shared
+    by all MineHcraft environments starting in the same zone.
+
+    Args:
+        start_zone: Zone where the player starts. Defaults to FOREST.
+    """
+    mc_world = _MINEHCRAFT_WORLDS.get(start_zone)
+    if mc_world is None:
         mc_world = world_from_transformations(
-            mc_transformations,
+            build_minehcraft_transformations(),
             start_zone=start_zone,
             start_zones_items={
                 NETHER: [Stack(OPEN_NETHER_PORTAL)],
@@ -53,8 +77,36 @@ class MineHcraftEnv(HcraftEnv):
             },
         )
         mc_world.resources_path = Path(__file__).parent / "resources"
-        super().__init__(world=mc_world, name="MineHcraft", purpose=purpose, **kwargs)
-        self.metadata["video.frames_per_second"] = kwargs.pop("fps", 10)
+        _MINEHCRAFT_WORLDS[start_zone] = mc_world.freeze()
+    return mc_world
+
+
+def single_item_minehcraft_env(
+    item: Item,
+    success_reward: float = 10.0,
+    timestep_reward: float = -0.1,
+    reward_shaping: RewardShaping = RewardShaping.REQUIREMENTS_ACHIVEMENTS,
+    **kwargs,
+) -> MineHcraftEnv:
+    """MineHcraft environment whose purpose is to get the given item.
+
+    Entry point of the single item gymnasium environments like 'MineHcraft-Diamond-v1',
+    so their purpose is only created when they are made.
+
+    Args:
+        item: Item to get.
+        success_reward: Reward for getting the item. Defaults to 10.0.
+        timestep_reward: Reward at each timestep. Defaults to -0.1.
+        reward_shaping: Reward shaping of the task.
+            Defaults to RewardShaping.REQUIREMENTS_ACHIVEMENTS.
+        kwargs: Other arguments given to `MineHcraftEnv`.
+    """
+    purpose = Purpose(timestep_reward=timestep_reward)
+    purpose.add_task(
+        GetItemTask(item, reward=success_reward),
+        reward_shaping=reward_shaping,
+    )
+    return MineHcraftEnv(purpose=purpose, **kwargs)
 
 
 def get_platinum_purpose():
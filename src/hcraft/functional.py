@@ -0,0 +1,182 @@
+"""# Functional transitions
+
+Compute transitions and rewards of any batch of raw state arrays
+without stepping, nor mutating, an `hcraft.env.HcraftEnv`,
+for example to roll out a learned policy in a model or to write a custom search.
+
+States are plain arrays (see `ArrayStates`), including which tasks of the purpose
+are already terminated, so the whole state needed to compute rewards is explicit.
+
+## Example
+
+```python
+import numpy as np
+
+from hcraft.examples import MineHcraftEnv
+from hcraft.functional import Transition
+
+transition = Transition(MineHcraftEnv())
+states = transition.initial_states(64)
+actions = np.random.randint(transition.n_actions, size=64)
+next_states, valid, rewards = transition(states, actions)
+terminated = transition.terminated(next_states)
+```
+
+Given states are never modified, the same states can be expanded with other actions.
+
+Transitions follow exactly the steps of `hcraft.env.HcraftEnv`:
+invalid actions leave the state unchanged and give the invalid reward,
+valid ones give the timestep reward of the purpose plus the rewards of the tasks
+terminated for the first time.
+As in `hcraft.batched.BatchedHcraftEnv`, only purposes made of `hcraft.task.AchievementTask`
+are supported, their rewards only depending on the terminated tasks flags.
+
+"""
+
+from typing import TYPE_CHECKING, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from hcraft.batched import (
+    INVENTORY_DTYPE,
+    CompiledTransformations,
+    check_batchable,
+    _position_slots,
+    start_arrays,
+)
+
+if TYPE_CHECKING:
+    from hcraft.env import HcraftEnv
+
+
+class ArrayStates(NamedTuple):
+    """Batch of raw states arrays with the termination of the purpose tasks."""
+
+    player_inventory: np.ndarray
+    """Players inventories of shape (N, n_items)."""
+    position: np.ndarray
+    """One-hot encoded players positions of shape (N, n_zones)."""
+    zones_inventories: np.ndarray
+    """Zones inventories of shape (N, n_zones, n_zones_items)."""
+    tasks_terminated: np.ndarray
+    """Whether each task of the purpose is terminated, of shape (N, n_tasks)."""
+
+
+class Transition:
+    """Stateless, vectorized transition and reward function of an environment."""
+
+    def __init__(
+        self, env: "HcraftEnv", compiled: Optional[CompiledTransformations] = None
+    ) -> None:
+        """
+        Args:
+            env: Environment whose world, purpose and invalid reward are used.
+                It is not modified by transitions.
+            compiled: Already compiled transformations of the world to share.
+                Defaults to None, hence compiled from the world.
+
+        Raises:
+            TypeError: If a task of the purpose is not an achievement task.
+        """
+        check_batchable(env)
+        self.world = env.world
+        self.purpose = env.purpose
+        self.invalid_reward = env.invalid_reward
+        self.compiled = (
+            compiled if compiled is not None else CompiledTransformations(env.world)
+        )
+        tasks = self.purpose.tasks
+        self._tasks_rewards = np.array([task._reward for task in tasks], dtype=float)
+        self._terminal_groups = np.array(
+            [
+                [task in group.tasks for task in tasks]
+                for group in self.purpose.terminal_groups
+            ],
+            dtype=np.int64,
+        ).reshape(len(self.purpose.terminal_groups), len(tasks))
+
+    @property
+    def n_actions(self) -> int:
+        """Number of actions, one for each transformation of the world."""
+        return self.compiled.n_transformations
+
+    def initial_states(self, num_states: int = 1) -> ArrayStates:
+        """Copies of the world initial state with no terminated task."""
+        player, position, zones = start_arrays(self.world)
+        return ArrayStates(
+            np.repeat(player[np.newaxis], num_states, axis=0).astype(INVENTORY_DTYPE),
+            np.repeat(position[np.newaxis], num_states, axis=0).astype(INVENTORY_DTYPE),
+            np.repeat(zones[np.newaxis], num_states, axis=0).astype(INVENTORY_DTYPE),
+            np.zeros((num_states, len(self.purpose.tasks)), dtype=bool),
+        )
+
+    def __call__(
+        self, states: ArrayStates, actions: np.ndarray
+    ) -> Tuple[ArrayStates, np.ndarray, np.ndarray]:
+        """Next states and rewards of each state given the action taken in it.
+
+        Args:
+            states: Batch of states, left unchanged.
+            actions: Index of the transformation to apply in each state, of shape (N,).
+
+        Returns:
+            Next states, whether each action was valid of shape (N,)
+            and rewards of shape (N,).
+
+        Raises:
+            ValueError: If an action is out of the action space.
+        """
+        n_states = states.player_inventory.shape[0]
+        actions = np.asarray(actions, dtype=np.int64).reshape(n_states)
+        if np.any((actions < 0) | (actions >= self.n_actions)):
+            raise ValueError(f"Actions out of the action space: {actions}")
+
+        player = np.array(states.player_inventory, dtype=INVENTORY_DTYPE)
+        position = np.array(states.position, dtype=INVENTORY_DTYPE)
+        zones = np.array(states.zones_inventories, dtype=INVENTORY_DTYPE)
+        valid = self.compiled.actions_validity(
+            player, _position_slots(position), zones, actions
+        )
+        applied = np.flatnonzero(valid)
+        self.compiled.apply(player, position, zones, applied, actions[applied])
+
+        tasks_terminated = np.array(states.tasks_terminated, dtype=bool)
+        next_states = ArrayStates(player, position, zones, tasks_terminated)
+        tasks_terminal = self.tasks_terminal(next_states)
+        newly_terminated = tasks_terminal & ~tasks_terminated
+        rewards = np.where(
+            valid,
+            self.purpose.timestep_reward + newly_terminated @ self._tasks_rewards,
+            self.invalid_reward,
+        )
+        tasks_terminated |= tasks_terminal
+        return next_states, valid, rewards
+
+    def action_masks(self, states: ArrayStates) -> np.ndarray:
+        """Boolean masks of valid actions of shape (N, n_actions)."""
+        return self.compiled.action_masks(
+            states.player_inventory,
+            _position_slots(states.position),
+            states.zones_inventories,
+        )
+
+    def tasks_terminal(self, states: ArrayStates) -> np.ndarray:
+        """Whether each state is terminal for each task, of shape (N, n_tasks).
+
+        Unlike `ArrayStates.tasks_terminated`, it does not account for tasks
+        terminated before reaching the states.
+        """
+        terminal = np.zeros(
+            (states.player_inventory.shape[0], len(self.purpose.tasks)), dtype=bool
+        )
+        for index, task in enumerate(self.purpose.tasks):
+            terminal[:, index] = task._is_terminal(states)
+        return terminal
+
+    def terminated(self, states: ArrayStates) -> np.ndarray:
+        """Whether the purpose is terminated in each state, of shape (N,)."""
+        n_states = states.tasks_terminated.shape[0]
+        if self._terminal_groups.shape[0] == 0:
+            return np.zeros(n_states, dtype=bool)
+        missing_tasks = (~states.tasks_terminated).astype(np.int64)
+        return np.any(missing_tasks @ self._terminal_groups.T == 0, axis=1)
@@ -0,0 +1,644 @@
+"""# Mixed batched environments
+
+Step copies of several different HierarchyCraft environments together,
+for example to train a single agent on many tasks at once.
+
+Worlds have different numbers of items, zones and transformations,
+so all arrays are padded to the largest world:
+* Inventories have `n_items`, `n_zones` and `n_zones_items` columns,
+    padded columns staying at zero.
+* Observations are the padded player inventory, position and current zone inventory concatenated.
+* Actions range over `n_transformations`, padded actions being always illegal.
+
+Which columns are meaningful for each world is given by the boolean masks
+`items_mask`, `zones_mask`, `zones_items_mask`, `transformations_mask` and `observation_mask`,
+of shape (n_worlds, size). The world of each environment is given by `world_index`.
+
+The transformations of all worlds are compiled in stacked arrays (see `PaddedTransformations`),
+so the whole mixed batch is masked and stepped in a single vectorized call.
+
+## Example
+
+```python
+from hcraft.examples import TowerHcraftEnv, RecursiveHcraftEnv
+from hcraft.examples.minicraft import MINICRAFT_ENVS
+from hcraft.mixed import MixedBatchedHcraftEnv
+
+envs = [env_class(max_step=100) for env_class in MINICRAFT_ENVS]
+envs += [TowerHcraftEnv(height=3, width=2), RecursiveHcraftEnv(n_items=4)]
+env = MixedBatchedHcraftEnv(envs, num_envs=64)
+
+observations, infos = env.reset(seed=42)
+for _ in range(100):
+    actions = env.sample_legal_actions()
+    observations, rewards, terminated, truncated, infos = env.step(actions)
+```
+
+Environments of the same world are contiguous in the batch,
+their rows being given by `env.world_rows`.
+Like in `hcraft.batched`, only purposes made of `hcraft.task.AchievementTask` can be mixed.
+
+"""
+
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from hcraft.batched import (
+    INVENTORY_DTYPE,
+    MAX_BLOCK_SIZE,
+    NO_MAX,
+    NO_MIN,
+    BaseBatchedHcraftEnv,
+    CompiledTransformations,
+    allocate_buffers,
+    check_batchable,
+    start_arrays,
+)
+from hcraft.env import BoxSpace, DiscreteSpace
+from hcraft.state import HcraftState
+
+if TYPE_CHECKING:
+    from hcraft.env import HcraftEnv
+    from hcraft.world import World
+
+
+class PaddedTransformations:
+    """Compiled transformations of several worlds padded to the same shapes and stacked.
+
+    Arrays are those of `hcraft.batched.CompiledTransformations`
+    with a leading worlds dimension.
+    Padded transformations are flagged in `transformations_mask`
+    and padded items have no constraints.
+    """
+
+    def __init__(
+        self,
+        worlds: Sequence["World"],
+        compiled: Optional[Sequence[CompiledTransformations]] = None,
+    ) -> None:
+        """
+        Args:
+            worlds: Built worlds to compile the transformations of.
+            compiled: Already compiled transformations of each world.
+                Defaults to None, hence compiled from the worlds.
+        """
+        if compiled is None:
+            compiled = [CompiledTransformations(world) for world in worlds]
+        n_worlds = len(worlds)
+        self.n_items = max(world.n_items for world in worlds)
+        self.n_zones = max(world.n_zones for world in worlds)
+        self.n_zones_items = max(world.n_zones_items for world in worlds)
+        self.n_transformations = max(comp.n_transformations for comp in compiled)
+        n_zones_transfo = max(comp.zones_transformations.size for comp in compiled)
+
+        n_transfo = self.n_transformations
+        self.transformations_mask = np.zeros((n_worlds, n_transfo), dtype=bool)
+        """Which transformations exist in each world."""
+        self.check_zones = np.array([comp.check_zones for comp in compiled])
+        """Whether zones inventories constraints are checked in each world."""
+
+        def stack(name: str, shape: Tuple[int, ...], fill_value: int) -> np.ndarray:
+            stacked = np.full((n_worlds,) + shape, fill_value, dtype=INVENTORY_DTYPE)
+            for world_index, comp in enumerate(compiled):
+                array = getattr(comp, name)
+                padded_slots = tuple(slice(dim) for dim in array.shape)
+                stacked[world_index][padded_slots] = array
+            return stacked
+
+        player_shape = (n_transfo, self.n_items)
+        zones_items_shape = (n_transfo, self.n_zones_items)
+        zones_shape = (n_zones_transfo, self.n_zones, self.n_zones_items)
+        self.zone = stack("zone", (n_transfo,), -1).astype(np.int64)
+        self.destination = stack("destination", (n_transfo,), -1).astype(np.int64)
+        self.player_min = stack("player_min", player_shape, NO_MIN)
+        self.player_max = stack("player_max", player_shape, NO_MAX)
+        self.player_apply = stack("player_apply", player_shape, 0)
+        self.current_min = stack("current_min", zones_items_shape, NO_MIN)
+        self.current_max = stack("current_max", zones_items_shape, NO_MAX)
+        self.current_apply = stack("current_apply", zones_items_shape, 0)
+        self.destination_min = stack("destination_min", zones_items_shape, NO_MIN)
+        self.destination_max = stack("destination_max", zones_items_shape, NO_MAX)
+        self.destination_apply = stack("destination_apply", zones_items_shape, 0)
+        self.zones_transformations = stack(
+            "zones_transformations", (n_zones_transfo,), -1
+        ).astype(np.int64)
+        """Indexes of the transformations with operations on specific zones, -1 if padded."""
+        self.zones_min = stack("zones_min", zones_shape, NO_MIN)
+        self.zones_max = stack("zones_max", zones_shape, NO_MAX)
+        self.zones_apply = stack("zones_apply", zones_shape, 0)
+        self.zones_slot = stack("zones_slot", (n_transfo,), -1).astype(np.int64)
+        for world_index, comp in enumerate(compiled):
+            self.transformations_mask[world_index, : comp.n_transformations] = True
+
+    def action_masks(
+        self,
+        world_index: np.ndarray,
+        player_inventory: np.ndarray,
+        position_slots: np.ndarray,
+        zones_inventories: np.ndarray,
+    ) -> np.ndarray:
+        """Boolean masks of valid transformations for a batch of states of different worlds.
+
+        Args:
+            world_index: Index of the world of each state of shape (N,).
+            player_inventory: Padded players inventories of shape (N, n_items).
+            position_slots: Slots of the players positions of shape (N,), -1 if no zone.
+            zones_inventories: Padded zones inventories of shape (N, n_zones, n_zones_items).
+
+        Returns:
+            Boolean array of shape (N, n_transformations).
+        """
+        n_envs = player_inventory.shape[0]
+        masks = np.empty((n_envs, self.n_transformations), dtype=bool)
+        width = max(self.n_items, self.n_zones_items, 1)
+        block = max(1, MAX_BLOCK_SIZE // max(1, n_envs * width))
+        for start in range(0, self.n_transformations, block):
+            transfo = slice(start, start + block)
+            masks[:, transfo] = self._block_masks(
+                transfo,
+                world_index,
+                player_inventory,
+                position_slots,
+                zones_inventories,
+            )
+        if np.any(self.check_zones) and self.zones_transformations.shape[1] > 0:
+            self._zones_masks(masks, world_index, zones_inventories)
+        return masks
+
+    def _block_masks(
+        self,
+        transfo: slice,
+        world_index: np.ndarray,
+        player_inventory: np.ndarray,
+        position_slots: np.ndarray,
+        zones_inventories: np.ndarray,
+    ) -> np.ndarray:
+        position_slots = position_slots[:, np.newaxis]
+        zone = self.zone[world_index, transfo]
+        destination = self.destination[world_index, transfo]
+        masks = self.transformations_mask[world_index, transfo]
+        masks &= (zone < 0) | (zone == position_slots)
+        masks &= (destination < 0) | (destination != position_slots)
+
+        player_inventory = player_inventory[:, np.newaxis, :]
+        masks &= np.all(
+            player_inventory >= self.player_min[world_index, transfo], axis=-1
+        )
+        masks &= np.all(
+            player_inventory <= self.player_max[world_index, transfo], axis=-1
+        )
+        if not np.any(self.check_zones):
+            return masks
+
+        zones_valid = np.all(zones_inventories >= 0, axis=(1, 2))[:, np.newaxis]
+
+        env_indexes = np.arange(zones_inventories.shape[0])
+        current_slots = np.maximum(position_slots[:, 0], 0)
+        current_inventory = zones_inventories[env_indexes, current_slots]
+        current_inventory = current_inventory[:, np.newaxis, :]
+        zones_valid = zones_valid & np.all(
+            current_inventory >= self.current_min[world_index, transfo], axis=-1
+        )
+        zones_valid &= np.all(
+            current_inventory <= self.current_max[world_index, transfo], axis=-1
+        )
+
+        destination_inventory = zones_inventories[
+            env_indexes[:, np.newaxis], np.maximum(destination, 0)
+        ]
+        zones_valid &= np.all(
+            destination_inventory >= self.destination_min[world_index, transfo],
+            axis=-1,
+        )
+        zones_valid &= np.all(
+            destination_inventory <= self.destination_max[world_index, transfo],
+            axis=-1,
+        )
+        masks &= zones_valid | ~self.check_zones[world_index, np.newaxis]
+        return masks
+
+    def _zones_masks(
+        self, masks: np.ndarray, world_index: np.ndarray, zones_inventories: np.ndarray
+    ) -> None:
+        transformations = self.zones_transformations[world_index]
+        zones_inventories = zones_inventories[:, np.newaxis]
+        valid = np.all(zones_inventories >= self.zones_min[world_index], axis=(-2, -1))
+        valid &= np.all(zones_inventories <= self.zones_max[world_index], axis=(-2, -1))
+        valid |= ~self.check_zones[world_index, np.newaxis]
+        envs, slots = np.nonzero((transformations >= 0) & ~valid)
+        masks[envs, transformations[envs, slots]] = False
+
+    def apply(
+        self,
+        world_index: np.ndarray,
+        player_inventory: np.ndarray,
+        position: np.ndarray,
+        zones_inventories: np.ndarray,
+        envs: np.ndarray,
+        actions: np.ndarray,
+    ) -> None:
+        """Apply the given transformations in place on the given environments.
+
+        Transformations are expected to be valid.
+
+        Args:
+            world_index: Index of the world of each state of shape (N,).
+            player_inventory: Padded players inventories of shape (N, n_items).
+            position: Padded one-hot encoded players positions of shape (N, n_zones).
+            zones_inventories: Padded zones inventories of shape (N, n_zones, n_zones_items).
+            envs: Indexes of the environments to apply transformations on.
+            actions: Index of the transformation to apply for each of the envs.
+        """
+        worlds = world_index[envs]
+        player_inventory[envs] += self.player_apply[worlds, actions]
+        if position.shape[1] == 0:
+            return
+
+        in_zone = np.any(position[envs], axis=1)
+        envs, worlds, actions = envs[in_zone], worlds[in_zone], actions[in_zone]
+        position_slots = np.argmax(position[envs], axis=1)
+        zones_inventories[envs, position_slots] += self.current_apply[worlds, actions]
+
+        destination = self.destination[worlds, actions]
+        moving = destination >= 0
+        moving_envs, destination = envs[moving], destination[moving]
+        zones_inventories[moving_envs, destination] += self.destination_apply[
+            worlds[moving], actions[moving]
+        ]
+
+        zones_slot = self.zones_slot[worlds, actions]
+        with_zones_ops = zones_slot >= 0
+        zones_inventories[envs[with_zones_ops]] += self.zones_apply[
+            worlds[with_zones_ops], zones_slot[with_zones_ops]
+        ]
+
+        position[moving_envs] = 0
+        position[moving_envs, destination] = 1
+
+
+class MixedBatchedHcraftState:
+    """Batch of independent HierarchyCraft states of different worlds in padded arrays.
+
+    Arrays are the same as in `hcraft.batched.BatchedHcraftState`, padded to the largest world.
+    Discoveries are not tracked.
+    """
+
+    def __init__(
+        self,
+        worlds: Sequence["World"],
+        world_index: np.ndarray,
+        buffers: Optional[Mapping[str, np.ndarray]] = None,
+        compiled: Optional[PaddedTransformations] = None,
+    ) -> None:
+        """
+        Args:
+            worlds: Worlds to build the states for.
+            world_index: Index of the world of each state of the batch.
+            buffers: Preallocated arrays to hold the state,
+                by name ('player_inventory', 'position' and 'zones_inventories').
+                Missing arrays are allocated. Defaults to None.
+            compiled: Already compiled transformations of the worlds to share.
+                Defaults to None, hence compiled from the worlds.
+        """
+        self.worlds = list(worlds)
+        self.world_index = np.asarray(world_index, dtype=np.int64)
+        self.num_envs = self.world_index.shape[0]
+        self.compiled = (
+            compiled if compiled is not None else PaddedTransformations(worlds)
+        )
+
+        shapes = mixed_state_shapes(worlds, self.num_envs)
+        buffers = allocate_buffers(
+            {name: (shape, INVENTORY_DTYPE) for name, shape in shapes.items()}, buffers
+        )
+        self.player_inventory: np.ndarray = buffers["player_inventory"]
+        self.position: np.ndarray = buffers["position"]
+        self.zones_inventories: np.ndarray = buffers["zones_inventories"]
+
+        n_worlds = len(self.worlds)
+        self._start_player_inventory = np.zeros(
+            (n_worlds,) + shapes["player_inventory"][1:], dtype=INVENTORY_DTYPE
+        )
+        self._start_position = np.zeros(
+            (n_worlds,) + shapes["position"][1:], dtype=INVENTORY_DTYPE
+        )
+        self._start_zones = np.zeros(
+            (n_worlds,) + shapes["zones_inventories"][1:], dtype=INVENTORY_DTYPE
+        )
+        for index, world in enumerate(self.worlds):
+            player_inventory, position, zones_inventories = start_arrays(world)
+            self._start_player_inventory[index, : world.n_items] = player_inventory
+            self._start_position[index, : world.n_zones] = position
+            self._start_zones[index, : world.n_zones, : world.n_zones_items] = (
+                zones_inventories
+            )
+        self._has_zones = np.array([world.n_zones > 0 for world in self.worlds])
+        self.reset()
+
+    @property
+    def position_slots(self) -> np.ndarray:
+        """Slot of the zone where each player is, -1 if its world has no zone."""
+        if self.position.shape[1] == 0:
+            return np.full(self.num_envs, -1, dtype=np.int64)
+        return np.where(
+            self._has_zones[self.world_index], np.argmax(self.position, axis=1), -1
+        )
+
+    @property
+    def current_zone_inventory(self) -> np.ndarray:
+        """Padded inventory of the zone where each player is, zeros if no zone."""
+        if self.position.shape[1] == 0:
+            return np.zeros((self.num_envs, 0), dtype=INVENTORY_DTYPE)
+        env_indexes = np.arange(self.num_envs)
+        position_slots = self.position_slots
+        current = self.zones_inventories[env_indexes, np.maximum(position_slots, 0)]
+        current[position_slots < 0] = 0
+        return current
+
+    @property
+    def observation(self) -> np.ndarray:
+        """Padded observations of all players."""
+        return np.concatenate(
+            (self.player_inventory, self.position, self.current_zone_inventory),
+            axis=1,
+        )
+
+    def write_observation(self, out: np.ndarray) -> np.ndarray:
+        """Write padded observations of all players in the given array."""
+        n_items, n_zones = self.player_inventory.shape[1], self.position.shape[1]
+        out[:, :n_items] = self.player_inventory
+        out[:, n_items : n_items + n_zones] = self.position
+        out[:, n_items + n_zones :] = self.current_zone_inventory
+        return out
+
+    def action_masks(self) -> np.ndarray:
+        """Boolean masks of valid actions of shape (N, n_transformations)."""
+        return self.compiled.action_masks(
+            self.world_index,
+            self.player_inventory,
+            self.position_slots,
+            self.zones_inventories,
+        )
+
+    def apply(
+        self, actions: np.ndarray, masks: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Apply the given actions to update each state of the batch.
+
+        Args:
+            actions: Index of the transformation to apply in each state, of shape (N,).
+            masks: Legal actions masks of the current states if already known.
+
+        Returns:
+            Boolean array of shape (N,), True where the transformation was applied.
+        """
+        actions = np.asarray(actions, dtype=np.int64).reshape(self.num_envs)
+        if np.any((actions < 0) | (actions >= self.compiled.n_transformations)):
+            raise ValueError(f"Actions out of the action space: {actions}")
+        if masks is None:
+            masks = self.action_masks()
+        success = masks[np.arange(self.num_envs), actions]
+        envs = np.flatnonzero(success)
+        self.compiled.apply(
+            self.world_index,
+            self.player_inventory,
+            self.position,
+            self.zones_inventories,
+            envs,
+            actions[envs],
+        )
+        return success
+
+    def reset(self, envs: Optional[np.ndarray] = None) -> None:
+        """Reset the given states (all if None) to their world initial state."""
+        if envs is None:
+            envs = slice(None)
+        worlds = self.world_index[envs]
+        self.player_inventory[envs] = self._start_player_inventory[worlds]
+        self.position[envs] = self._start_position[worlds]
+        self.zones_inventories[envs] = self._start_zones[worlds]
+
+    def world_view(self, world_index: int, rows: slice) -> SimpleNamespace:
+        """Unpadded views of the arrays of the given rows, all of the given world."""
+        world = self.worlds[world_index]
+        return SimpleNamespace(
+            player_inventory=self.player_inventory[rows, : world.n_items],
+            position=self.position[rows, : world.n_zones],
+            zones_inventories=self.zones_inventories[
+                rows, : world.n_zones, : world.n_zones_items
+            ],
+        )
+
+    def __getitem__(self, index: int) -> "HcraftState":
+        """Copy of the state at the given index of the batch as an HcraftState of its world."""
+        view = self.world_view(self.world_index[index], index)
+        state = HcraftState(self.worlds[self.world_index[index]])
+        state.player_inventory[...] = view.player_inventory
+        state.position[...] = view.position
+        state.zones_inventories[...] = view.zones_inventories
+        state._update_discoveries()
+        return state
+
+    def __len__(self) -> int:
+        return self.num_envs
+
+
+class MixedBatchedHcraftEnv(BaseBatchedHcraftEnv):
+    """Batch of copies of several HierarchyCraft environments stepped together.
+
+    Rewards, terminations and truncations of each environment
+    follow exactly those of the `hcraft.env.HcraftEnv` it copies,
+    padded actions of a world being illegal and giving its invalid reward.
+    Arrays returned by `reset` and `step` may be buffers overwritten by the next call.
+    """
+
+    def __init__(
+        self,
+        envs: Sequence["HcraftEnv"],
+        num_envs: Union[int, Sequence[int]],
+        autoreset: bool = True,
+        buffers: Optional[Mapping[str, np.ndarray]] = None,
+    ) -> None:
+        """
+        Args:
+            envs: Environments to batch, their world, purpose, invalid reward
+                and maximum steps are used. Legal actions infos are those of the first one.
+            num_envs: Number of copies of each environment in the batch,
+                either the same for all or one per environment.
+            autoreset: If True, reset done environments at the end of each step.
+                Defaults to True.
+            buffers: Preallocated arrays by name, see `mixed_buffers_shapes`.
+                Missing arrays are allocated. Defaults to None.
+        """
+        if not envs:
+            raise ValueError("At least one environment is needed.")
+        for env in envs:
+            check_batchable(env)
+        self.envs = list(envs)
+        self.worlds = [env.world for env in self.envs]
+        self.num_envs_per_world = _num_envs_per_world(num_envs, len(self.envs))
+        shapes = mixed_buffers_shapes(self.envs, self.num_envs_per_world)
+        buffers = allocate_buffers(shapes, buffers)
+        super().__init__(
+            int(sum(self.num_envs_per_world)),
+            autoreset,
+            self.envs[0].legal_actions_info,
+            buffers,
+        )
+        self.world_index = np.repeat(np.arange(len(self.envs)), self.num_envs_per_world)
+        """Index of the environment copied by each row of the batch."""
+        bounds = np.concatenate(([0], np.cumsum(self.num_envs_per_world)))
+        self.world_rows = [
+            slice(int(start), int(stop)) for start, stop in zip(bounds, bounds[1:])
+        ]
+        """Rows of the batch copying each environment."""
+        self.state = MixedBatchedHcraftState(
+            self.worlds, self.world_index, buffers=buffers
+        )
+        compiled = self.state.compiled
+
+        self.items_mask = _sizes_mask(
+            [world.n_items for world in self.worlds], compiled.n_items
+        )
+        """Which player inventory columns are items of each world."""
+        self.zones_mask = _sizes_mask(
+            [world.n_zones for world in self.worlds], compiled.n_zones
+        )
+        """Which position columns are zones of each world."""
+        self.zones_items_mask = _sizes_mask(
+            [world.n_zones_items for world in self.worlds], compiled.n_zones_items
+        )
+        """Which zone inventory columns are zones items of each world."""
+        self.transformations_mask = compiled.transformations_mask
+        """Which actions are transformations of each world."""
+        self.observation_mask = np.concatenate(
+            (self.items_mask, self.zones_mask, self.zones_items_mask), axis=1
+        )
+        """Which observation columns are meaningful for each world."""
+
+        n_tasks = shapes["tasks_terminated"][0][1]
+        n_groups = max(len(env.purpose.terminal_groups) for env in self.envs)
+        self._tasks_rewards = np.zeros((len(self.envs), n_tasks))
+        self._terminal_groups = np.zeros((len(self.envs), n_groups, n_tasks), np.int64)
+        self._groups_mask = np.zeros((len(self.envs), n_groups), dtype=bool)
+        for index, env in enumerate(self.envs):
+            tasks = env.purpose.tasks
+            self._tasks_rewards[index, : len(tasks)] = [task._reward for task in tasks]
+            for group_index, group in enumerate(env.purpose.terminal_groups):
+                self._groups_mask[index, group_index] = True
+                self._terminal_groups[index, group_index, : len(tasks)] = [
+                    task in group.tasks for task in tasks
+                ]
+        self._timestep_rewards = np.array(
+            [env.purpose.timestep_reward for env in self.envs], dtype=float
+        )[self.world_index]
+        self._invalid_rewards = np.array(
+            [env.invalid_reward for env in self.envs], dtype=float
+        )[self.world_index]
+        self._max_steps = np.array(
+            [np.inf if env.max_step is None else env.max_step for env in self.envs]
+        )[self.world_index]
+
+    @property
+    def observation_space(self) -> BoxSpace:
+        """Padded observation space of a single environment."""
+        compiled = self.state.compiled
+        infinite_items = np.full(compiled.n_items + compiled.n_zones_items, np.inf)
+        high = np.insert(infinite_items, compiled.n_items, np.ones(compiled.n_zones))
+        return BoxSpace(low=np.zeros_like(high), high=high)
+
+    @property
+    def action_space(self) -> DiscreteSpace:
+        """Padded action space of a single environment."""
+        return DiscreteSpace(self.state.compiled.n_transformations)
+
+    def _tasks_terminal(self) -> np.ndarray:
+        tasks_terminal = self.tasks_terminated.copy()
+        for world_index, (env, rows) in enumerate(zip(self.envs, self.world_rows)):
+            if rows.start == rows.stop:
+                continue
+            view = self.state.world_view(world_index, rows)
+            for task_index, task in enumerate(env.purpose.tasks):
+                tasks_terminal[rows, task_index] = task._is_terminal(view)
+        return tasks_terminal
+
+    def _tasks_rewards_of(self, tasks: np.ndarray) -> np.ndarray:
+        return np.sum(tasks * self._tasks_rewards[self.world_index], axis=1)
+
+    def _purpose_terminated(self) -> np.ndarray:
+        missing_tasks = (~self.tasks_terminated).astype(np.int64)
+        missing_per_group = np.einsum(
+            "nt,ngt->ng", missing_tasks, self._terminal_groups[self.world_index]
+        )
+        return np.any(
+            (missing_per_group == 0) & self._groups_mask[self.world_index], axis=1
+        )
+
+
+def mixed_state_shapes(
+    worlds: Sequence["World"], num_envs: int
+) -> Dict[str, Tuple[int, ...]]:
+    """Shapes of the padded arrays of a batch of states of the given worlds."""
+    n_items = max(world.n_items for world in worlds)
+    n_zones = max(world.n_zones for world in worlds)
+    n_zones_items = max(world.n_zones_items for world in worlds)
+    return {
+        "player_inventory": (num_envs, n_items),
+        "position": (num_envs, n_zones),
+        "zones_inventories": (num_envs, n_zones, n_zones_items),
+    }
+
+
+def mixed_buffers_shapes(
+    envs: Sequence["HcraftEnv"], num_envs: Union[int, Sequence[int]]
+) -> Dict[str, Tuple[Tuple[int, ...], np.dtype]]:
+    """Shapes and dtypes of every array used by a `MixedBatchedHcraftEnv`.
+
+    Purposes of the environments are expected to be built.
+    """
+    worlds = [env.world for env in envs]
+    total_envs = int(sum(_num_envs_per_world(num_envs, len(envs))))
+    state_shapes = mixed_state_shapes(worlds, total_envs)
+    observation_size = (
+        state_shapes["player_inventory"][1]
+        + state_shapes["position"][1]
+        + state_shapes["zones_inventories"][2]
+    )
+    n_transformations = max(len(world.transformations) for world in worlds)
+    n_tasks = max(len(env.purpose.tasks) for env in envs)
+    shapes = {
+        name: (shape, np.dtype(INVENTORY_DTYPE)) for name, shape in state_shapes.items()
+    }
+    shapes.update(
+        {
+            "observation": ((total_envs, observation_size), np.dtype(INVENTORY_DTYPE)),
+            "action_masks": ((total_envs, n_transformations), np.dtype(bool)),
+            "rewards": ((total_envs,), np.dtype(np.float64)),
+            "valid": ((total_envs,), np.dtype(bool)),
+            "terminated": ((total_envs,), np.dtype(bool)),
+            "truncated": ((total_envs,), np.dtype(bool)),
+            "tasks_terminated": ((total_envs, n_tasks), np.dtype(bool)),
+            "current_step": ((total_envs,), np.dtype(np.int64)),
+        }
+    )
+    return shapes
+
+
+def _num_envs_per_world(
+    num_envs: Union[int, Sequence[int]], n_worlds: int
+) -> List[int]:
+    if isinstance(num_envs, (int, np.integer)):
+        return [int(num_envs)] * n_worlds
+    num_envs = [int(count) for count in num_envs]
+    if len(num_envs) != n_worlds:
+        raise ValueError(
+            f"Expected a number of copies for each of the {n_worlds} environments,"
+            f" got {len(num_envs)}."
+        )
+    return num_envs
+
+
+def _sizes_mask(sizes: List[int], width: int) -> np.ndarray:
+    return np.arange(width)[np.newaxis, :] < np.array(sizes)[:, np.newaxis]
@@ -98,7 +98,6 @@ from dataclasses import dataclass, field
 from enum import Enum
 from typing import TYPE_CHECKING, Dict, List, Optional, Set, Union
 
-import networkx as nx
 import numpy as np
 
 from hcraft.requirements import RequirementNode, req_node_name
@@ -403,6 +402,8 @@ def _required_subtasks(
             f"for given task type: {type(task)} of {task}"
         )
 
+    import networkx as nx  # pylint: disable=import-outside-toplevel
+
     requirements_acydigraph = env.world.requirements.acydigraph
     for requirement_node in goal_requirement_nodes:
         for ancestor in nx.ancestors(requirements_acydigraph, requirement_node):
@@ -0,0 +1,25 @@
+"""Display modes of the rendering widgets, importable without the rendering dependencies."""
+
+from enum import Enum
+
+
+class DisplayMode(Enum):
+    """Display modes for menus buttons."""
+
+    ALL = "all"
+    """Button are all displayed."""
+    DISCOVERED = "discovered"
+    """Button are displayed if they have been discovered or are currently available."""
+    CURRENT = "current"
+    """Button are only displayed if currently available."""
+
+
+class ContentMode(Enum):
+    """Display modes for buttons content."""
+
+    ALWAYS = "always"
+    """Button content are always displayed."""
+    DISCOVERED = "discovered"
+    """Button content are displayed if they have been discovered."""
+    NEVER = "never"
+    """Button content are never displayed."""
@@ -1,6 +1,5 @@
 """Widgets for rendering of the HierarchyCraft environments"""
 
-from enum import Enum
 from typing import TYPE_CHECKING, Dict, List, Optional, Union
 
 import numpy as np
@@ -19,6 +18,7 @@ except ImportError:
 from PIL.Image import Image
 
 from hcraft.elements import Item, Stack, Zone
+from hcraft.render.modes import ContentMode, DisplayMode
 from hcraft.render.utils import (
     _font_path,
     _get_scale_ratio,
@@ -36,28 +36,6 @@ if TYPE_CHECKING:
     from hcraft.env import HcraftEnv
 
 
-class DisplayMode(Enum):
-    """Display modes for menus buttons."""
-
-    ALL = "all"
-    """Button are all displayed."""
-    DISCOVERED = "discovered"
-    """Button are displayed if they have been discovered or are currently available."""
-    CURRENT = "current"
-    """Button are only displayed if currently available."""
-
-
-class ContentMode(Enum):
-    """Display modes for buttons content."""
-
-    ALWAYS = "always"
-    """Button content are always displayed."""
-    DISCOVERED = "discovered"
-    """Button content are displayed if they have been discovered."""
-    NEVER = "never"
-    """Button content are never displayed."""
-
-
 class InventoryWidget(Menu):
     def __init__(
         self,
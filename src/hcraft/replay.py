@@ -0,0 +1,363 @@
+"""# Replay
+
+Rebuild every intermediate state of a trajectory from its start state and its actions,
+without stepping an environment in a loop.
+
+Each valid transformation adds a known delta to the inventories and sets a known position,
+so `TrajectoryReplayer` gathers the deltas of all actions from the compiled transformations
+(see `hcraft.batched.CompiledTransformations`), sums them cumulatively,
+and then checks in one vectorized pass that every action was indeed valid in the state before it.
+
+States are given as flat vectors made of the player inventory,
+the one-hot encoded position and all the zones inventories (see `state_vector`).
+
+## Example
+
+```python
+from hcraft.examples import MineHcraftEnv
+from hcraft.replay import TrajectoryReplayer
+
+env = MineHcraftEnv()
+replayer = TrajectoryReplayer(env.world)
+states, valid = replayer.replay(actions)  # Of shapes (T, state_size) and (T,)
+```
+
+When whether each action was valid is not known,
+actions are first assumed valid, and replaying falls back to shorter and shorter windows
+down to single steps from the first action found invalid.
+Logs of mostly valid actions are thus replayed in a few vectorized passes.
+
+Recordings of `hcraft.trajectories.TrajectoryRecorder` holding the validity of each action,
+their states are rebuilt in a single pass per episode segment with `replay_shard`.
+
+"""
+
+from pathlib import Path
+from typing import Optional, Tuple, Union
+
+import numpy as np
+
+from hcraft.batched import INVENTORY_DTYPE, CompiledTransformations
+from hcraft.state import HcraftState
+from hcraft.world import World
+
+StateArrays = Tuple[np.ndarray, int, np.ndarray]
+"""Player inventory, position slot (-1 if no zone) and zones inventories of a state."""
+
+_MIN_WINDOW = 1
+_MAX_WINDOW = 4096
+
+
+class TrajectoryReplayer:
+    """Rebuild the states of trajectories in a world from their actions."""
+
+    def __init__(
+        self, world: World, compiled: Optional[CompiledTransformations] = None
+    ) -> None:
+        """
+        Args:
+            world: World of the trajectories to replay.
+            compiled: Already compiled transformations of the world to share.
+                Defaults to None, hence compiled from the world.
+        """
+        self.world = world
+        self.compiled = (
+            compiled if compiled is not None else CompiledTransformations(world)
+        )
+        self.state_size = state_size(world)
+
+    def replay(
+        self,
+        actions: np.ndarray,
+        start: Optional[Union[HcraftState, np.ndarray]] = None,
+        valid: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Rebuild the states reached after each action of a trajectory.
+
+        Args:
+            actions: Indexes of the transformations chosen at each step, of shape (T,).
+            start: State before the first action, either as an HcraftState or a state vector.
+                Defaults to None, hence the world start state.
+            valid: Whether each action was applied, if known.
+                Defaults to None, hence found while replaying.
+
+        Returns:
+            States after each action of shape (T, state_size)
+            and whether each action was valid of shape (T,).
+
+        Raises:
+            ValueError: If actions are out of the action space,
+                or if given validities do not match the replayed states.
+        """
+        actions = np.asarray(actions, dtype=np.int64).reshape(-1)
+        if np.any((actions < 0) | (actions >= self.compiled.n_transformations)):
+            raise ValueError(f"Actions out of the action space: {actions}")
+        start_arrays = self.start_arrays(start)
+        if valid is not None:
+            valid = np.asarray(valid, dtype=bool).reshape(actions.shape)
+            states = self.replay_known(actions, start_arrays, valid)
+            return self.vectors(*states), valid
+        return self._replay_unknown(actions, start_arrays)
+
+    def replay_known(
+        self, actions: np.ndarray, start: StateArrays, valid: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Rebuild states after each action when their validity is known.
+
+        Args:
+            actions: Indexes of the transformations chosen at each step, of shape (T,).
+            start: Arrays of the state before the first action.
+            valid: Whether each action was applied, of shape (T,).
+
+        Returns:
+            Players inventories, positions slots and zones inventories after each action.
+
+        Raises:
+            ValueError: If the given validities do not match the replayed states.
+        """
+        states = self._cumulate(actions, start, valid)
+        computed_valid = self._validity(actions, start, states)
+        mismatches = np.flatnonzero(computed_valid != valid)
+        if mismatches.size > 0:
+            step = int(mismatches[0])
+            raise ValueError(
+                f"Action {int(actions[step])} at step {step} was recorded as"
+                f" {'valid' if valid[step] else 'invalid'} but is not when replayed."
+            )
+        return states
+
+    def vectors(
+        self,
+        player_inventory: np.ndarray,
+        position_slots: np.ndarray,
+        zones_inventories: np.ndarray,
+    ) -> np.ndarray:
+        """Flat state vectors of a batch of states given by their arrays."""
+        world = self.world
+        n_states = player_inventory.shape[0]
+        position = np.zeros((n_states, self.world.n_zones), dtype=INVENTORY_DTYPE)
+        if self.world.n_zones > 0:
+            position[np.arange(n_states), position_slots] = 1
+        return np.concatenate(
+            (
+                player_inventory,
+                position,
+                zones_inventories.reshape(
+                    n_states, world.n_zones * world.n_zones_items
+                ),
+            ),
+            axis=1,
+        )
+
+    def observations(self, states: np.ndarray) -> np.ndarray:
+        """Observations of the given state vectors of shape (..., state_size).
+
+        Observations follow the layout of `hcraft.state.HcraftState.observation`,
+        the zones inventories being reduced to the inventory of the current zone.
+        """
+        world = self.world
+        n_items, n_zones = world.n_items, world.n_zones
+        batch_shape = states.shape[:-1]
+        player_inventory = states[..., :n_items]
+        if n_zones == 0:
+            return np.array(player_inventory, dtype=INVENTORY_DTYPE)
+        position = states[..., n_items : n_items + n_zones]
+        zones_inventories = states[..., n_items + n_zones :].reshape(
+            batch_shape + (n_zones, world.n_zones_items)
+        )
+        slots = np.argmax(position, axis=-1)[..., np.newaxis, np.newaxis]
+        current_inventory = np.take_along_axis(zones_inventories, slots, axis=-2)
+        return np.concatenate(
+            (player_inventory, position, current_inventory[..., 0, :]), axis=-1
+        ).astype(INVENTORY_DTYPE, copy=False)
+
+    def _replay_unknown(
+        self, actions: np.ndarray, start: StateArrays
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        n_steps = actions.shape[0]
+        states = np.zeros((n_steps, self.state_size), dtype=INVENTORY_DTYPE)
+        valid = np.zeros(n_steps, dtype=bool)
+        step, window = 0, _MAX_WINDOW
+        while step < n_steps:
+            window_actions = actions[step : step + window]
+            assumed_valid = np.ones(window_actions.shape[0], dtype=bool)
+            window_states = self._cumulate(window_actions, start, assumed_valid)
+            computed_valid = self._validity(window_actions, start, window_states)
+            invalid = np.flatnonzero(~computed_valid)
+            n_valid = window_actions.shape[0] if invalid.size == 0 else int(invalid[0])
+
+            accepted = slice(step, step + n_valid)
+            states[accepted] = self.vectors(
+                *(array[:n_valid] for array in window_states)
+            )
+            valid[accepted] = True
+            if n_valid > 0:
+                start = tuple(array[n_valid - 1] for array in window_states)
+            step += n_valid
+            if invalid.size == 0:
+                window = min(2 * window, _MAX_WINDOW)
+                continue
+
+            # The invalid action leaves the state unchanged.
+            states[step] = self.vectors(
+                *(np.asarray(array)[np.newaxis] for array in start)
+            )
+            step += 1
+            window = max(window // 2, _MIN_WINDOW)
+        return states, valid
+
+    def _cumulate(
+        self, actions: np.ndarray, start: StateArrays, valid: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """States after each action, applying the deltas of the valid ones."""
+        compiled = self.compiled
+        start_player, start_slot, start_zones = start
+        n_steps = actions.shape[0]
+        steps = np.flatnonzero(valid)
+        applied = actions[steps]
+
+        player_deltas = np.zeros((n_steps, self.world.n_items), dtype=INVENTORY_DTYPE)
+        player_deltas[steps] = compiled.player_apply[applied]
+        player_inventory = start_player + np.cumsum(
+            player_deltas, axis=0, dtype=INVENTORY_DTYPE
+        )
+
+        if self.world.n_zones == 0:
+            position_slots = np.full(n_steps, -1, dtype=np.int64)
+            zones_inventories = np.zeros(
+                (n_steps, 0, self.world.n_zones_items), dtype=INVENTORY_DTYPE
+            )
+            return player_inventory, position_slots, zones_inventories
+
+        destination = np.where(valid, compiled.destination[actions], -1)
+        last_move = np.where(destination >= 0, np.arange(n_steps), -1)
+        last_move = np.maximum.accumulate(last_move)
+        position_slots = np.where(
+            last_move >= 0, destination[np.maximum(last_move, 0)], start_slot
+        )
+        slots_before = np.concatenate(([start_slot], position_slots[:-1]))
+
+        zones_deltas = np.zeros((n_steps,) + start_zones.shape, dtype=INVENTORY_DTYPE)
+        zones_deltas[steps, slots_before[steps]] += compiled.current_apply[applied]
+        moving = destination[steps] >= 0
+        zones_deltas[steps[moving], destination[steps][moving]] += (
+            compiled.destination_apply[applied[moving]]
+        )
+        zones_slot = compiled.zones_slot[applied]
+        with_zones_ops = zones_slot >= 0
+        zones_deltas[steps[with_zones_ops]] += compiled.zones_apply[
+            zones_slot[with_zones_ops]
+        ]
+        zones_inventories = start_zones + np.cumsum(
+            zones_deltas, axis=0, dtype=INVENTORY_DTYPE
+        )
+        return player_inventory, position_slots, zones_inventories
+
+    def _validity(
+        self,
+        actions: np.ndarray,
+        start: StateArrays,
+        states: Tuple[np.ndarray, np.ndarray, np.ndarray],
+    ) -> np.ndarray:
+        """Whether each action is valid in the state before it."""
+        if actions.shape[0] == 0:
+            return np.zeros(0, dtype=bool)
+        before = [
+            np.concatenate((np.asarray(start_array)[np.newaxis], array[:-1]))
+            for start_array, array in zip(start, states)
+        ]
+        return self.compiled.actions_validity(*before, actions)
+
+    def start_arrays(
+        self, start: Optional[Union[HcraftState, np.ndarray]]
+    ) -> StateArrays:
+        """Arrays of the given state or state vector, of the world start state if None."""
+        world = self.world
+        if start is None:
+            start = HcraftState(world)
+        if isinstance(start, HcraftState):
+            zone_slot = start.current_zone_slot
+            return (
+                start.player_inventory.astype(INVENTORY_DTYPE),
+                -1 if zone_slot is None else zone_slot,
+                start.zones_inventories.astype(INVENTORY_DTYPE),
+            )
+        start = np.asarray(start, dtype=INVENTORY_DTYPE).reshape(self.state_size)
+        n_items, n_zones = world.n_items, world.n_zones
+        position = start[n_items : n_items + n_zones]
+        return (
+            start[:n_items],
+            int(np.argmax(position)) if n_zones > 0 else -1,
+            start[n_items + n_zones :].reshape(n_zones, world.n_zones_items),
+        )
+
+
+def state_size(world: World) -> int:
+    """Size of the flat state vectors of the given world."""
+    return world.n_items + world.n_zones + world.n_zones * world.n_zones_items
+
+
+def state_vector(state: HcraftState) -> np.ndarray:
+    """Flat vector of the given state, see `TrajectoryReplayer`."""
+    return np.concatenate(
+        (
+            state.player_inventory,
+            state.position,
+            state.zones_inventories.reshape(-1),
+        )
+    ).astype(INVENTORY_DTYPE)
+
+
+def replay_shard(
+    directory: Union[str, Path],
+    index: int,
+    replayer: Optional[TrajectoryReplayer] = None,
+) -> np.ndarray:
+    """Rebuild the states after each step of a shard recorded by a `TrajectoryRecorder`.
+
+    Args:
+        directory: Directory of the recording.
+        index: Index of the shard to replay.
+        replayer: Replayer of the recorded world to reuse.
+            Defaults to None, hence one of the world saved with the recording.
+
+    Returns:
+        States of shape (T, N, state_size) for the T steps of the N recorded environments.
+
+    Raises:
+        ValueError: If the recorded validities do not match the replayed states.
+    """
+    # pylint: disable=import-outside-toplevel
+    from hcraft.trajectories import WORLD_FILE, load_shard
+    from hcraft.world_file import load_world
+
+    if replayer is None:
+        replayer = TrajectoryReplayer(load_world(Path(directory) / WORLD_FILE))
+    shard = load_shard(directory, index)
+    actions, valid, resets = shard["actions"], shard["valid"], shard["resets"]
+    n_steps, num_envs = actions.shape
+    states = np.zeros((n_steps, num_envs, replayer.state_size), dtype=INVENTORY_DTYPE)
+    world_start = replayer.start_arrays(None)
+
+    keyframes = {
+        int(step): keyframe for keyframe, step in enumerate(shard["keyframes/steps"])
+    }
+    for env in range(num_envs):
+        # Segments start at every keyframe and every reset, whose states are known.
+        starts = sorted(set(keyframes) | set(np.flatnonzero(resets[:, env]).tolist()))
+        for segment_start, segment_stop in zip(starts, starts[1:] + [n_steps]):
+            if resets[segment_start, env]:
+                start = world_start
+            else:
+                keyframe = keyframes[segment_start]
+                start = (
+                    shard["keyframes/player_inventory"][keyframe, env],
+                    int(shard["keyframes/position"][keyframe, env]),
+                    shard["keyframes/zones_inventories"][keyframe, env],
+                )
+            segment = slice(segment_start, segment_stop)
+            segment_states = replayer.replay_known(
+                actions[segment, env].astype(np.int64), start, valid[segment, env]
+            )
+            states[segment, env] = replayer.vectors(*segment_states)
+    return states
@@ -73,29 +73,25 @@ width="90%"/>
 """
 
 from enum import Enum
+import heapq
 from pathlib import Path
 import random
-from PIL import Image, ImageDraw, ImageFont
 
 from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple, Union
 
-import networkx as nx
 import numpy as np
 
-import seaborn as sns
-from matplotlib import pyplot as plt
-import matplotlib.patches as mpatches
-from matplotlib.axes import Axes
-from matplotlib.legend_handler import HandlerPatch
-
-from hebg.graph import draw_networkx_nodes_images, get_nodes_by_level
-from hebg.layouts.metabased import leveled_layout_energy
 import hcraft
 
-from hcraft.render.utils import load_or_create_image, obj_image_path
 from hcraft.transformation import InventoryOperation, InventoryOwner
 
+# Graph, drawing and image libraries are slow to import,
+# so they are only imported when requirements graphs are built or drawn.
 if TYPE_CHECKING:
+    import networkx as nx
+    from matplotlib.axes import Axes
+    from PIL import Image
+
     from hcraft.elements import Item, Stack, Zone
     from hcraft.transformation import Transformation
     from hcraft.world import World
@@ -157,6 +153,8 @@ class RequirementTheme:
             return f"#{hexes.upper()}"
 
         if edge_colors is None:
+            import seaborn as sns  # pylint: disable=import-outside-toplevel
+
             edge_colors = sns.color_palette("colorblind")
             random.shuffle(edge_colors)
         self.edges_colors = [rgba_to_hex(*color) for color in edge_colors]
@@ -181,15 +179,17 @@ class DrawEngine(Enum):
 
 class Requirements:
     def __init__(self, world: "World"):
+        import networkx as nx  # pylint: disable=import-outside-toplevel
+
         self.world = world
         self.graph = nx.MultiDiGraph()
-        self._digraph: nx.DiGraph = None
-        self._acydigraph: nx.DiGraph = None
+        self._digraph: "nx.DiGraph" = None
+        self._acydigraph: "nx.DiGraph" = None
         self._build()
 
     def draw(
         self,
-        ax: Optional[Axes] = None,
+        ax: Optional["Axes"] = None,
         theme: Optional[RequirementTheme] = None,
         layout: "RequirementsGraphLayout" = "level",
         engine: DrawEngine = DrawEngine.PLT,
@@ -226,6 +226,8 @@ class Requirements:
             )
 
             if save_path:
+                from matplotlib import pyplot as plt  # pylint: disable=import-outside-toplevel
+
                 plt.gcf().savefig(
                     save_path, dpi=kwargs.get("dpi", 100), transparent=True
                 )
@@ -246,7 +248,7 @@ class Requirements:
             )
 
     @property
-    def digraph(self) -> nx.DiGraph:
+    def digraph(self) -> "nx.DiGraph":
         """Collapsed DiGraph of requirements."""
         if self._digraph is not None:
             return self._digraph
@@ -254,7 +256,7 @@ class Requirements:
         return self._digraph
 
     @property
-    def acydigraph(self) -> nx.DiGraph:
+    def acydigraph(self) -> "nx.DiGraph":
         """Collapsed leveled acyclic DiGraph of requirements."""
         if self._acydigraph is not None:
             return self._acydigraph
@@ -272,11 +274,19 @@ class Requirements:
         return self.graph.graph.get("width")
 
     def _build(self) -> None:
+        self._add_requirements_edges()
+        compute_levels(self.graph)
+
+    def _add_requirements_edges(self) -> None:
+        self._zones_adding_transformations = [
+            transfo
+            for transfo in self.world.transformations
+            if transfo.get_changes("zones", "add") is not None
+        ]
         self._add_requirements_nodes(self.world)
         self._add_start_edges(self.world)
         for edge_index, transfo in enumerate(self.world.transformations):
             self._add_transformation_edges(transfo, edge_index, transfo.zone)
-        compute_levels(self.graph)
 
     def _add_requirements_nodes(self, world: "World") -> None:
         self._add_nodes(world.items, RequirementNode.ITEM)
@@ -331,9 +341,8 @@ class Requirements:
             ):
                 alternative_transformations = [
                     alt_transfo
-                    for alt_transfo in self.world.transformations
-                    if alt_transfo.get_changes("zones", "add") is not None
-                    and _available_in_zones_stacks(
+                    for alt_transfo in self._zones_adding_transformations
+                    if _available_in_zones_stacks(
                         other_zone_items,
                         other_zone,
                         alt_transfo.get_changes("zones", "add"),
@@ -462,49 +471,14 @@ def compute_levels(graph: Requirements):
 
     """
 
-    def _compute_level_dependencies(graph: nx.MultiDiGraph, node):
-        predecessors = list(graph.predecessors(node))
-        if len(predecessors) == 0:
-            graph.nodes[node]["level"] = 0
-            return True
-        if "level" in graph.nodes[node]:
-            return True
-
-        pred_level_by_key = {}
-        for pred, _node, key in graph.in_edges(node, keys=True):
-            pred_level = graph.nodes[pred].get("level", None)
-            if key not in pred_level_by_key:
-                pred_level_by_key[key] = []
-            pred_level_by_key[key].append(pred_level)
-
-        max_level_by_index = []
-        for key, level_list in pred_level_by_key.items():
-            if None in level_list:
-                continue
-            max_level_by_index.append(max(level_list))
-        if len(max_level_by_index) == 0:
-            return False
-        level = 1 + min(max_level_by_index)
+    in_edges: Dict[str, List[Tuple[str, int]]] = {node: [] for node in graph.nodes()}
+    for pred, node, key in graph.edges(keys=True):
+        in_edges[node].append((pred, key))
+
+    for node, level in _sweep_levels(in_edges).items():
         graph.nodes[node]["level"] = level
-        return True
 
-    all_nodes_have_level = True
-    for _ in range(len(graph.nodes())):
-        all_nodes_have_level = True
-        incomplete_nodes = []
-        for node in graph.nodes():
-            incomplete = not _compute_level_dependencies(graph, node)
-            if incomplete:
-                incomplete_nodes.append(node)
-                all_nodes_have_level = False
-        if all_nodes_have_level:
-            break
-
-    if not all_nodes_have_level:
-        raise ValueError(
-            "Could not attribute levels to all nodes. "
-            f"Incomplete nodes: {incomplete_nodes}"
-        )
+    from hebg.graph import get_nodes_by_level  # pylint: disable=import-outside-toplevel
 
     nodes_by_level = get_nodes_by_level(graph)
     graph.graph["depth"] = max(level for level in nodes_by_level)
@@ -512,7 +486,117 @@ def compute_levels(graph: Requirements):
     return nodes_by_level
 
 
-def break_cycles_through_level(digraph: nx.DiGraph):
+def requirements_levels(world: "World") -> Dict[str, int]:
+    """Compute the hierachical levels of the world's requirements graph nodes.
+
+    Gives the same levels as `hcraft.requirements.compute_levels`
+    without building the full networkx requirements graph,
+    which is much faster for worlds with many transformations.
+
+    Args:
+        world: The World to compute requirements levels of.
+
+    Returns:
+        Dictionary of levels by node name.
+
+    """
+    requirements = _LevelsRequirements(world)
+    return _sweep_levels(requirements.graph.in_edges)
+
+
+def _sweep_levels(in_edges: Dict[str, List[Tuple[str, int]]]) -> Dict[str, int]:
+    """Attribute levels to nodes given their in-edges as (predecessor, key).
+
+    Levels are those obtained by sweeping repeatedly over nodes in order,
+    attributing a level to a node as soon as all predecessors of one of its keys have one,
+    but computed in a single pass with a priority queue.
+
+    A node is reached at a 'time' (sweep, position) and an edge from a predecessor
+    reached at (sweep, pred_position) is seen by the node during the same sweep
+    only if the predecessor comes first in the nodes order, else on the next sweep.
+
+    """
+    position = {node: index for index, node in enumerate(in_edges)}
+    out_edges: Dict[str, List[Tuple[str, int]]] = {node: [] for node in in_edges}
+    # Per node and key: [missing predecessors, time ready, max predecessors level]
+    keys_status: Dict[str, Dict[int, list]] = {}
+    queue: List[Tuple[Tuple[int, int], str]] = []
+    for node, node_in_edges in in_edges.items():
+        if len(node_in_edges) == 0:
+            heapq.heappush(queue, ((0, position[node]), node))
+            continue
+        node_keys = keys_status[node] = {}
+        for pred, key in node_in_edges:
+            out_edges[pred].append((node, key))
+            if key not in node_keys:
+                node_keys[key] = [0, (0, 0), 0]
+            node_keys[key][0] += 1
+
+    levels: Dict[str, int] = {}
+    while queue:
+        time, node = heapq.heappop(queue)
+        if node in levels:
+            continue
+        if node not in keys_status:
+            levels[node] = 0
+        else:
+            levels[node] = 1 + min(
+                max_level
+                for missing, key_time, max_level in keys_status[node].values()
+                if missing == 0 and key_time == time
+            )
+        sweep, pred_position = time
+        for succ, key in out_edges[node]:
+            if succ in levels:
+                continue
+            succ_position = position[succ]
+            seen_time = (sweep + int(pred_position >= succ_position), succ_position)
+            key_status = keys_status[succ][key]
+            key_status[0] -= 1
+            key_status[1] = max(key_status[1], seen_time)
+            key_status[2] = max(key_status[2], levels[node])
+            if key_status[0] == 0:
+                heapq.heappush(queue, (key_status[1], succ))
+
+    if len(levels) < len(in_edges):
+        incomplete_nodes = [node for node in in_edges if node not in levels]
+        raise ValueError(
+            "Could not attribute levels to all nodes. "
+            f"Incomplete nodes: {incomplete_nodes}"
+        )
+    return levels
+
+
+class _InEdgesGraph:
+    """Minimal stand-in for a networkx MultiDiGraph only keeping in-edges of nodes.
+
+    Nodes are kept in insertion order like networkx does,
+    as the order of nodes affects levels sweeps.
+
+    """
+
+    def __init__(self) -> None:
+        self.in_edges: Dict[str, List[Tuple[str, int]]] = {}
+
+    def add_node(self, node: str, **_attributes) -> None:
+        self.in_edges.setdefault(node, [])
+
+    def add_edge(self, pred: str, node: str, key: int, **_attributes) -> None:
+        self.add_node(pred)
+        self.add_node(node)
+        self.in_edges[node].append((pred, key))
+
+
+class _LevelsRequirements(Requirements):
+    """Requirements only building what is needed to compute levels."""
+
+    def __init__(self, world: "World"):
+        self.world = world
+        self.graph = _InEdgesGraph()
+        self._add_requirements_edges()
+
+
+def break_cycles_through_level(digraph: "nx.DiGraph"):
     """Break cycles in a leveled multidigraph by cutting edges from high to low levels."""
     acygraph = digraph.copy()
     nodes_level = acygraph.nodes(data="level", default=0)
@@ -522,8 +606,10 @@ def break_cycles_through_level(digraph: nx.DiGraph):
     return acygraph
 
 
-def collapse_as_digraph(multidigraph: nx.MultiDiGraph) -> nx.DiGraph:
+def collapse_as_digraph(multidigraph: "nx.MultiDiGraph") -> "nx.DiGraph":
     """Create a collapsed DiGraph from a MultiDiGraph by removing duplicated edges."""
+    import networkx as nx  # pylint: disable=import-outside-toplevel
+
     digraph = nx.DiGraph()
     digraph.graph = multidigraph.graph
     for node, data in multidigraph.nodes(data=True):
@@ -571,7 +657,7 @@ class RequirementsGraphLayout(Enum):
     """Classic spring layout."""
 
 
-def apply_color_theme(graph: nx.MultiDiGraph, theme: RequirementTheme):
+def apply_color_theme(graph: "nx.MultiDiGraph", theme: RequirementTheme):
     for node, node_type in graph.nodes(data="type"):
         graph.nodes[node]["color"] = theme.color_node(node_type)
         for pred, _, key in graph.in_edges(node, keys=True):
@@ -579,19 +665,24 @@ def apply_color_theme(graph: nx.MultiDiGraph, theme: RequirementTheme):
 
 
 def compute_layout(
-    digraph: nx.DiGraph, layout: Union[str, RequirementsGraphLayout] = "level"
+    digraph: "nx.DiGraph", layout: Union[str, RequirementsGraphLayout] = "level"
 ):
     layout = RequirementsGraphLayout(layout)
     if layout == RequirementsGraphLayout.LEVEL:
+        # pylint: disable=import-outside-toplevel
+        from hebg.layouts.metabased import leveled_layout_energy
+
         pos = leveled_layout_energy(digraph)
     elif layout == RequirementsGraphLayout.SPRING:
+        import networkx as nx  # pylint: disable=import-outside-toplevel
+
         pos = nx.spring_layout(digraph)
     return pos
 
 
 def _draw_on_plt_ax(
-    ax: Axes,
-    digraph: nx.DiGraph,
+    ax: "Axes",
+    digraph: "nx.DiGraph",
     theme: RequirementTheme,
     resources_path: Path,
     pos: dict,
@@ -606,6 +697,14 @@ def _draw_on_plt_ax(
         The Axes with requirements_graph drawn on it.
 
     """
+    # pylint: disable=import-outside-toplevel
+    import matplotlib.patches as mpatches
+    import networkx as nx
+    from hebg.graph import draw_networkx_nodes_images
+    from matplotlib.legend_handler import HandlerPatch
+
+    from hcraft.render.utils import load_or_create_image
+
     edges_colors = [
         theme.color_edges([et for et in RequirementEdge].index(edge_type))
         for _, _, edge_type in digraph.edges(data="type")
@@ -698,7 +797,7 @@ def _draw_on_plt_ax(
 
 
 def _draw_html(
-    graph: Union[nx.DiGraph, nx.MultiDiGraph],
+    graph: Union["nx.DiGraph", "nx.MultiDiGraph"],
     filepath: Path,
     resources_path: Path,
     pos: Dict[str, Tuple[float, float]],
@@ -738,7 +837,7 @@ def _draw_html(
     nt.write_html(str(filepath))
 
 
-def _compute_edge_alpha(pred, _succ, graph: nx.DiGraph):
+def _compute_edge_alpha(pred, _succ, graph: "nx.DiGraph"):
     alphas = [1, 1, 1, 1, 1, 0.5, 0.5, 0.5, 0.2, 0.2, 0.2]
     n_successors = len(list(graph.successors(pred)))
     alpha = 0.1
@@ -748,13 +847,18 @@ def _compute_edge_alpha(pred, _succ, graph: nx.DiGraph):
 
 
 def _serialize_pyvis(
-    graph: nx.MultiDiGraph,
+    graph: "nx.MultiDiGraph",
     resources_path: Path,
     add_edge_numbers: bool,
     with_web_uri: bool,
 ):
     """Make a serializable copy of a requirements graph
     by converting objects in it to dicts."""
+    # pylint: disable=import-outside-toplevel
+    import networkx as nx
+
+    from hcraft.render.utils import obj_image_path
+
     serializable_graph = nx.MultiDiGraph()
 
     for node, node_data in graph.nodes(data=True):
@@ -970,6 +1074,8 @@ def _get_text_image_uri(
     filename = text
     if flipped:
         filename = f"{text}_flipped"
+        from PIL import Image  # pylint: disable=import-outside-toplevel
+
         image = image.transpose(Image.ROTATE_180)
     number_path = numbers_dir / f"{filename}.png"
     image.save(number_path)
@@ -991,6 +1097,8 @@ def _create_text_image(
         A PIL image corresponding to the given object.
 
     """
+    from PIL import Image, ImageDraw, ImageFont  # pylint: disable=import-outside-toplevel
+
     image_size = (96, 48)
     image = Image.new("RGBA", image_size, (0, 0, 0, 0))
     draw = ImageDraw.Draw(image)
@@ -0,0 +1,828 @@
+"""# Heuristic search
+
+Solve the purpose of an HierarchyCraft environment with a best-first search running
+directly on the compiled transformations arrays (see `hcraft.batched.CompiledTransformations`),
+without any external planner.
+
+## Example
+
+```python
+from hcraft.examples import TowerHcraftEnv
+from hcraft.search import search_plan
+
+env = TowerHcraftEnv(height=3, width=3)
+env.reset()
+result = search_plan(env, algorithm="gbfs")
+
+for action in result.plan:
+    env.step(action)
+```
+
+A plan leads to a state where a terminal group of the purpose has all its tasks terminated,
+so following it terminates the environment.
+Each action costs one, so A* plans are the shortest ones.
+
+## Algorithms
+
+| Algorithm | Priority | Plans |
+|---|---|---|
+| `astar` | g + h | Optimal |
+| `wastar` | g + w * h | At most w times longer than optimal plans |
+| `gbfs` | h | Found fast but without guarantee |
+
+## Heuristics
+
+Heuristics relax the world: items and zones, once reached, stay available.
+
+| Heuristic | Estimate | Admissible |
+|---|---|---|
+| `hmax` | Actions to reach the most costly fact of the closest terminal group | Yes |
+| `hff` | Length of a relaxed plan getting the missing quantities of the closest terminal group | No |
+| `goal_count` | Number of tasks left in the closest terminal group | No |
+| `blind` | Zero, A* becoming a breadth-first search | Yes |
+
+`hmax` also counts the actions needed to get missing quantities
+when each action gives as many items as the most giving transformation.
+`hff` gets missing quantities backwards with the cheapest transformation
+giving each of them in the state, counting its applications and adding
+what it requires and consumes to the quantities to get.
+Items to place in any zone are placed where their own relaxed plan is the shortest.
+States from which a terminal group cannot be reached are pruned.
+
+By default, `gbfs` uses `hff` to find plans fast and others use `hmax`
+to keep their guarantees.
+
+## Search states
+
+Search states are the state arrays and which tasks of the terminal groups are terminated,
+since tasks stay terminated once achieved.
+Their compact keys (see `hcraft.state.HcraftState.key`) are used to detect duplicates.
+All successors of an expanded state are generated together
+(see `hcraft.batched.CompiledTransformations.expand_frontier`).
+
+"""
+
+import heapq
+import math
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from hcraft.batched import (
+    INVENTORY_DTYPE,
+    CompiledTransformations,
+    _position_slots,
+    start_arrays,
+)
+from hcraft.task import GetItemTask, GoToZoneTask, PlaceItemTask
+
+if TYPE_CHECKING:
+    from hcraft.env import HcraftEnv
+    from hcraft.purpose import Purpose
+    from hcraft.state import HcraftState
+    from hcraft.task import Task
+    from hcraft.world import World
+
+ALGORITHMS = ("astar", "wastar", "gbfs")
+HEURISTICS = ("hmax", "hff", "goal_count", "blind")
+
+_MAX_SWEEPS = 4
+
+
+class SearchResult(NamedTuple):
+    """Result of a heuristic search."""
+
+    plan: Optional[List[int]]
+    """Actions leading to the goal, None if no plan was found."""
+    expanded: int
+    """Number of expanded search states."""
+    generated: int
+    """Number of generated search states."""
+
+    @property
+    def solved(self) -> bool:
+        """Whether a plan was found."""
+        return self.plan is not None
+
+
+class _States(NamedTuple):
+    """Batch of states arrays, enough to check tasks termination."""
+
+    player_inventory: np.ndarray
+    position: np.ndarray
+    zones_inventories: np.ndarray
+
+
+class HeuristicSearch:
+    """Best-first search of plans achieving a purpose."""
+
+    def __init__(
+        self,
+        world: "World",
+        purpose: "Purpose",
+        compiled: Optional[CompiledTransformations] = None,
+    ) -> None:
+        """
+        Args:
+            world: Built world to search in.
+            purpose: Purpose whose terminal groups define the goal.
+            compiled: Already compiled transformations of the world to share.
+                Defaults to None, hence compiled from the world.
+
+        Raises:
+            ValueError: If the purpose has no terminal group.
+        """
+        if not purpose.terminal_groups:
+            raise ValueError(
+                "Cannot search plans for a purpose without terminal group."
+            )
+        self.world = world
+        self.purpose = purpose
+        self.compiled = (
+            compiled if compiled is not None else CompiledTransformations(world)
+        )
+
+        # Only tasks of terminal groups matter to reach the goal.
+        self.tasks: List["Task"] = list(
+            dict.fromkeys(
+                task for group in purpose.terminal_groups for task in group.tasks
+            )
+        )
+        for task in self.tasks:
+            if task._terminate_player_items is None:
+                task.build(world)
+        self._groups = np.array(
+            [
+                [task in group.tasks for task in self.tasks]
+                for group in purpose.terminal_groups
+            ],
+            dtype=bool,
+        )
+        self.relaxed = _RelaxedWorld(self.compiled, world)
+
+    def solve(
+        self,
+        state: Optional["HcraftState"] = None,
+        tasks_terminated: Optional[Sequence[bool]] = None,
+        algorithm: str = "astar",
+        heuristic: Optional[str] = None,
+        weight: float = 2.0,
+        max_expansions: Optional[int] = None,
+    ) -> SearchResult:
+        """Search a plan from the given state.
+
+        Args:
+            state: State to start from. Defaults to None, hence the world initial state.
+            tasks_terminated: Whether each task of the purpose is already terminated.
+                Defaults to None, hence no task.
+            algorithm: Search algorithm, one of `ALGORITHMS`. Defaults to 'astar'.
+            heuristic: Heuristic guiding the search, one of `HEURISTICS`.
+                Defaults to None, hence 'hff' for 'gbfs' and 'hmax' otherwise.
+            weight: Weight of the heuristic for 'wastar'. Defaults to 2.0.
+            max_expansions: Maximum number of expansions before giving up.
+                Defaults to None, hence no limit.
+
+        Returns:
+            Plan found with the search statistics, the plan being None
+            if there is none or the expansions limit was reached.
+
+        Raises:
+            ValueError: If the algorithm or the heuristic is unknown.
+        """
+        if algorithm not in ALGORITHMS:
+            raise ValueError(
+                f"Unknown algorithm {algorithm}, expected one of {ALGORITHMS}."
+            )
+        greedy = algorithm == "gbfs"
+        if heuristic is None:
+            heuristic = "hff" if greedy else "hmax"
+        if heuristic not in HEURISTICS:
+            raise ValueError(
+                f"Unknown heuristic {heuristic}, expected one of {HEURISTICS}."
+            )
+        if algorithm == "astar":
+            weight = 1.0
+
+        nodes = _Nodes(self.world, len(self.tasks))
+        start = self._start_states(state, tasks_terminated)
+        start_key = _keys(*start)[0]
+        start_h = self._heuristic(heuristic, *start)[0]
+        if not np.isfinite(start_h):
+            return SearchResult(None, 0, 1)
+        root = nodes.add(*start, parents=np.array([-1]), actions=np.array([-1]), g=0)[0]
+        nodes_keys = [start_key]
+        best_g: Dict[bytes, int] = {start_key: 0}
+        if greedy and self._is_goal(start[3])[0]:
+            return SearchResult([], 0, 1)
+
+        # Ties are broken towards smaller estimates, then first generated states.
+        open_list: List[Tuple[float, float, int]] = [(start_h, start_h, root)]
+        expanded, generated = 0, 1
+        while open_list:
+            _priority, _h, node = heapq.heappop(open_list)
+            g = int(nodes.g[node])
+            if g > best_g[nodes_keys[node]]:
+                # A shorter path to this state was found since it was pushed.
+                continue
+            if not greedy and self._is_goal(nodes.done[node : node + 1])[0]:
+                return SearchResult(nodes.plan(node), expanded, generated)
+            if max_expansions is not None and expanded >= max_expansions:
+                break
+            expanded += 1
+
+            parents, actions, successors = self._successors(nodes, node)
+            generated += len(actions)
+            heuristics = self._heuristic(heuristic, *successors)
+            goals = self._is_goal(successors[3])
+            keys = _keys(*successors)
+            children_g = g + 1
+            new = []
+            for index, key in enumerate(keys):
+                if not np.isfinite(heuristics[index]):
+                    continue
+                # Greedy search never reopens states, other ones do if reached sooner.
+                if key in best_g and (greedy or best_g[key] <= children_g):
+                    continue
+                best_g[key] = children_g
+                new.append(index)
+            if not new:
+                continue
+            new = np.array(new)
+            children = nodes.add(
+                *(array[new] for array in successors),
+                parents=parents[new],
+                actions=actions[new],
+                g=children_g,
+            )
+            nodes_keys.extend(keys[index] for index in new.tolist())
+            if greedy:
+                goal_children = np.flatnonzero(goals[new])
+                if goal_children.size > 0:
+                    plan = nodes.plan(int(children[goal_children[0]]))
+                    return SearchResult(plan, expanded, generated)
+            for child, h in zip(children.tolist(), heuristics[new].tolist()):
+                priority = h if greedy else children_g + weight * h
+                heapq.heappush(open_list, (priority, h, child))
+        return SearchResult(None, expanded, generated)
+
+    def _start_states(
+        self,
+        state: Optional["HcraftState"],
+        tasks_terminated: Optional[Sequence[bool]],
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        if state is None:
+            player, position, zones = start_arrays(self.world)
+        else:
+            player, position, zones = (
+                state.player_inventory,
+                state.position,
+                state.zones_inventories,
+            )
+        player = np.array(player, dtype=INVENTORY_DTYPE)[np.newaxis]
+        position = np.array(position, dtype=INVENTORY_DTYPE)[np.newaxis]
+        zones = np.array(zones, dtype=INVENTORY_DTYPE)[np.newaxis]
+        done = np.zeros((1, len(self.tasks)), dtype=bool)
+        if tasks_terminated is not None:
+            terminated = dict(zip(self.purpose.tasks, tasks_terminated))
+            done[0] = [bool(terminated.get(task, False)) for task in self.tasks]
+        done |= self._tasks_terminal(player, position, zones)
+        return player, position, zones, done
+
+    def _successors(
+        self, nodes: "_Nodes", node: int
+    ) -> Tuple[np.ndarray, np.ndarray, Tuple[np.ndarray, ...]]:
+        """All successors of a node with their parent and action."""
+        successors = self.compiled.expand_frontier(
+            nodes.player_inventory[node : node + 1],
+            nodes.position[node : node + 1],
+            nodes.zones_inventories[node : node + 1],
+        )
+        player, position, zones = successors[2:]
+        done = nodes.done[node][np.newaxis] | self._tasks_terminal(
+            player, position, zones
+        )
+        parents = successors.parents + node
+        return parents, successors.actions, (player, position, zones, done)
+
+    def _tasks_terminal(
+        self, player: np.ndarray, position: np.ndarray, zones: np.ndarray
+    ) -> np.ndarray:
+        states = _States(player, position, zones)
+        terminal = np.zeros((player.shape[0], len(self.tasks)), dtype=bool)
+        for index, task in enumerate(self.tasks):
+            terminal[:, index] = task._is_terminal(states)
+        return terminal
+
+    def _is_goal(self, done: np.ndarray) -> np.ndarray:
+        missing = (~done).astype(np.int64) @ self._groups.T.astype(np.int64)
+        return np.any(missing == 0, axis=1)
+
+    def _heuristic(
+        self,
+        heuristic: str,
+        player: np.ndarray,
+        position: np.ndarray,
+        zones: np.ndarray,
+        done: np.ndarray,
+    ) -> np.ndarray:
+        """Estimated number of actions left from each state, inf if the goal is unreachable."""
+        if heuristic == "blind":
+            return np.zeros(player.shape[0])
+        if heuristic == "goal_count":
+            return np.min((~done).astype(float) @ self._groups.T, axis=1)
+        if heuristic == "hff":
+            return self._relaxed_plans_lengths(player, position, zones, done)
+
+        facts_costs, _transfo_costs = self.relaxed.facts_costs(player, position, zones)
+        tasks_costs = np.zeros((player.shape[0], len(self.tasks)))
+        for index, task in enumerate(self.tasks):
+            tasks_costs[:, index] = self._task_cost(
+                task, facts_costs, player, position, zones
+            )
+        tasks_costs[done] = 0
+        # A terminal group is reached when all its tasks are, the closest one gives the estimate.
+        groups_costs = np.max(
+            np.where(self._groups, tasks_costs[:, np.newaxis], 0), axis=-1, initial=0
+        )
+        return np.min(groups_costs, axis=1)
+
+    def _task_cost(
+        self,
+        task: "Task",
+        facts_costs: np.ndarray,
+        player: np.ndarray,
+        position: np.ndarray,
+        zones: np.ndarray,
+    ) -> np.ndarray:
+        relaxed = self.relaxed
+        if isinstance(task, GetItemTask):
+            target = task._terminate_player_items
+            facts = np.flatnonzero(target > 0)
+            deficit = _actions_needed(target, player, relaxed.player_gain)
+            deficit = np.max(deficit, axis=-1, initial=0)
+        elif isinstance(task, PlaceItemTask):
+            target = task._terminate_zones_items
+            deficit = _actions_needed(target, zones, relaxed.zones_gain)
+            costs = np.where(target > 0, facts_costs[:, relaxed.zones_items_facts], 0)
+            zones_costs = np.maximum(
+                np.max(costs, axis=-1, initial=0), np.max(deficit, axis=-1, initial=0)
+            )
+            # Any zone may be used when none is given.
+            if task.zone is None:
+                return np.min(zones_costs, axis=-1, initial=math.inf)
+            return np.max(zones_costs, axis=-1, initial=0)
+        elif isinstance(task, GoToZoneTask):
+            facts = relaxed.zones_facts[task._terminate_position > 0]
+            deficit = np.zeros(player.shape[0])
+        else:
+            return _not_terminal(task, player, position, zones)
+        costs = np.max(facts_costs[:, facts], axis=-1, initial=0)
+        return np.maximum(costs, deficit)
+
+    def _relaxed_plans_lengths(
+        self,
+        player: np.ndarray,
+        position: np.ndarray,
+        zones: np.ndarray,
+        done: np.ndarray,
+    ) -> np.ndarray:
+        relaxed = self.relaxed
+        n_states = player.shape[0]
+        _facts_costs, transfo_costs = relaxed.facts_costs(player, position, zones)
+        # Items may be placed anywhere when no zone is given, so where it is the quickest.
+        anywhere = [
+            index
+            for index, task in enumerate(self.tasks)
+            if isinstance(task, PlaceItemTask) and task.zone is None
+        ]
+        placing_zones = {}
+        if anywhere:
+            targets = np.stack(
+                [self.tasks[index]._terminate_zones_items for index in anywhere]
+            )
+            placing_zones = dict(
+                zip(
+                    anywhere,
+                    self._placing_zones(
+                        targets, player, position, zones, transfo_costs
+                    ),
+                )
+            )
+
+        demands = np.zeros((n_states, len(self.tasks), relaxed.n_facts))
+        others = np.zeros((n_states, len(self.tasks)))
+        for index, task in enumerate(self.tasks):
+            if isinstance(task, GetItemTask):
+                demands[:, index, : relaxed.n_items] = task._terminate_player_items
+            elif isinstance(task, PlaceItemTask):
+                target = task._terminate_zones_items
+                if index in placing_zones:
+                    target = target[np.newaxis] * placing_zones[index][:, :, np.newaxis]
+                facts = relaxed.zones_items_facts.reshape(-1)
+                demands[:, index, facts] = target.reshape(-1, facts.size)
+            elif isinstance(task, GoToZoneTask):
+                demands[:, index, relaxed.zones_facts] = task._terminate_position
+            else:
+                others[:, index] = _not_terminal(task, player, position, zones)
+        demands[done] = 0
+        others[done] = 0
+
+        # Facts needed by the tasks left of each group.
+        groups_demands = np.stack(
+            [np.max(demands[:, group], axis=1, initial=0) for group in self._groups],
+            axis=1,
+        )
+        lengths = relaxed.plans_lengths(
+            player, position, zones, groups_demands, transfo_costs
+        )
+        return np.min(lengths + others @ self._groups.T, axis=1)
+
+    def _placing_zones(
+        self,
+        targets: np.ndarray,
+        player: np.ndarray,
+        position: np.ndarray,
+        zones: np.ndarray,
+        transfo_costs: np.ndarray,
+    ) -> np.ndarray:
+        """One-hot zones where each target is placed with the shortest relaxed plans.
+
+        Args:
+            targets: Quantities of items to place in any zone,
+                of shape (T, n_zones, n_zones_items).
+
+        Returns:
+            Zones of shape (T, N, n_zones).
+        """
+        relaxed = self.relaxed
+        n_targets, n_zones = targets.shape[:2]
+        demand = np.zeros((n_targets, n_zones, relaxed.n_facts))
+        demand[:, np.arange(n_zones)[:, np.newaxis], relaxed.zones_items_facts] = (
+            targets
+        )
+        # One demand for each target and zone the items could be placed in.
+        demands = np.broadcast_to(
+            demand.reshape(-1, relaxed.n_facts),
+            (player.shape[0], n_targets * n_zones, relaxed.n_facts),
+        )
+        lengths = relaxed.plans_lengths(player, position, zones, demands, transfo_costs)
+        closest = np.argmin(lengths.reshape(-1, n_targets, n_zones), axis=-1)
+        return np.eye(n_zones)[closest.T]
+
+
+def search_plan(
+    env: "HcraftEnv",
+    algorithm: str = "astar",
+    heuristic: Optional[str] = None,
+    weight: float = 2.0,
+    max_expansions: Optional[int] = None,
+) -> SearchResult:
+    """Search a plan achieving the purpose of the environment from its current state.
+
+    See `HeuristicSearch.solve` for details.
+    """
+    env._build_purpose()
+    search = HeuristicSearch(env.world, env.purpose)
+    return search.solve(
+        env.state,
+        tasks_terminated=[task.terminated for task in env.purpose.tasks],
+        algorithm=algorithm,
+        heuristic=heuristic,
+        weight=weight,
+        max_expansions=max_expansions,
+    )
+
+
+class _Nodes:
+    """Growing arrays of the search nodes."""
+
+    def __init__(self, world: "World", n_tasks: int, capacity: int = 1024) -> None:
+        self.size = 0
+        self.player_inventory = np.zeros((capacity, world.n_items), INVENTORY_DTYPE)
+        self.position = np.zeros((capacity, world.n_zones), INVENTORY_DTYPE)
+        self.zones_inventories = np.zeros(
+            (capacity, world.n_zones, world.n_zones_items), INVENTORY_DTYPE
+        )
+        self.done = np.zeros((capacity, n_tasks), dtype=bool)
+        self.parent = np.zeros(capacity, dtype=np.int64)
+        self.action = np.zeros(capacity, dtype=np.int64)
+        self.g = np.zeros(capacity, dtype=np.int64)
+        self._arrays = (
+            "player_inventory",
+            "position",
+            "zones_inventories",
+            "done",
+            "parent",
+            "action",
+            "g",
+        )
+
+    def add(
+        self,
+        player: np.ndarray,
+        position: np.ndarray,
+        zones: np.ndarray,
+        done: np.ndarray,
+        parents: np.ndarray,
+        actions: np.ndarray,
+        g: int,
+    ) -> np.ndarray:
+        """Add nodes and return their indexes."""
+        n_nodes = player.shape[0]
+        if self.size + n_nodes > self.g.shape[0]:
+            capacity = max(2 * self.g.shape[0], self.size + n_nodes)
+            for name in self._arrays:
+                array = getattr(self, name)
+                grown = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+                grown[: self.size] = array[: self.size]
+                setattr(self, name, grown)
+        indexes = np.arange(self.size, self.size + n_nodes)
+        self.player_inventory[indexes] = player
+        self.position[indexes] = position
+        self.zones_inventories[indexes] = zones
+        self.done[indexes] = done
+        self.parent[indexes] = parents
+        self.action[indexes] = actions
+        self.g[indexes] = g
+        self.size += n_nodes
+        return indexes
+
+    def plan(self, node: int) -> List[int]:
+        actions = []
+        while self.parent[node] >= 0:
+            actions.append(int(self.action[node]))
+            node = int(self.parent[node])
+        return actions[::-1]
+
+
+def _keys(
+    player: np.ndarray, position: np.ndarray, zones: np.ndarray, done: np.ndarray
+) -> List[bytes]:
+    """Compact keys of a batch of search states."""
+    n_states = player.shape[0]
+    values = np.concatenate(
+        (
+            player.astype(np.int32, copy=False),
+            _position_slots(position)[:, np.newaxis].astype(np.int32),
+            zones.reshape(n_states, -1).astype(np.int32, copy=False),
+        ),
+        axis=1,
+    ).view(np.uint8)
+    keys = np.ascontiguousarray(
+        np.concatenate((values, np.packbits(done, axis=1)), axis=1)
+    )
+    return keys.view(np.dtype((np.void, keys.shape[1]))).ravel().tolist()
+
+
+class _RelaxedWorld:
+    """Transformations relaxed to the items and zones they require, consume and give.
+
+    Facts are the items of the player, the items of each zone, then the zones.
+    Transformations operating on the current zone without being restricted to one
+    are relaxed once per zone.
+    """
+
+    def __init__(self, compiled: CompiledTransformations, world: "World") -> None:
+        self.n_items = n_items = world.n_items
+        n_zones, n_zones_items = world.n_zones, world.n_zones_items
+        self.zones_items_facts = n_items + np.arange(n_zones * n_zones_items).reshape(
+            n_zones, n_zones_items
+        )
+        """Fact of each item of each zone, of shape (n_zones, n_zones_items)."""
+        self.zones_facts = n_items + n_zones * n_zones_items + np.arange(n_zones)
+        self.n_facts = n_items + n_zones * n_zones_items + n_zones
+
+        relaxed = []
+        for transfo in range(compiled.n_transformations):
+            operates_current = np.any(compiled.current_min[transfo] > 0) or np.any(
+                compiled.current_apply[transfo] != 0
+            )
+            if compiled.zone[transfo] >= 0:
+                relaxed.append((transfo, compiled.zone[transfo]))
+            elif operates_current and n_zones > 0:
+                relaxed.extend((transfo, zone) for zone in range(n_zones))
+            else:
+                relaxed.append((transfo, -1))
+        self.n_transformations = len(relaxed)
+
+        # Quantities of each fact required, consumed and given by each transformation.
+        shape = (self.n_transformations, self.n_facts)
+        self.requirements = np.zeros(shape)
+        self.consumed = np.zeros(shape)
+        self.gains = np.zeros(shape)
+        for index, (transfo, zone) in enumerate(relaxed):
+            self._relax(compiled, index, transfo, zone)
+
+        # Sparse pairs grouped by transformation (requirements) and by fact (gains),
+        # so costs are aggregated with reduceat.
+        self._required_transfo, self._required_facts = np.nonzero(self.requirements)
+        self._requiring, self._requirements_starts = np.unique(
+            self._required_transfo, return_index=True
+        )
+        giving_facts, self._giving_transfo = np.nonzero(self.gains.T)
+        self._given, self._gains_starts = np.unique(giving_facts, return_index=True)
+
+        facts_gains = np.max(self.gains, axis=0, initial=0)
+        self.player_gain = facts_gains[:n_items]
+        self.zones_gain = facts_gains[self.zones_items_facts]
+
+    def _relax(
+        self, compiled: CompiledTransformations, index: int, transfo: int, zone: int
+    ) -> None:
+        """Fill the requirements, consumptions and gains of a relaxed transformation."""
+        requirements, consumed, gains = (
+            self.requirements[index],
+            self.consumed[index],
+            self.gains[index],
+        )
+
+        def operate(facts, minimum, apply) -> None:
+            requirements[facts] = np.maximum(requirements[facts], minimum)
+            consumed[facts] += np.maximum(-apply, 0)
+            gains[facts] = np.maximum(gains[facts], apply)
+
+        operate(
+            slice(0, self.n_items),
+            compiled.player_min[transfo],
+            compiled.player_apply[transfo],
+        )
+        if zone >= 0:
+            requirements[self.zones_facts[zone]] = 1
+            operate(
+                self.zones_items_facts[zone],
+                compiled.current_min[transfo],
+                compiled.current_apply[transfo],
+            )
+        destination = compiled.destination[transfo]
+        if destination >= 0:
+            gains[self.zones_facts[destination]] = 1
+            operate(
+                self.zones_items_facts[destination],
+                compiled.destination_min[transfo],
+                compiled.destination_apply[transfo],
+            )
+        zones_slot = compiled.zones_slot[transfo]
+        if zones_slot >= 0:
+            operate(
+                self.zones_items_facts.reshape(-1),
+                compiled.zones_min[zones_slot].reshape(-1),
+                compiled.zones_apply[zones_slot].reshape(-1),
+            )
+
+    def facts_costs(
+        self, player: np.ndarray, position: np.ndarray, zones: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Relaxed number of actions needed to reach each fact and apply each transformation.
+
+        Returns:
+            Costs of facts of shape (N, n_facts) and of transformations
+            of shape (N, n_transformations), inf if unreachable.
+        """
+        n_states = player.shape[0]
+        costs = np.where(self._have(player, position, zones) > 0, 0.0, math.inf)
+        transfo_costs = np.ones((n_states, self.n_transformations))
+        for _ in range(self.n_facts + 1):
+            transfo_costs = np.ones((n_states, self.n_transformations))
+            if self._requiring.size > 0:
+                transfo_costs[:, self._requiring] += np.maximum.reduceat(
+                    costs[:, self._required_facts], self._requirements_starts, axis=1
+                )
+            if self._given.size == 0:
+                break
+            given = np.minimum.reduceat(
+                transfo_costs[:, self._giving_transfo], self._gains_starts, axis=1
+            )
+            updated = costs.copy()
+            updated[:, self._given] = np.minimum(costs[:, self._given], given)
+            if np.array_equal(updated, costs):
+                break
+            costs = updated
+        return costs, transfo_costs
+
+    def plans_lengths(
+        self,
+        player: np.ndarray,
+        position: np.ndarray,
+        zones: np.ndarray,
+        demand: np.ndarray,
+        transfo_costs: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """Number of actions of relaxed plans getting the demanded quantities of facts.
+
+        Missing quantities are obtained from the last needed facts to the first ones,
+        each with its cheapest transformation in the state (its best supporter),
+        adding what this transformation requires and consumes to the demand.
+
+        Args:
+            demand: Quantities of facts to get of shape (N, n_facts),
+                or (N, K, n_facts) for K demands from each state.
+            transfo_costs: Costs of transformations in the states given by `facts_costs`.
+                Defaults to None, hence computed.
+
+        Returns:
+            Lengths of shape (N,), or (N, K), inf if a demanded fact is unreachable.
+        """
+        shape = demand.shape[:-1]
+        # Demands from the same state share its facts and supporters.
+        n_demands = int(np.prod(shape[1:], dtype=np.int64))
+        demand = demand.reshape(-1, self.n_facts).copy()
+        have = self._have(player, position, zones).astype(float)
+        have = np.repeat(have, n_demands, axis=0)
+        if self._given.size == 0:
+            missing = np.any(demand > have, axis=1)
+            return np.where(missing, math.inf, 0.0).reshape(shape)
+        if transfo_costs is None:
+            _facts_costs, transfo_costs = self.facts_costs(player, position, zones)
+        supporters = self._supporters(transfo_costs)
+        levels = transfo_costs[np.arange(player.shape[0])[:, np.newaxis], supporters]
+        supporters = np.repeat(supporters, n_demands, axis=0)
+        levels = np.repeat(levels, n_demands, axis=0)
+        n_states = demand.shape[0]
+        lengths = np.zeros(n_states)
+        finite_levels = np.unique(levels[np.isfinite(levels)])[::-1]
+        levels_facts = [np.nonzero(levels == level) for level in finite_levels]
+        # Items already owned may be supported later than what requires more of them,
+        # so levels are swept again while some reachable quantity is missing.
+        for _sweep in range(_MAX_SWEEPS):
+            swept = False
+            for level_states, level_given in levels_facts:
+                facts = self._given[level_given]
+                missing = demand[level_states, facts] - have[level_states, facts]
+                needing = missing > 0
+                if not np.any(needing):
+                    continue
+                swept = True
+                states, given = level_states[needing], level_given[needing]
+                transfos = supporters[states, given]
+                needed = np.ceil(
+                    missing[needing] / self.gains[transfos, facts[needing]]
+                )
+                # A transformation supporting several facts is applied as many times
+                # as the most missing of them needs.
+                pairs, pairs_index = np.unique(
+                    states * self.n_transformations + transfos, return_inverse=True
+                )
+                applications = np.zeros(pairs.size)
+                np.maximum.at(applications, pairs_index, needed)
+                applied_states, applied = np.divmod(pairs, self.n_transformations)
+                # Pairs are sorted by state, so each state sums its own applications.
+                rows, starts = np.unique(applied_states, return_index=True)
+                lengths[rows] += np.add.reduceat(applications, starts)
+                applications = applications[:, np.newaxis]
+                demand[rows] += np.add.reduceat(
+                    applications * self.consumed[applied], starts, axis=0
+                )
+                have[rows] += np.add.reduceat(
+                    applications * self.gains[applied], starts, axis=0
+                )
+                demand[rows] = np.maximum(
+                    demand[rows],
+                    np.maximum.reduceat(self.requirements[applied], starts, axis=0),
+                )
+            if not swept:
+                break
+        # Quantities still missing count once per unit, unreachable ones make the goal so.
+        missing = np.maximum(demand - have, 0)
+        unreachable = np.ones((n_states, self.n_facts), dtype=bool)
+        unreachable[:, self._given] = ~np.isfinite(levels)
+        lengths += np.sum(missing, axis=1)
+        lengths = np.where(
+            np.any(unreachable & (missing > 0), axis=1), math.inf, lengths
+        )
+        return lengths.reshape(shape)
+
+    def _supporters(self, transfo_costs: np.ndarray) -> np.ndarray:
+        """Cheapest transformation giving each given fact, of shape (N, n_given)."""
+        giving_costs = transfo_costs[:, self._giving_transfo]
+        cheapest = np.minimum.reduceat(giving_costs, self._gains_starts, axis=1)
+        counts = np.diff(np.append(self._gains_starts, self._giving_transfo.size))
+        pairs = np.where(
+            giving_costs == np.repeat(cheapest, counts, axis=1),
+            np.arange(self._giving_transfo.size),
+            self._giving_transfo.size,
+        )
+        first = np.minimum.reduceat(pairs, self._gains_starts, axis=1)
+        return self._giving_transfo[np.minimum(first, self._giving_transfo.size - 1)]
+
+    def _have(
+        self, player: np.ndarray, position: np.ndarray, zones: np.ndarray
+    ) -> np.ndarray:
+        zones_items = zones.reshape(player.shape[0], -1)
+        return np.concatenate((player, zones_items, position), axis=1)
+
+
+def _not_terminal(
+    task: "Task", player: np.ndarray, position: np.ndarray, zones: np.ndarray
+) -> np.ndarray:
+    states = _States(player, position, zones)
+    return (~np.asarray(task._is_terminal(states), dtype=bool)).astype(float)
+
+
+def _actions_needed(
+    target: np.ndarray, inventory: np.ndarray, gain: np.ndarray
+) -> np.ndarray:
+    """Actions needed to get from the inventory to the target, inf if impossible."""
+    missing = np.maximum(target - inventory, 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        needed = np.ceil(missing / gain)
+    return np.where(missing > 0, needed, 0)
@@ -0,0 +1,295 @@
+"""# Environment server
+
+Host a batch of HierarchyCraft environments (see `hcraft.batched.BatchedHcraftEnv`)
+behind a Unix domain socket, so that learners in other processes,
+possibly not even written in Python, can drive thousands of episodes
+with one round trip per batched request and no pickling.
+
+## Command line
+
+```bash
+hcraft serve --socket /tmp/hcraft.sock --num-envs 1024 --max-step 100 minecraft
+```
+
+Every argument after the serve options describes the environment as for `hcraft --help`.
+A single environment is simply served with `--num-envs 1`.
+
+## Python client
+
+```python
+from hcraft.server import HcraftClient
+
+client = HcraftClient("/tmp/hcraft.sock")
+observations = client.reset(seed=0)
+for _ in range(100):
+    actions = client.sample_legal_actions()
+    observations, rewards, terminated, truncated, final_obs = client.step(actions)
+client.close()
+```
+
+## Protocol
+
+Every message is a frame made of a 5 bytes header,
+a command (or status) `uint8` followed by the payload size as `uint32`,
+then the payload itself.
+All numbers are little-endian and arrays are sent row-major without any padding.
+
+With N the number of environments, O the observation size and A the number of actions,
+requests and the payloads of their responses are:
+
+| Command | Request payload | Response payload |
+|---|---|---|
+| `INFO = 0` | empty | `uint32` N, O, A |
+| `RESET = 1` | empty, or `int64` seed | `int32[N, O]` observations |
+| `STEP = 2` | `int64[N]` actions | `int32[N, O]` observations, `float64[N]` rewards, `uint8[N]` terminated, `uint8[N]` truncated, `uint8[N]` done, `int32[D, O]` final observations of the D done environments |
+| `MASKS = 3` | empty | `uint8[N, A]` legal actions masks |
+| `CLOSE = 4` | empty | empty, then the connection is closed |
+
+Done environments are automatically reset, observations being those of the new episodes.
+Responses start with the status `OK = 0`, or `ERROR = 1` followed by an utf-8 error message.
+
+Clients are served one at a time, environments keeping their state between connections.
+
+"""
+
+import os
+import socket
+import socketserver
+import struct
+from enum import IntEnum
+from typing import TYPE_CHECKING, Optional, Tuple
+
+import numpy as np
+
+from hcraft.batched import BatchedHcraftEnv, sample_from_masks
+from hcraft.env import LegalActionsInfo
+
+if TYPE_CHECKING:
+    from hcraft.env import HcraftEnv
+
+
+HEADER = struct.Struct("<BI")
+"""Header of every frame: command or status, then payload size."""
+
+
+class Command(IntEnum):
+    """Requests a client can send to the server."""
+
+    INFO = 0
+    RESET = 1
+    STEP = 2
+    MASKS = 3
+    CLOSE = 4
+
+
+class Status(IntEnum):
+    """Status starting every response of the server."""
+
+    OK = 0
+    ERROR = 1
+
+
+class HcraftServer(socketserver.UnixStreamServer):
+    """Unix domain socket server of a batch of HierarchyCraft environments."""
+
+    def __init__(
+        self,
+        socket_path: str,
+        env: "HcraftEnv",
+        num_envs: int = 1,
+        num_threads: Optional[int] = None,
+    ) -> None:
+        """
+        Args:
+            socket_path: Path of the Unix domain socket to listen to.
+                An existing socket file at this path is replaced.
+            env: Environment to serve copies of.
+            num_envs: Number of copies of the environment. Defaults to 1.
+            num_threads: Number of threads stepping the environments,
+                see `hcraft.batched.BatchedHcraftEnv`. Defaults to None.
+        """
+        self.socket_path = socket_path
+        self.env = BatchedHcraftEnv(env, num_envs=num_envs, num_threads=num_threads)
+        self.env.legal_actions_info = LegalActionsInfo.NONE
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        super().__init__(socket_path, _HcraftRequestHandler)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.env.close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def handle_command(self, command: int, payload: bytes) -> bytes:
+        """Run the given command and return the payload of the response.
+
+        Raises:
+            ValueError: If the command or its payload are invalid.
+        """
+        env = self.env
+        if command == Command.INFO:
+            return np.array(
+                [env.num_envs, env.buffers["observation"].shape[1], env.action_space.n],
+                dtype="<u4",
+            ).tobytes()
+        if command == Command.RESET:
+            seed = None
+            if payload:
+                (seed,) = struct.unpack("<q", payload)
+            observations, _infos = env.reset(seed=seed)
+            return _to_bytes(observations, "<i4")
+        if command == Command.STEP:
+            if len(payload) != 8 * env.num_envs:
+                raise ValueError(
+                    f"Expected {env.num_envs} int64 actions, got {len(payload)} bytes."
+                )
+            actions = np.frombuffer(payload, dtype="<i8")
+            observations, rewards, terminated, truncated, infos = env.step(actions)
+            done = infos.get("_final_obs", np.zeros(env.num_envs, dtype=bool))
+            final_obs = infos.get("final_obs", observations)[done]
+            return b"".join(
+                (
+                    _to_bytes(observations, "<i4"),
+                    _to_bytes(rewards, "<f8"),
+                    _to_bytes(terminated, "u1"),
+                    _to_bytes(truncated, "u1"),
+                    _to_bytes(done, "u1"),
+                    _to_bytes(final_obs, "<i4"),
+                )
+            )
+        if command == Command.MASKS:
+            return _to_bytes(env.action_masks(), "u1")
+        raise ValueError(f"Unknown command: {command}")
+
+
+class _HcraftRequestHandler(socketserver.BaseRequestHandler):
+    server: HcraftServer
+
+    def handle(self) -> None:
+        connection: socket.socket = self.request
+        while True:
+            try:
+                command, payload = receive_frame(connection)
+            except ConnectionError:
+                return
+            if command == Command.CLOSE:
+                send_frame(connection, Status.OK)
+                return
+            try:
+                response = self.server.handle_command(command, payload)
+            except Exception as error:  # pylint: disable=broad-except
+                send_frame(connection, Status.ERROR, str(error).encode("utf-8"))
+                continue
+            send_frame(connection, Status.OK, response)
+
+
+class HcraftClient:
+    """Python client of an `HcraftServer`, mostly a reference implementation of the protocol."""
+
+    def __init__(self, socket_path: str) -> None:
+        """
+        Args:
+            socket_path: Path of the Unix domain socket the server listens to.
+        """
+        self.connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.connection.connect(socket_path)
+        info = np.frombuffer(self._request(Command.INFO), dtype="<u4")
+        self.num_envs, self.observation_size, self.n_actions = (int(x) for x in info)
+        self.np_random = np.random.default_rng()
+
+    def reset(self, seed: Optional[int] = None) -> np.ndarray:
+        """Reset all environments and return their observations."""
+        if seed is not None:
+            self.np_random = np.random.default_rng(seed)
+        payload = b"" if seed is None else struct.pack("<q", seed)
+        response = self._request(Command.RESET, payload)
+        return self._observations(response)
+
+    def step(
+        self, actions: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Step all environments with the given actions.
+
+        Returns:
+            observations, rewards, terminated, truncated
+            and final observations of done environments (zeros for the others).
+        """
+        actions = np.asarray(actions, dtype="<i8").reshape(self.num_envs)
+        response = self._request(Command.STEP, actions.tobytes())
+        n_envs, obs_bytes = self.num_envs, self.num_envs * self.observation_size * 4
+        offsets = np.cumsum([0, obs_bytes, 8 * n_envs, n_envs, n_envs, n_envs])
+        observations = self._observations(response[: offsets[1]])
+        rewards = np.frombuffer(response[offsets[1] : offsets[2]], dtype="<f8")
+        terminated, truncated, done = (
+            np.frombuffer(response[start:stop], dtype="u1").astype(bool)
+            for start, stop in zip(offsets[2:5], offsets[3:6])
+        )
+        final_obs = np.zeros_like(observations)
+        final_obs[done] = np.frombuffer(response[offsets[5] :], dtype="<i4").reshape(
+            -1, self.observation_size
+        )
+        return observations, rewards, terminated, truncated, final_obs
+
+    def action_masks(self) -> np.ndarray:
+        """Boolean masks of legal actions of shape (num_envs, n_actions)."""
+        response = self._request(Command.MASKS)
+        masks = np.frombuffer(response, dtype="u1").astype(bool)
+        return masks.reshape(self.num_envs, self.n_actions)
+
+    def sample_legal_actions(
+        self, rng: Optional[np.random.Generator] = None
+    ) -> np.ndarray:
+        """Sample uniformly one of the legal actions of each environment."""
+        if rng is None:
+            rng = self.np_random
+        return sample_from_masks(self.action_masks(), rng)
+
+    def close(self) -> None:
+        """Close the connection, leaving the server running."""
+        try:
+            self._request(Command.CLOSE)
+        finally:
+            self.connection.close()
+
+    def _observations(self, payload: bytes) -> np.ndarray:
+        observations = np.frombuffer(payload, dtype="<i4")
+        return observations.reshape(self.num_envs, self.observation_size)
+
+    def _request(self, command: Command, payload: bytes = b"") -> bytes:
+        send_frame(self.connection, command, payload)
+        status, response = receive_frame(self.connection)
+        if status != Status.OK:
+            raise RuntimeError(f"Server error: {response.decode('utf-8')}")
+        return response
+
+
+def send_frame(connection: socket.socket, code: int, payload: bytes = b"") -> None:
+    """Send a frame made of a command or status and its payload."""
+    connection.sendall(HEADER.pack(code, len(payload)) + payload)
+
+
+def receive_frame(connection: socket.socket) -> Tuple[int, bytes]:
+    """Receive a frame, returning its command or status and its payload.
+
+    Raises:
+        ConnectionError: If the connection is closed before a full frame is received.
+    """
+    code, size = HEADER.unpack(_receive_exactly(connection, HEADER.size))
+    return code, _receive_exactly(connection, size)
+
+
+def _receive_exactly(connection: socket.socket, size: int) -> bytes:
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        n_bytes = connection.recv_into(view[received:])
+        if n_bytes == 0:
+            raise ConnectionError("Connection closed in the middle of a frame.")
+        received += n_bytes
+    return bytes(buffer)
+
+
+def _to_bytes(array: np.ndarray, dtype: str) -> bytes:
+    return np.ascontiguousarray(array, dtype=dtype).tobytes()
@@ -1,4 +1,4 @@
-from typing import TYPE_CHECKING, Dict, Optional
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
 
 import numpy as np
 
@@ -40,6 +40,11 @@ class HcraftState:
 
         self.world = world
         self.reset()
+        world.register_state(self)
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.world.register_state(self)
 
     @property
     def current_zone_inventory(self) -> np.ndarray:
@@ -77,11 +82,11 @@ class HcraftState:
         """
 
         if owner in self.world.zones:
-            zone_index = self.world.zones.index(owner)
-            zone_item_index = self.world.zones_items.index(item)
+            zone_index = self.world.slot_from_zone(owner)
+            zone_item_index = self.world.slot_from_zoneitem(item)
             return int(self.zones_inventories[zone_index, zone_item_index])
 
-        item_index = self.world.items.index(item)
+        item_index = self.world.slot_from_item(item)
         return int(self.player_inventory[item_index])
 
     def has_discovered(self, zone: "Zone") -> bool:
@@ -93,7 +98,7 @@ class HcraftState:
         Returns:
             bool: True if the zone was discovered.
         """
-        zone_index = self.world.zones.index(zone)
+        zone_index = self.world.slot_from_zone(zone)
         return bool(self.discovered_zones[zone_index])
 
     @property
@@ -103,6 +108,13 @@ class HcraftState:
             return None
         return self.world.zones[self._current_zone_slot[0]]
 
+    @property
+    def current_zone_slot(self) -> Optional[int]:
+        """Slot of the current position of the player."""
+        if self.world.n_zones == 0:
+            return None
+        return int(self._current_zone_slot[0])
+
     @property
     def _current_zone_slot(self) -> int:
         return self.position.nonzero()[0]
@@ -123,6 +135,40 @@ class HcraftState:
                 zones_invs[zone] = zone_inv
         return zones_invs
 
+    @property
+    def key(self) -> bytes:
+        """Compact hashable key of the state.
+
+        Only the player inventory, the position and the zones inventories are encoded,
+        discoveries are not part of the key.
+        See `HcraftState.load_key` to set a state back from its key.
+        """
+        zone_slot = self.current_zone_slot
+        position_slot = np.array([-1 if zone_slot is None else zone_slot], np.int32)
+        return (
+            self.player_inventory.astype(np.int32, copy=False).tobytes()
+            + position_slot.tobytes()
+            + self.zones_inventories.astype(np.int32, copy=False).tobytes()
+        )
+
+    def load_key(self, key: bytes) -> None:
+        """Set the state from a key given by `HcraftState.key`.
+
+        Args:
+            key: Compact key of the state to load.
+        """
+        values = np.frombuffer(key, dtype=np.int32)
+        n_items = self.world.n_items
+        self.player_inventory[...] = values[:n_items]
+        position_slot = values[n_items]
+        self.position[...] = 0
+        if position_slot >= 0:
+            self.position[position_slot] = 1
+        self.zones_inventories[...] = values[n_items + 1 :].reshape(
+            self.zones_inventories.shape
+        )
+        self._update_discoveries()
+
     def apply(self, action: int) -> bool:
         """Apply the given action to update the state.
 
@@ -147,7 +193,7 @@ class HcraftState:
         """Reset the state to it's initial value."""
         self.player_inventory = np.zeros(self.world.n_items, dtype=np.int32)
         for stack in self.world.start_items:
-            item_slot = self.world.items.index(stack.item)
+            item_slot = self.world.slot_from_item(stack.item)
             self.player_inventory[item_slot] = stack.quantity
 
         self.position = np.zeros(self.world.n_zones, dtype=np.int32)
@@ -163,7 +209,7 @@ class HcraftState:
         for zone, zone_stacks in self.world.start_zones_items.items():
             zone_slot = self.world.slot_from_zone(zone)
             for stack in zone_stacks:
-                item_slot = self.world.zones_items.index(stack.item)
+                item_slot = self.world.slot_from_zoneitem(stack.item)
                 self.zones_inventories[zone_slot, item_slot] = stack.quantity
 
         self.discovered_items = np.zeros(self.world.n_items, dtype=np.ubyte)
@@ -174,6 +220,34 @@ class HcraftState:
         )
         self._update_discoveries()
 
+    def extend(self) -> None:
+        """Extend the state with zero-padded slots for elements added to the world.
+
+        Called by the world on every live state when elements are added to it,
+        see `hcraft.world.World.add_transformations`.
+        """
+        world = self.world
+        n_transformations = len(world.transformations)
+        self.player_inventory = _pad_to(self.player_inventory, (world.n_items,))
+        self.position = _pad_to(self.position, (world.n_zones,))
+        if self.position.shape[0] > 0 and not np.any(self.position):
+            start_slot = 0
+            if world.start_zone is not None:
+                start_slot = world.slot_from_zone(world.start_zone)
+            self.position[start_slot] = 1
+        self.zones_inventories = _pad_to(
+            self.zones_inventories, (world.n_zones, world.n_zones_items)
+        )
+        self.discovered_items = _pad_to(self.discovered_items, (world.n_items,))
+        self.discovered_zones = _pad_to(self.discovered_zones, (world.n_zones,))
+        self.discovered_zones_items = _pad_to(
+            self.discovered_zones_items, (world.n_zones_items,)
+        )
+        self.discovered_transformations = _pad_to(
+            self.discovered_transformations, (n_transformations,)
+        )
+        self._update_discoveries()
+
     def _update_discoveries(self, action: Optional[int] = None) -> None:
         self.discovered_items = np.bitwise_or(
             self.discovered_items, self.player_inventory > 0
@@ -200,3 +274,9 @@ class HcraftState:
         }
         state_dict.update(self.zones_inventories_dict)
         return state_dict
+
+
+def _pad_to(array: np.ndarray, shape: Tuple[int, ...]) -> np.ndarray:
+    """Zero-pad the end of each dimension of the array up to the given shape."""
+    pad_width = [(0, size - current) for current, size in zip(array.shape, shape)]
+    return np.pad(array, pad_width)
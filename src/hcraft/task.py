@@ -28,6 +28,14 @@ class Task:
             (world.n_zones, world.n_zones_items), dtype=np.int32
         )
 
+    def __getstate__(self) -> dict:
+        # Operation arrays are derived from the world, the task must be built again.
+        state = self.__dict__.copy()
+        state["_terminate_player_items"] = None
+        state["_terminate_position"] = None
+        state["_terminate_zones_items"] = None
+        return state
+
     def is_terminal(self, state: "HcraftState") -> bool:
         """
         Returns whether the task is terminated.
@@ -39,7 +47,12 @@ class Task:
 
     @abstractmethod
     def _is_terminal(self, state: "HcraftState") -> bool:
-        """"""
+        """Whether the given state is terminal for the task.
+
+        Inventories arrays may have leading batch dimensions,
+        see `hcraft.batched.BatchedHcraftState`, in which case an array of booleans
+        is expected with those leading dimensions.
+        """
 
     @abstractmethod
     def reward(self, state: "HcraftState") -> float:
@@ -88,11 +101,11 @@ class GetItemTask(AchievementTask):
 
     def build(self, world: "World") -> None:
         super().build(world)
-        item_slot = world.items.index(self.item_stack.item)
+        item_slot = world.slot_from_item(self.item_stack.item)
         self._terminate_player_items[item_slot] = self.item_stack.quantity
 
     def _is_terminal(self, state: "HcraftState") -> bool:
-        return np.all(state.player_inventory >= self._terminate_player_items)
+        return np.all(state.player_inventory >= self._terminate_player_items, axis=-1)
 
     @staticmethod
     def get_name(stack: Stack):
@@ -110,11 +123,11 @@ class GoToZoneTask(AchievementTask):
 
     def build(self, world: "World"):
         super().build(world)
-        zone_slot = world.zones.index(self.zone)
+        zone_slot = world.slot_from_zone(self.zone)
         self._terminate_position[zone_slot] = 1
 
     def _is_terminal(self, state: "HcraftState") -> bool:
-        return np.all(state.position == self._terminate_position)
+        return np.all(state.position == self._terminate_position, axis=-1)
 
     @staticmethod
     def get_name(zone: Zone):
@@ -146,17 +159,16 @@ class PlaceItemTask(AchievementTask):
             zones_slots = np.arange(self._terminate_zones_items.shape[0])
         else:
             zones_slots = np.array([world.slot_from_zone(self.zone)])
-        zone_item_slot = world.zones_items.index(self.item_stack.item)
+        zone_item_slot = world.slot_from_zoneitem(self.item_stack.item)
         self._terminate_zones_items[zones_slots, zone_item_slot] = (
             self.item_stack.quantity
         )
 
     def _is_terminal(self, state: "HcraftState") -> bool:
+        placed = state.zones_inventories >= self._terminate_zones_items
         if self.zone is None:
-            return np.any(
-                np.all(state.zones_inventories >= self._terminate_zones_items, axis=1)
-            )
-        return np.all(state.zones_inventories >= self._terminate_zones_items)
+            return np.any(np.all(placed, axis=-1), axis=-1)
+        return np.all(placed, axis=(-2, -1))
 
     @staticmethod
     def get_name(stack: Stack, zone: Optional[Zone]):
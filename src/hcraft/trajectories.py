@@ -0,0 +1,379 @@
+"""# Trajectories
+
+Record the trajectories of an `hcraft.env.HcraftEnv` or of a whole `hcraft.batched.BatchedHcraftEnv`
+to disk while it is stepped, without copying observations out of `step` into Python lists.
+
+HierarchyCraft environments are deterministic, so states do not need to be stored at every step:
+`TrajectoryRecorder` only streams the actions, rewards and validity flags of each step,
+and a full copy of the states every `keyframe_interval` steps (a keyframe).
+States in between are reconstructed from the last keyframe by applying the valid actions.
+
+## Example
+
+```python
+from hcraft.batched import BatchedHcraftEnv
+from hcraft.examples import MineHcraftEnv
+from hcraft.trajectories import TrajectoryRecorder
+
+env = TrajectoryRecorder(
+    BatchedHcraftEnv(MineHcraftEnv(max_step=50), num_envs=1024), "mine_trajectories"
+)
+observations, infos = env.reset(seed=42)
+for _ in range(100):
+    actions = env.sample_legal_actions()
+    observations, rewards, terminated, truncated, infos = env.step(actions)
+env.close()
+```
+
+The recorder behaves like the environment it wraps, every other attribute being the environment's.
+
+## Format
+
+A recording is a directory holding:
+* A JSON descriptor `trajectories.json` with the format version, the number of environments,
+    the list of shards and any user metadata (see `read_recording`).
+* The recorded world as a world file `world.json` (see `hcraft.world_file`).
+* Shards `shard-00000.npz`, `shard-00001.npz`, ... each holding up to `shard_steps` steps.
+
+With T the number of steps of a shard and N the number of environments, shards arrays are:
+
+| Array | Shape | Content |
+|---|---|---|
+| `actions` | `(T, N)` | Index of the transformation chosen, with the smallest unsigned dtype holding any action |
+| `rewards` | `(T, N)` | Rewards as `float32` |
+| `valid` | `(T, N)` | Whether the transformation was applied |
+| `terminated` | `(T, N)` | Whether the episode terminated at this step |
+| `truncated` | `(T, N)` | Whether the episode was truncated at this step |
+| `resets` | `(T, N)` | Whether the environment was reset to the start state just before this step |
+| `keyframes/steps` | `(K,)` | Steps of the shard whose states are stored, always starting with step 0 |
+| `keyframes/player_inventory` | `(K, N, n_items)` | Players inventories just before those steps |
+| `keyframes/position` | `(K, N)` | Slot of the zone of each player, -1 if the world has no zone |
+| `keyframes/zones_inventories` | `(K, N, n_zones, n_zones_items)` | Zones inventories |
+
+Each shard starting with a keyframe, shards can be read independently.
+Shards are compressed and written by a background thread,
+so that recording keeps up with stepping the environment.
+
+"""
+
+import json
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from hcraft.batched import INVENTORY_DTYPE, BatchedHcraftEnv
+from hcraft.replay import TrajectoryReplayer
+from hcraft.world_file import save_world
+
+if TYPE_CHECKING:
+    from hcraft.env import HcraftEnv
+
+
+TRAJECTORIES_FORMAT = "hcraft-trajectories"
+TRAJECTORIES_VERSION = 1
+"""Version of the recordings format written by `TrajectoryRecorder`."""
+
+DESCRIPTOR_FILE = "trajectories.json"
+WORLD_FILE = "world.json"
+
+STEP_ARRAYS = ("actions", "rewards", "valid", "terminated", "truncated", "resets")
+"""Arrays of shards holding one value per step and environment."""
+
+
+class TrajectoryRecorder:
+    """Record trajectories of an environment in compressed shards while it is stepped."""
+
+    def __init__(
+        self,
+        env: Union["HcraftEnv", BatchedHcraftEnv],
+        directory: Union[str, Path],
+        shard_steps: int = 4096,
+        keyframe_interval: int = 256,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Args:
+            env: Environment to record, either a single or a batched environment.
+            directory: Directory of the recording, created if needed.
+                An existing recording in this directory is overwritten.
+            shard_steps: Maximum number of steps of each shard. Defaults to 4096.
+            keyframe_interval: Number of steps between two keyframes of the states.
+                Defaults to 256.
+            metadata: JSON serializable metadata to save with the recording.
+                Defaults to None.
+        """
+        if shard_steps < 1 or keyframe_interval < 1:
+            raise ValueError("shard_steps and keyframe_interval should be positive.")
+        self.env = env
+        self.directory = Path(directory)
+        self.shard_steps = shard_steps
+        self.keyframe_interval = keyframe_interval
+        self.metadata = metadata if metadata is not None else {}
+
+        self.batched = isinstance(env, BatchedHcraftEnv)
+        self.num_envs = env.num_envs if self.batched else 1
+        world = env.world
+        self.actions_dtype = np.min_scalar_type(max(len(world.transformations) - 1, 0))
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for old_shard in self.directory.glob("shard-*.npz"):
+            old_shard.unlink()
+        save_world(world, self.directory / WORLD_FILE)
+        self._fingerprint = world.fingerprint
+
+        self.shards: List[Dict[str, Any]] = []
+        """Shards written so far, with their file name, first step and number of steps."""
+        self.total_steps = 0
+        """Number of steps recorded so far, including those not yet written."""
+        self._executor: Optional[ThreadPoolExecutor] = ThreadPoolExecutor(max_workers=1)
+        self._pending: Optional[Future] = None
+        self._pending_resets = np.zeros(self.num_envs, dtype=bool)
+        self._replayer: Optional[TrajectoryReplayer] = None
+        self._new_shard()
+        self._write_descriptor()
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "env":
+            raise AttributeError(name)
+        return getattr(self.env, name)
+
+    def __enter__(self) -> "TrajectoryRecorder":
+        return self
+
+    def __exit__(self, *_exc_info) -> None:
+        self.close()
+
+    def reset(self, **kwargs) -> Tuple[np.ndarray, dict]:
+        """Reset the environment, see its own `reset`."""
+        outputs = self.env.reset(**kwargs)
+        envs = kwargs.get("envs")
+        self._pending_resets[slice(None) if envs is None else envs] = True
+        return outputs
+
+    def step(self, actions: Union[int, np.ndarray]) -> Tuple[Any, Any, Any, Any, dict]:
+        """Step the environment and record the step, see its own `step`."""
+        keyframe = None
+        if self._row % self.keyframe_interval == 0:
+            keyframe = self._states()
+
+        outputs = self.env.step(actions)
+        _observations, rewards, terminated, truncated, _infos = outputs
+        valid = self.env.valid if self.batched else self.env.last_action_valid
+        self._add_step(actions, rewards, valid, terminated, truncated, keyframe)
+        return outputs
+
+    def record_episode(
+        self,
+        actions: np.ndarray,
+        rewards: np.ndarray,
+        valid: np.ndarray,
+        terminated: np.ndarray,
+        truncated: np.ndarray,
+    ) -> None:
+        """Record a whole episode of a single environment without stepping it.
+
+        The episode is expected to start from the world start state,
+        for example an episode kept in memory to only record it if it is new.
+        Its keyframes are rebuilt with a `hcraft.replay.TrajectoryReplayer`.
+
+        Args:
+            actions: Actions of each step of the episode, of shape (T,).
+            rewards: Rewards of each step, of shape (T,).
+            valid: Whether each action was valid, of shape (T,).
+            terminated: Whether the episode terminated at each step, of shape (T,).
+            truncated: Whether the episode was truncated at each step, of shape (T,).
+
+        Raises:
+            ValueError: If the recorded environment is batched,
+                or if validities do not match the actions.
+        """
+        if self.batched:
+            raise ValueError("Episodes can only be recorded for single environments.")
+        if self._replayer is None:
+            self._replayer = TrajectoryReplayer(self.env.world)
+        actions = np.asarray(actions, dtype=np.int64)
+        start = self._replayer.start_arrays(None)
+        states = self._replayer.replay_known(actions, start, np.asarray(valid, bool))
+        self._pending_resets[:] = True
+        for step, action in enumerate(actions):
+            keyframe = None
+            if self._row % self.keyframe_interval == 0:
+                if step > 0:
+                    start = tuple(array[step - 1] for array in states)
+                player_inventory, position_slot, zones_inventories = start
+                keyframe = (
+                    player_inventory[np.newaxis],
+                    np.array([position_slot], dtype=INVENTORY_DTYPE),
+                    zones_inventories[np.newaxis],
+                )
+            self._add_step(
+                action,
+                rewards[step],
+                valid[step],
+                terminated[step],
+                truncated[step],
+                keyframe,
+            )
+
+    def _add_step(
+        self,
+        actions: Union[int, np.ndarray],
+        rewards: Union[float, np.ndarray],
+        valid: Union[bool, np.ndarray],
+        terminated: Union[bool, np.ndarray],
+        truncated: Union[bool, np.ndarray],
+        keyframe: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]],
+    ) -> None:
+        row = self._row
+        buffers = self._buffers
+        buffers["actions"][row] = np.asarray(actions).reshape(self.num_envs)
+        buffers["rewards"][row] = rewards
+        buffers["valid"][row] = valid
+        buffers["terminated"][row] = terminated
+        buffers["truncated"][row] = truncated
+        buffers["resets"][row] = self._pending_resets
+        if keyframe is not None:
+            self._keyframes_steps.append(row)
+            self._keyframes.append(keyframe)
+
+        self._pending_resets[:] = False
+        if self.batched and self.env.autoreset:
+            self._pending_resets |= buffers["terminated"][row]
+            self._pending_resets |= buffers["truncated"][row]
+
+        self._row += 1
+        self.total_steps += 1
+        if self._row == self.shard_steps:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the steps recorded since the last shard as a new shard."""
+        if self._row == 0:
+            return
+        rows = self._row
+        arrays = {name: buffer[:rows] for name, buffer in self._buffers.items()}
+        arrays["keyframes/steps"] = np.array(self._keyframes_steps, dtype=np.int64)
+        for index, name in enumerate(_KEYFRAME_ARRAYS):
+            arrays[f"keyframes/{name}"] = np.stack(
+                [keyframe[index] for keyframe in self._keyframes]
+            )
+        # Wait for the previous shard so that at most one shard is being compressed,
+        # and so that it is counted in the name of the new one.
+        self._wait_pending()
+        shard = {
+            "file": f"shard-{len(self.shards):05d}.npz",
+            "first_step": self.total_steps - rows,
+            "steps": rows,
+        }
+        self._pending = self._executor.submit(self._write_shard, shard, arrays)
+        self._new_shard()
+
+    def close(self) -> None:
+        """Write the last steps, wait for all shards to be written and close the environment."""
+        if self._executor is None:
+            return
+        self.flush()
+        self._wait_pending()
+        self._executor.shutdown()
+        self._executor = None
+        self.env.close()
+
+    def _states(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        state = self.env.state
+        if self.batched:
+            return (
+                state.player_inventory.copy(),
+                state.position_slots.astype(INVENTORY_DTYPE),
+                state.zones_inventories.copy(),
+            )
+        zone_slot = state.current_zone_slot
+        return (
+            state.player_inventory[np.newaxis].astype(INVENTORY_DTYPE),
+            np.array([-1 if zone_slot is None else zone_slot], dtype=INVENTORY_DTYPE),
+            state.zones_inventories[np.newaxis].astype(INVENTORY_DTYPE),
+        )
+
+    def _new_shard(self) -> None:
+        # Written shards keep their own buffers, so new ones are allocated.
+        shape = (self.shard_steps, self.num_envs)
+        self._buffers = {
+            "actions": np.zeros(shape, dtype=self.actions_dtype),
+            "rewards": np.zeros(shape, dtype=np.float32),
+            "valid": np.zeros(shape, dtype=bool),
+            "terminated": np.zeros(shape, dtype=bool),
+            "truncated": np.zeros(shape, dtype=bool),
+            "resets": np.zeros(shape, dtype=bool),
+        }
+        self._keyframes_steps: List[int] = []
+        self._keyframes: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        self._row = 0
+
+    def _write_shard(
+        self, shard: Dict[str, Any], arrays: Dict[str, np.ndarray]
+    ) -> None:
+        with open(self.directory / shard["file"], "wb") as shard_file:
+            np.savez_compressed(shard_file, **arrays)
+        self.shards.append(shard)
+        self._write_descriptor()
+
+    def _wait_pending(self) -> None:
+        if self._pending is not None:
+            self._pending.result()
+            self._pending = None
+
+    def _write_descriptor(self) -> None:
+        world = self.env.world
+        descriptor = {
+            "format": TRAJECTORIES_FORMAT,
+            "version": TRAJECTORIES_VERSION,
+            "world": WORLD_FILE,
+            "fingerprint": self._fingerprint,
+            "num_envs": self.num_envs,
+            "n_actions": len(world.transformations),
+            "actions_dtype": self.actions_dtype.str,
+            "keyframe_interval": self.keyframe_interval,
+            "shard_steps": self.shard_steps,
+            "shards": list(self.shards),
+            "metadata": self.metadata,
+        }
+        # Written then renamed so that readers never see a partial descriptor.
+        staging_path = self.directory / f".{DESCRIPTOR_FILE}"
+        with open(staging_path, "w", encoding="utf-8") as descriptor_file:
+            json.dump(descriptor, descriptor_file, indent=1)
+        os.replace(staging_path, self.directory / DESCRIPTOR_FILE)
+
+
+_KEYFRAME_ARRAYS = ("player_inventory", "position", "zones_inventories")
+
+
+def read_recording(directory: Union[str, Path]) -> Dict[str, Any]:
+    """Read the JSON descriptor of a recording.
+
+    Only shards already fully written are listed in its 'shards',
+    each with its 'file', 'first_step' and number of 'steps'.
+
+    Raises:
+        ValueError: If the directory is not a recording of a supported version.
+    """
+    path = Path(directory) / DESCRIPTOR_FILE
+    with open(path, "r", encoding="utf-8") as descriptor_file:
+        descriptor = json.load(descriptor_file)
+    if descriptor.get("format") != TRAJECTORIES_FORMAT:
+        raise ValueError(f"{path} is not an hcraft trajectories recording.")
+    version = descriptor.get("version")
+    if not isinstance(version, int) or version > TRAJECTORIES_VERSION:
+        raise ValueError(
+            f"Unsupported trajectories version {version} in {path},"
+            f" this version of hcraft reads versions up to {TRAJECTORIES_VERSION}."
+        )
+    return descriptor
+
+
+def load_shard(directory: Union[str, Path], index: int) -> Dict[str, np.ndarray]:
+    """Load all the arrays of the shard of the given index of a recording."""
+    shard = read_recording(directory)["shards"][index]
+    with np.load(Path(directory) / shard["file"]) as archive:
+        return {name: archive[name] for name in archive.files}
@@ -0,0 +1,400 @@
+"""# Trajectory datasets
+
+Train on recorded trajectories (see `hcraft.trajectories`) and generated demonstrations
+(see `hcraft.dataset`) without loading them in memory.
+
+`TrajectoryDataset` memory-maps the observations, actions, rewards and done flags of every episode,
+and samples uniform or prioritized minibatches of transitions or of subsequences,
+only copying the sampled rows.
+
+## Example
+
+```python
+from hcraft.trajectory_dataset import TrajectoryDataset
+
+dataset = TrajectoryDataset("mine_demos")
+batch = dataset.sample_transitions(256)
+batch["observations"], batch["actions"], batch["rewards"], batch["next_observations"]
+
+sequences = dataset.sample_subsequences(32, length=16)
+sequences["observations"]  # Of shape (32, 17, observation_size)
+```
+
+Observations follow the layout of `hcraft.state.HcraftState.observation`.
+
+## Index
+
+Recordings store compressed actions and keyframes of the states only.
+The first time a recording is read, its states are rebuilt with `hcraft.replay.replay_shard`
+and an uncompressed index of its episodes is written in its `dataset-index` directory,
+holding `.npy` arrays that are then memory-mapped:
+
+| Array | Shape | Content |
+|---|---|---|
+| `observations` | `(M + E, observation_size)` | Observations of each episode, including their first one |
+| `actions` | `(M,)` | Action of each transition |
+| `rewards` | `(M,)` | Reward of each transition |
+| `terminated`, `truncated`, `valid` | `(M,)` | Flags of each transition |
+| `episode_offsets` | `(E + 1,)` | Index of the first transition of each episode, then M |
+
+With M transitions and E episodes, episodes are stored one after another,
+each environment of a batched recording giving its own episodes.
+The observation before transition `i` of episode `e` is `observations[i + e]`
+and the one after it `observations[i + e + 1]`.
+
+Indexes are rebuilt when more shards were written in the recording since.
+Readers rebuilding the same index concurrently keep the first one installed.
+
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from hcraft.batched import INVENTORY_DTYPE
+from hcraft.replay import TrajectoryReplayer, replay_shard
+from hcraft.trajectories import (
+    DESCRIPTOR_FILE,
+    WORLD_FILE,
+    read_recording,
+)
+from hcraft.world_file import load_world
+
+INDEX_DIRECTORY = "dataset-index"
+INDEX_VERSION = 1
+"""Version of the layout of recordings indexes."""
+
+TRANSITIONS_ARRAYS = ("actions", "rewards", "terminated", "truncated", "valid")
+"""Arrays of indexes holding one value per transition."""
+
+
+class RecordingIndex:
+    """Memory-mapped index of the episodes of a recording."""
+
+    def __init__(self, recording: Union[str, Path]) -> None:
+        """
+        Args:
+            recording: Directory of the recording, indexed if needed.
+        """
+        self.recording = Path(recording)
+        self.directory = self.recording / INDEX_DIRECTORY
+        shards = read_recording(self.recording)["shards"]
+        if _read_index_shards(self.directory) != shards:
+            build_recording_index(self.recording)
+        self.arrays: Dict[str, np.ndarray] = {
+            name: np.load(self.directory / f"{name}.npy", mmap_mode="r")
+            for name in TRANSITIONS_ARRAYS + ("observations", "episode_offsets")
+        }
+        self.episode_offsets = np.array(self.arrays["episode_offsets"])
+        self.n_transitions = int(self.episode_offsets[-1])
+        self.n_episodes = len(self.episode_offsets) - 1
+
+
+def build_recording_index(recording: Union[str, Path]) -> Path:
+    """Rebuild the states of a recording and write its index of episodes.
+
+    Returns:
+        Directory of the index.
+    """
+    recording = Path(recording)
+    descriptor = read_recording(recording)
+    shards = descriptor["shards"]
+    replayer = TrajectoryReplayer(load_world(recording / WORLD_FILE))
+
+    steps = {name: [] for name in TRANSITIONS_ARRAYS + ("resets",)}
+    for shard in shards:
+        with np.load(recording / shard["file"]) as archive:
+            for name, arrays in steps.items():
+                arrays.append(archive[name])
+    steps = {
+        name: np.concatenate(arrays) if arrays else np.zeros((0, 0))
+        for name, arrays in steps.items()
+    }
+    n_steps, num_envs = steps["actions"].shape if shards else (0, 0)
+
+    # Episodes of each environment are stored one after another.
+    starts = np.array(steps["resets"], dtype=bool)
+    if n_steps > 0:
+        starts[0] = True
+    starts = starts.T.reshape(-1)
+    episode_offsets = np.concatenate((np.flatnonzero(starts), [starts.size]))
+    episodes = np.cumsum(starts) - 1
+    transitions = np.arange(starts.size)
+    observation_size = replayer.observations(
+        np.zeros((1, replayer.state_size), dtype=INVENTORY_DTYPE)
+    ).shape[-1]
+
+    directory = recording / INDEX_DIRECTORY
+    staging = Path(tempfile.mkdtemp(dir=recording, prefix=".staging-"))
+    for name in TRANSITIONS_ARRAYS:
+        np.save(staging / f"{name}.npy", steps[name].T.reshape(-1))
+    np.save(staging / "episode_offsets.npy", episode_offsets.astype(np.int64))
+
+    observations = np.lib.format.open_memmap(
+        staging / "observations.npy",
+        mode="w+",
+        dtype=INVENTORY_DTYPE,
+        shape=(starts.size + len(episode_offsets) - 1, observation_size),
+    )
+    first_observations = transitions[starts] + episodes[starts]
+    start_state = replayer.vectors(
+        *(np.asarray(array)[np.newaxis] for array in replayer.start_arrays(None))
+    )
+    observations[first_observations] = replayer.observations(start_state)
+    # Without a reset, the first episode of each environment starts from the first keyframe.
+    if n_steps > 0:
+        with np.load(recording / shards[0]["file"]) as archive:
+            keyframe_states = replayer.vectors(
+                archive["keyframes/player_inventory"][0],
+                archive["keyframes/position"][0],
+                archive["keyframes/zones_inventories"][0],
+            )
+        not_reset = np.flatnonzero(~steps["resets"][0])
+        observations[not_reset * n_steps + episodes[not_reset * n_steps]] = (
+            replayer.observations(keyframe_states[not_reset])
+        )
+
+    next_observations = (transitions + episodes + 1).reshape(num_envs, n_steps).T
+    for index, shard in enumerate(shards):
+        rows = slice(shard["first_step"], shard["first_step"] + shard["steps"])
+        shard_observations = replayer.observations(
+            replay_shard(recording, index, replayer)
+        )
+        observations[next_observations[rows].reshape(-1)] = shard_observations.reshape(
+            -1, observation_size
+        )
+    observations.flush()
+    del observations
+
+    with open(staging / "index.json", "w", encoding="utf-8") as index_file:
+        json.dump({"version": INDEX_VERSION, "shards": shards}, index_file)
+    # Readers of the same recording may rebuild its index concurrently,
+    # the index installed by any of them is kept.
+    if _read_index_shards(directory) != shards:
+        shutil.rmtree(directory, ignore_errors=True)
+        try:
+            os.replace(staging, directory)
+        except OSError:
+            if _read_index_shards(directory) != shards:
+                raise
+    shutil.rmtree(staging, ignore_errors=True)
+    return directory
+
+
+class TrajectoryDataset:
+    """Random-access dataset of the episodes of one or several recordings."""
+
+    def __init__(
+        self,
+        paths: Union[str, Path, Sequence[Union[str, Path]]],
+        rng: Optional[np.random.Generator] = None,
+    ) -> None:
+        """
+        Args:
+            paths: Directories of recordings or of datasets generated with
+                `hcraft.dataset.generate_dataset`, whose stored shards are all read.
+            rng: Random generator used for sampling. Defaults to None, hence a new one.
+
+        Raises:
+            ValueError: If a path is neither a recording nor a generated dataset,
+                or if recordings have different observation sizes.
+        """
+        if isinstance(paths, (str, Path)):
+            paths = [paths]
+        self.indexes: List[RecordingIndex] = [
+            RecordingIndex(recording)
+            for path in paths
+            for recording in _recordings_of(Path(path))
+        ]
+        observation_sizes = {
+            index.arrays["observations"].shape[1] for index in self.indexes
+        }
+        if len(observation_sizes) > 1:
+            raise ValueError(
+                f"Recordings have different observation sizes: {observation_sizes}."
+            )
+        self.observation_size = observation_sizes.pop() if observation_sizes else 0
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+        self._transitions_offsets = np.cumsum(
+            [0] + [index.n_transitions for index in self.indexes]
+        )
+        self.episode_offsets = np.concatenate(
+            [
+                index.episode_offsets[:-1] + offset
+                for index, offset in zip(self.indexes, self._transitions_offsets)
+            ]
+            + [self._transitions_offsets[-1:]]
+        ).astype(np.int64)
+        """Index of the first transition of each episode of the dataset, then its length."""
+
+    def __len__(self) -> int:
+        return int(self._transitions_offsets[-1])
+
+    @property
+    def n_episodes(self) -> int:
+        """Number of episodes of the dataset."""
+        return len(self.episode_offsets) - 1
+
+    @property
+    def episodes_lengths(self) -> np.ndarray:
+        """Number of transitions of each episode."""
+        return np.diff(self.episode_offsets)
+
+    def transitions(self, indexes: np.ndarray) -> Dict[str, np.ndarray]:
+        """Transitions of the given indexes.
+
+        Returns:
+            Arrays of 'observations', 'actions', 'rewards', 'next_observations',
+            'terminated', 'truncated' and 'valid' of the transitions.
+        """
+        indexes = np.asarray(indexes, dtype=np.int64)
+        if np.any((indexes < 0) | (indexes >= len(self))):
+            raise IndexError(f"Transitions out of the dataset: {indexes}")
+        episodes = np.searchsorted(self.episode_offsets, indexes, side="right") - 1
+        observations = self._gather("observations", indexes + episodes, indexes)
+        batch = {
+            "observations": observations,
+            "next_observations": self._gather(
+                "observations", indexes + episodes + 1, indexes
+            ),
+        }
+        for name in TRANSITIONS_ARRAYS:
+            batch[name] = self._gather(name, indexes, indexes)
+        return batch
+
+    def episode(self, index: int) -> Dict[str, np.ndarray]:
+        """All transitions of the episode of the given index."""
+        start, stop = self.episode_offsets[index], self.episode_offsets[index + 1]
+        return self.transitions(np.arange(start, stop))
+
+    def sample_transitions(
+        self, batch_size: int, priorities: Optional[np.ndarray] = None
+    ) -> Dict[str, np.ndarray]:
+        """Sample a minibatch of transitions, see `transitions`.
+
+        Args:
+            batch_size: Number of transitions to sample.
+            priorities: Non-negative priority of each transition,
+                sampled with probabilities proportional to them.
+                Defaults to None, hence uniformly.
+        """
+        return self.transitions(self._sample(batch_size, len(self), priorities))
+
+    def sample_subsequences(
+        self,
+        batch_size: int,
+        length: int,
+        priorities: Optional[np.ndarray] = None,
+    ) -> Dict[str, np.ndarray]:
+        """Sample a minibatch of subsequences of consecutive transitions of the same episode.
+
+        Args:
+            batch_size: Number of subsequences to sample.
+            length: Number of transitions of each subsequence.
+            priorities: Non-negative priority of each transition,
+                subsequences being sampled proportionally to the priority of their first transition.
+                Defaults to None, hence uniformly.
+
+        Returns:
+            Arrays of shape (batch_size, length, ...), see `transitions`,
+            and 'observations' of shape (batch_size, length + 1, observation_size)
+            including the one after the last transition.
+
+        Raises:
+            ValueError: If no episode has at least `length` transitions.
+        """
+        lengths = self.episodes_lengths
+        n_starts = np.maximum(lengths - length + 1, 0)
+        if n_starts.sum() == 0:
+            raise ValueError(f"No episode has at least {length} transitions.")
+        # Transitions from which a whole subsequence fits in the episode.
+        episodes = np.repeat(np.arange(self.n_episodes), n_starts)
+        starts = self.episode_offsets[episodes] + (
+            np.arange(len(episodes))
+            - np.repeat(np.cumsum(n_starts) - n_starts, n_starts)
+        )
+        if priorities is not None:
+            priorities = np.asarray(priorities, dtype=float)[starts]
+        starts = starts[self._sample(batch_size, len(starts), priorities)]
+
+        indexes = starts[:, np.newaxis] + np.arange(length)
+        batch = self.transitions(indexes.reshape(-1))
+        for name, array in batch.items():
+            batch[name] = array.reshape((batch_size, length) + array.shape[1:])
+        batch["observations"] = np.concatenate(
+            (batch["observations"], batch["next_observations"][:, -1:]), axis=1
+        )
+        del batch["next_observations"]
+        return batch
+
+    def _sample(
+        self, batch_size: int, population: int, priorities: Optional[np.ndarray]
+    ) -> np.ndarray:
+        if population == 0:
+            raise ValueError("Cannot sample from an empty dataset.")
+        if priorities is None:
+            return self.rng.integers(population, size=batch_size)
+        priorities = np.asarray(priorities, dtype=float)
+        if priorities.shape != (population,) or np.any(priorities < 0):
+            raise ValueError(
+                f"Priorities should be {population} non-negative values,"
+                f" got shape {priorities.shape}."
+            )
+        cumulated = np.cumsum(priorities)
+        if cumulated[-1] <= 0:
+            raise ValueError("At least one priority should be positive.")
+        targets = self.rng.random(batch_size) * cumulated[-1]
+        return np.searchsorted(cumulated, targets, side="right")
+
+    def _gather(
+        self, name: str, rows: np.ndarray, transitions: np.ndarray
+    ) -> np.ndarray:
+        """Rows of the given array of each recording, recordings found from transitions."""
+        recordings = (
+            np.searchsorted(self._transitions_offsets, transitions, side="right") - 1
+        )
+        first = self.indexes[0].arrays[name] if self.indexes else np.zeros(0)
+        gathered = np.empty(rows.shape + first.shape[1:], dtype=first.dtype)
+        for recording in np.unique(recordings):
+            index = self.indexes[recording]
+            selected = recordings == recording
+            # Rows of a recording start after all rows of the previous recordings.
+            offset = self._transitions_offsets[recording]
+            if name == "observations":
+                offset += self._episodes_offset(recording)
+            gathered[selected] = index.arrays[name][rows[selected] - offset]
+        return gathered
+
+    def _episodes_offset(self, recording: int) -> int:
+        return sum(index.n_episodes for index in self.indexes[:recording])
+
+
+def _read_index_shards(directory: Path) -> Optional[list]:
+    try:
+        with open(directory / "index.json", "r", encoding="utf-8") as index_file:
+            index = json.load(index_file)
+    except (OSError, ValueError):
+        return None
+    if index.get("version") != INDEX_VERSION:
+        return None
+    return index.get("shards")
+
+
+def _recordings_of(path: Path) -> List[Path]:
+    if (path / DESCRIPTOR_FILE).exists():
+        return [path]
+    # pylint: disable=import-outside-toplevel
+    from hcraft.dataset import MANIFEST_FILE, read_manifest
+
+    if (path / MANIFEST_FILE).exists():
+        shards = dict.fromkeys(
+            entry["shard"] for entry in read_manifest(path) if "shard" in entry
+        )
+        return [path / shard for shard in shards]
+    raise ValueError(f"{path} is neither a recording nor a generated dataset.")
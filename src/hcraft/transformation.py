@@ -138,7 +138,7 @@ because the player only observe the current zone items.
 
 """
 
-from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple, Union, Any
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Set, Tuple, Union, Any
 from enum import Enum
 from dataclasses import dataclass
 
@@ -290,6 +290,8 @@ class Transformation:
 
     """
 
+    _frozen = False
+
     def __init__(
         self,
         name: Optional[str] = None,
@@ -316,12 +318,48 @@ class Transformation:
         self._zone = None
 
         self._changes_list = inventory_changes
-        self.inventory_changes = _format_inventory_changes(inventory_changes)
+        self._inventory_changes: Optional[Dict[InventoryOwner, InventoryChanges]] = None
         self._inventory_operations: Optional[
             Dict[InventoryOwner, InventoryOperations]
         ] = None
 
-        self.name = name if name is not None else self.__repr__()
+        self._given_name = name
+        self._default_name: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        """Name of the transformation, defaults to its repr if none was given."""
+        if self._given_name is not None:
+            return self._given_name
+        if self._default_name is None:
+            self._default_name = self.__repr__()
+        return self._default_name
+
+    @name.setter
+    def name(self, name: str) -> None:
+        self._given_name = name
+
+    @property
+    def inventory_changes(self) -> Dict[InventoryOwner, InventoryChanges]:
+        """Stacks changed by the transformation for each owner and operation.
+
+        Formatted from the list of inventory changes on first access.
+        """
+        if self._inventory_changes is None:
+            self._inventory_changes = _format_inventory_changes(self._changes_list)
+        return self._inventory_changes
+
+    def __getstate__(self) -> dict:
+        # Array operations are derived from the world, the transformation must be built again.
+        return {
+            "name": self._given_name,
+            "destination": self.destination,
+            "inventory_changes": self._changes_list,
+            "zone": self.zone,
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(**state)
 
     def apply(
         self,
@@ -356,11 +394,57 @@ class Transformation:
         return True
 
     def build(self, world: "World") -> None:
-        """Build the transformation array operations on the given world."""
+        """Build the transformation array operations on the given world.
+
+        Raises:
+            ValueError: If the transformation belongs to a frozen world,
+                see `hcraft.world.World.freeze`.
+        """
+        if self._frozen:
+            raise ValueError(
+                f"Transformation {self.name} belongs to a frozen world"
+                " and cannot be built again, create a new transformation instead."
+            )
         self._build_destination_op(world)
         self._build_inventory_ops(world)
         self._build_zones_op(world)
 
+    def extend(
+        self, n_items: int = 0, n_zones: int = 0, n_zones_items: int = 0
+    ) -> None:
+        """Extend the built array operations with slots for elements added to the world.
+
+        New elements are expected to be appended at the end of the world's lists,
+        thus new slots are padded at the end of every array operation
+        with values that have no effect on the transformation.
+
+        Args:
+            n_items: Number of items added to the world.
+            n_zones: Number of zones added to the world.
+            n_zones_items: Number of zones items added to the world.
+        """
+        if self._destination is not None:
+            self._destination = np.pad(self._destination, (0, n_zones))
+        if self._zone is not None:
+            self._zone = np.pad(self._zone, (0, n_zones))
+        if self._inventory_operations is None:
+            return
+
+        for owner, operations in self._inventory_operations.items():
+            if owner is InventoryOwner.PLAYER:
+                pad_width = (0, n_items)
+            elif owner is InventoryOwner.ZONES:
+                pad_width = ((0, n_zones), (0, n_zones_items))
+            else:
+                pad_width = (0, n_zones_items)
+            for operation, operation_arr in operations.items():
+                if operation_arr is None:
+                    continue
+                pad_value = np.inf if operation is InventoryOperation.MAX else 0
+                operations[operation] = np.pad(
+                    operation_arr, pad_width, constant_values=pad_value
+                )
+
     def get_changes(
         self, owner: InventoryOwner, operation: InventoryOperation, default: Any = None
     ) -> Optional[Union[List[Stack], Dict[Zone, List[Stack]]]]:
@@ -487,13 +571,14 @@ class Transformation:
             return True
 
         # Specific zones operations
+        # Copied as they are updated below with current and destination changes.
         zones_changes = self._inventory_operations.get(InventoryOwner.ZONES, {})
         zeros = np.zeros_like(zones_inventories)
-        added = zones_changes.get(InventoryOperation.ADD, zeros.copy())
-        removed = zones_changes.get(InventoryOperation.REMOVE, zeros.copy())
+        added = np.array(zones_changes.get(InventoryOperation.ADD, zeros))
+        removed = np.array(zones_changes.get(InventoryOperation.REMOVE, zeros))
         infs = np.inf * np.ones_like(zones_inventories)
-        max_items = zones_changes.get(InventoryOperation.MAX, infs.copy())
-        min_items = zones_changes.get(InventoryOperation.MIN, zeros.copy())
+        max_items = np.array(zones_changes.get(InventoryOperation.MAX, infs))
+        min_items = np.array(zones_changes.get(InventoryOperation.MIN, zeros))
 
         # Current zone
         current_changes = self._inventory_operations.get(InventoryOwner.CURRENT, {})
@@ -553,9 +638,9 @@ class Transformation:
     ):
         owner = InventoryOwner(owner)
         if owner is InventoryOwner.PLAYER:
-            world_items_list = world.items
+            n_slots, slot_from_item = len(world.items), world.slot_from_item
         else:
-            world_items_list = world.zones_items
+            n_slots, slot_from_item = len(world.zones_items), world.slot_from_zoneitem
 
         for operation, stacks in operations.items():
             operation = InventoryOperation(operation)
@@ -563,12 +648,10 @@ class Transformation:
             if operation is InventoryOperation.MAX:
                 default_value = np.inf
             if owner is InventoryOwner.ZONES:
-                operation_arr = self._build_zones_items_op(
-                    stacks, world.zones, world.zones_items, default_value
-                )
+                operation_arr = self._build_zones_items_op(stacks, world, default_value)
             else:
                 operation_arr = self._build_operation_array(
-                    stacks, world_items_list, default_value
+                    stacks, n_slots, slot_from_item, default_value
                 )
             if owner not in self._inventory_operations:
                 self._inventory_operations[owner] = {}
@@ -583,29 +666,28 @@ class Transformation:
     def _build_operation_array(
         self,
         stacks: List[Stack],
-        world_items_list: List["Item"],
+        n_slots: int,
+        slot_from_item: Callable[["Item"], int],
         default_value: int = 0,
     ) -> np.ndarray:
-        operation = default_value * np.ones(len(world_items_list), dtype=np.int32)
+        operation = default_value * np.ones(n_slots, dtype=np.int32)
         for stack in stacks:
-            item_slot = world_items_list.index(stack.item)
-            operation[item_slot] = stack.quantity
+            operation[slot_from_item(stack.item)] = stack.quantity
         return operation
 
     def _build_zones_items_op(
         self,
         stacks_per_zone: Dict[Zone, List["Stack"]],
-        zones: List[Zone],
-        zones_items: List["Item"],
+        world: "World",
         default_value: float = 0.0,
     ) -> np.ndarray:
         operation = default_value * np.ones(
-            (len(zones), len(zones_items)), dtype=np.int32
+            (len(world.zones), len(world.zones_items)), dtype=np.int32
         )
         for zone, stacks in stacks_per_zone.items():
-            zone_slot = zones.index(zone)
+            zone_slot = world.slot_from_zone(zone)
             for stack in stacks:
-                item_slot = zones_items.index(stack.item)
+                item_slot = world.slot_from_zoneitem(stack.item)
                 operation[zone_slot, item_slot] = stack.quantity
         return operation
 
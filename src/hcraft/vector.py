@@ -0,0 +1,429 @@
+"""# Shared-memory vector environment
+
+Vector environments like gymnasium's `AsyncVectorEnv` send observations, rewards and infos
+(including the `action_is_legal` masks) through pipes at every step.
+For HierarchyCraft environments, most of the step time is then spent in inter-process communication
+rather than in the simulation itself.
+
+`SharedMemoryVectorEnv` instead gives each worker process a slice of a
+`hcraft.batched.BatchedHcraftEnv` whose arrays all live in a single `multiprocessing.shared_memory` block.
+Workers read their actions and write observations, legal actions masks, rewards and done flags in place,
+so only short commands and acknowledgements go through pipes.
+
+## Example
+
+```python
+from functools import partial
+
+from hcraft.examples import MineHcraftEnv
+from hcraft.vector import SharedMemoryVectorEnv
+
+envs = SharedMemoryVectorEnv(
+    partial(MineHcraftEnv, max_step=100), num_envs=256, num_workers=4
+)
+observations, infos = envs.reset(seed=0)
+for _ in range(100):
+    actions = envs.sample_legal_actions()
+    observations, rewards, terminated, truncated, infos = envs.step(actions)
+envs.close()
+```
+
+Done environments are reset in the same step (gymnasium's 'SameStep' autoreset mode),
+their last observation being given in `infos["final_obs"]` for rows flagged in `infos["_final_obs"]`.
+
+## Warm workers
+
+The environment is built once in the main process.
+With the 'fork' start method, workers inherit this built environment copy-on-write
+instead of building it again, so spawning many workers does not repeat
+the construction of the world, its requirements graph and purpose.
+Transformations are compiled once in the main process too
+(see `hcraft.batched.CompiledTransformations`) and shared with every worker.
+
+Otherwise, the environment factory is sent to worker processes so it must be picklable.
+Wrapping it in a `WarmEnv` builds it at most once per process,
+and with the 'forkserver' start method, warming it in a preloaded module
+(see `multiprocessing.set_forkserver_preload`) builds it once in the forkserver
+for all the workers forked from it:
+
+```python
+# my_envs.py, preloaded with mp.set_forkserver_preload(["my_envs"])
+from hcraft.vector import WarmEnv
+
+mine_env = WarmEnv("mine", partial(MineHcraftEnv, max_step=100)).warm()
+```
+
+```python
+from my_envs import mine_env
+
+envs = SharedMemoryVectorEnv(mine_env, num_envs=256, num_workers=64, context="forkserver")
+```
+
+"""
+
+import multiprocessing as mp
+import traceback
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from hcraft.batched import (
+    BatchedHcraftEnv,
+    CompiledTransformations,
+    batched_buffers_shapes,
+    sample_from_masks,
+)
+from hcraft.env import HcraftEnv, LegalActionsInfo
+
+# Gym is an optional dependency.
+try:
+    import gymnasium as gym
+    from gymnasium.vector.utils import batch_space
+
+    VectorEnv = gym.vector.VectorEnv
+    AUTORESET_METADATA = {"autoreset_mode": gym.vector.AutoresetMode.SAME_STEP}
+except ImportError:
+    VectorEnv = object
+    batch_space = None
+    AUTORESET_METADATA = {}
+
+
+BuffersLayout = Dict[str, Tuple[int, Tuple[int, ...], np.dtype]]
+"""Offset, shape and dtype of each array in a shared memory block."""
+
+_ALIGNMENT = 64
+
+_WARM_ENVS: Dict[str, HcraftEnv] = {}
+"""Environments already built in this process by name, see `WarmEnv`."""
+
+
+class WarmEnv:
+    """Picklable environment factory building its environment at most once per process.
+
+    Processes forked after the environment was built (with the 'fork' start method
+    or from a forkserver that preloaded it) share it copy-on-write.
+    Every call in a process returns the same environment.
+    """
+
+    def __init__(self, name: str, env_fn: Callable[[], HcraftEnv]) -> None:
+        """
+        Args:
+            name: Unique name of the environment within processes.
+            env_fn: Function building the environment, must be picklable
+                to be used with start methods other than 'fork'.
+        """
+        self.name = name
+        self.env_fn = env_fn
+
+    def warm(self) -> "WarmEnv":
+        """Build the environment and its purpose in this process if not done yet."""
+        if self.name not in _WARM_ENVS:
+            env = self.env_fn()
+            env._build_purpose()
+            _WARM_ENVS[self.name] = env
+        return self
+
+    def __call__(self) -> HcraftEnv:
+        return _WARM_ENVS[self.warm().name]
+
+
+class SharedMemoryVectorEnv(VectorEnv):
+    """Vector of HierarchyCraft environments stepped by worker processes in shared memory."""
+
+    def __init__(
+        self,
+        env_fn: Callable[[], HcraftEnv],
+        num_envs: int,
+        num_workers: Optional[int] = None,
+        context: Optional[str] = None,
+        copy: bool = True,
+    ) -> None:
+        """
+        Args:
+            env_fn: Function creating the environment to vectorize.
+            num_envs: Number of environments.
+            num_workers: Number of worker processes, each stepping a slice of the environments.
+                Defaults to the number of CPUs (at most num_envs).
+            context: Multiprocessing start method ('fork', 'spawn', 'forkserver').
+                Defaults to None, hence the default start method.
+            copy: If True, arrays returned by `reset` and `step` are copies,
+                otherwise they are views in shared memory overwritten by the next call
+                and kept readable after `close` until they are dropped.
+                Defaults to True.
+        """
+        if num_workers is None:
+            num_workers = mp.cpu_count()
+        num_workers = max(1, min(num_workers, num_envs))
+
+        self.env = env_fn()
+        self.env._build_purpose()
+        self.compiled = CompiledTransformations(self.env.world)
+        """Transformations compiled once and shared with every worker."""
+        self.num_envs = num_envs
+        self.num_workers = num_workers
+        self.copy = copy
+        self.legal_actions_info = self.env.legal_actions_info
+        self.metadata = dict(AUTORESET_METADATA)
+        self.closed = False
+
+        self.single_observation_space = self.env.observation_space
+        self.single_action_space = self.env.action_space
+        if batch_space is not None:
+            self.observation_space = batch_space(
+                self.single_observation_space, num_envs
+            )
+            self.action_space = batch_space(self.single_action_space, num_envs)
+
+        ctx = mp.get_context(context)
+        # Forked workers inherit the built environment instead of building it again.
+        env_source = self.env if ctx.get_start_method() == "fork" else env_fn
+
+        shapes = _shared_buffers_shapes(self.env, num_envs)
+        layout, size = _buffers_layout(shapes)
+        self._shared_memory = SharedMemory(create=True, size=size)
+        self._buffers = _buffers_from_layout(self._shared_memory, layout)
+
+        bounds = np.linspace(0, num_envs, num_workers + 1).astype(int)
+        self._slices = [slice(start, stop) for start, stop in zip(bounds, bounds[1:])]
+        self._connections: List[Connection] = []
+        self._processes: List[mp.Process] = []
+        for rows in self._slices:
+            parent_connection, child_connection = ctx.Pipe()
+            process = ctx.Process(
+                target=_worker,
+                args=(
+                    child_connection,
+                    env_source,
+                    self.compiled,
+                    self._shared_memory.name,
+                    layout,
+                    rows,
+                ),
+                daemon=True,
+            )
+            process.start()
+            child_connection.close()
+            self._connections.append(parent_connection)
+            self._processes.append(process)
+        self._receive_all()
+
+    def reset(
+        self, *, seed: Optional[int] = None, options: Optional[dict] = None
+    ) -> Tuple[np.ndarray, dict]:
+        """Reset all environments.
+
+        Returns:
+            Observations of shape (num_envs, observation_size) and infos.
+        """
+        if seed is not None:
+            self._np_random = np.random.default_rng(seed)
+        for worker, connection in enumerate(self._connections):
+            worker_seed = None if seed is None else seed + worker
+            connection.send(("reset", worker_seed))
+        self._receive_all()
+        return self._output(self._buffers["observation"]), self._infos()
+
+    def step(
+        self, actions: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, dict]:
+        """Perform one step in every environment given the index of their transformation.
+
+        Returns:
+            observations, rewards, terminated, truncated and infos of every environment.
+        """
+        self._buffers["actions"][:] = np.asarray(actions).reshape(self.num_envs)
+        for connection in self._connections:
+            connection.send(("step", None))
+        self._receive_all()
+
+        buffers = self._buffers
+        infos = {}
+        if np.any(buffers["final_obs_mask"]):
+            infos["final_obs"] = buffers["final_obs"].copy()
+            infos["_final_obs"] = buffers["final_obs_mask"].copy()
+        infos.update(self._infos())
+        return (
+            self._output(buffers["observation"]),
+            self._output(buffers["rewards"]),
+            self._output(buffers["terminated"]),
+            self._output(buffers["truncated"]),
+            infos,
+        )
+
+    def action_masks(self) -> np.ndarray:
+        """Boolean masks of valid actions of shape (num_envs, n_transformations)."""
+        return self._output(self._buffers["action_masks"])
+
+    def sample_legal_actions(
+        self, rng: Optional[np.random.Generator] = None
+    ) -> np.ndarray:
+        """Sample uniformly one of the valid actions of each environment.
+
+        Args:
+            rng: Random generator to sample with.
+                Defaults to the vector environment random generator.
+        """
+        if rng is None:
+            rng = self._rng
+        return sample_from_masks(self._buffers["action_masks"], rng)
+
+    @property
+    def _rng(self) -> np.random.Generator:
+        if getattr(self, "_np_random", None) is None:
+            self._np_random = np.random.default_rng()
+        return self._np_random
+
+    def close(self, **_kwargs: Any) -> None:
+        """Stop the workers and release the shared memory."""
+        if self.closed:
+            return
+        self.closed = True
+        for connection in self._connections:
+            try:
+                connection.send(("close", None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+        for connection in self._connections:
+            connection.close()
+        self._buffers = {}
+        try:
+            self._shared_memory.close()
+        except BufferError:
+            # Arrays returned without copy still view the memory,
+            # which is released once they are dropped.
+            pass
+        self._shared_memory.unlink()
+
+    def __del__(self):
+        if not getattr(self, "closed", True):
+            self.close()
+
+    def _infos(self) -> dict:
+        infos = {}
+        masks = self._buffers["action_masks"]
+        if self.legal_actions_info is LegalActionsInfo.MASK:
+            infos["action_is_legal"] = self._output(masks)
+        elif self.legal_actions_info is LegalActionsInfo.BITSET:
+            infos["legal_actions_bitset"] = np.packbits(masks, axis=1)
+        return infos
+
+    def _output(self, array: np.ndarray) -> np.ndarray:
+        return array.copy() if self.copy else array
+
+    def _receive_all(self) -> None:
+        errors = []
+        for worker, connection in enumerate(self._connections):
+            status, message = connection.recv()
+            if status == "error":
+                errors.append(f"Worker {worker} failed with:\n{message}")
+        if errors:
+            self.close()
+            raise RuntimeError("\n".join(errors))
+
+
+def _worker(
+    connection: Connection,
+    env_source: Union[HcraftEnv, Callable[[], HcraftEnv]],
+    compiled: CompiledTransformations,
+    shared_memory_name: str,
+    layout: BuffersLayout,
+    rows: slice,
+) -> None:
+    shared_memory = SharedMemory(name=shared_memory_name)
+    try:
+        _serve(connection, env_source, compiled, shared_memory, layout, rows)
+    except (KeyboardInterrupt, EOFError):
+        pass
+    except Exception:  # pylint: disable=broad-except
+        connection.send(("error", traceback.format_exc()))
+    finally:
+        shared_memory.close()
+        connection.close()
+
+
+def _serve(
+    connection: Connection,
+    env_source: Union[HcraftEnv, Callable[[], HcraftEnv]],
+    compiled: CompiledTransformations,
+    shared_memory: SharedMemory,
+    layout: BuffersLayout,
+    rows: slice,
+) -> None:
+    buffers = {
+        name: array[rows]
+        for name, array in _buffers_from_layout(shared_memory, layout).items()
+    }
+    env = env_source if isinstance(env_source, HcraftEnv) else env_source()
+    batched_env = BatchedHcraftEnv(
+        env, num_envs=rows.stop - rows.start, buffers=buffers, compiled=compiled
+    )
+    # Masks are always written for the main process to use.
+    batched_env.legal_actions_info = LegalActionsInfo.NONE
+    connection.send(("ok", None))
+    while True:
+        command, data = connection.recv()
+        if command == "reset":
+            batched_env.reset(seed=data)
+            buffers["final_obs_mask"][:] = False
+        elif command == "step":
+            _obs, _rewards, _terminated, _truncated, infos = batched_env.step(
+                buffers["actions"]
+            )
+            done = infos.get("_final_obs")
+            buffers["final_obs_mask"][:] = False if done is None else done
+            if done is not None:
+                buffers["final_obs"][done] = infos["final_obs"][done]
+        elif command == "close":
+            return
+        else:
+            raise ValueError(f"Unknown command: {command}")
+        batched_env.action_masks()
+        connection.send(("ok", None))
+
+
+def _shared_buffers_shapes(
+    env: HcraftEnv, num_envs: int
+) -> Dict[str, Tuple[Tuple[int, ...], np.dtype]]:
+    shapes = batched_buffers_shapes(env, num_envs)
+    observation_shape, observation_dtype = shapes["observation"]
+    shapes.update(
+        {
+            "actions": ((num_envs,), np.dtype(np.int64)),
+            "final_obs": (observation_shape, observation_dtype),
+            "final_obs_mask": ((num_envs,), np.dtype(bool)),
+        }
+    )
+    return shapes
+
+
+def _buffers_layout(
+    shapes: Dict[str, Tuple[Tuple[int, ...], np.dtype]],
+) -> Tuple[BuffersLayout, int]:
+    layout = {}
+    offset = 0
+    for name, (shape, dtype) in shapes.items():
+        layout[name] = (offset, shape, dtype)
+        nbytes = int(np.prod(shape, dtype=np.int64)) * dtype.itemsize
+        offset += -(-nbytes // _ALIGNMENT) * _ALIGNMENT
+    return layout, max(offset, 1)
+
+
+def _buffers_from_layout(
+    shared_memory: SharedMemory, layout: BuffersLayout
+) -> Dict[str, np.ndarray]:
+    # Arrays hold an export of the buffer, so the memory cannot be unmapped under them.
+    return {
+        name: np.frombuffer(
+            shared_memory.buf,
+            dtype=dtype,
+            count=int(np.prod(shape, dtype=np.int64)),
+            offset=offset,
+        ).reshape(shape)
+        for name, (offset, shape, dtype) in layout.items()
+    }
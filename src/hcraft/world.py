@@ -32,16 +32,40 @@ world = world_from_transformations(
 )
 ```
 
+## Fingerprint
+
+`World.fingerprint` is a stable hash of the world definition:
+its transformations and start conditions.
+Worlds defined the same way have the same fingerprint in every process,
+whatever the order of their elements, so it can key caches of build artifacts
+(see `hcraft.build_cache`).
+
 """
 
+import hashlib
+import json
+import math
 from dataclasses import dataclass, field
 from functools import partial
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple, Union
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple, Union
+from weakref import WeakSet
+
+import numpy as np
 
 from hcraft.elements import Item, Stack, Zone
-from hcraft.requirements import RequirementNode, Requirements, req_node_name
-from hcraft.transformation import Transformation, InventoryOwner
+from hcraft.requirements import (
+    RequirementNode,
+    Requirements,
+    req_node_name,
+    requirements_levels,
+)
+from hcraft.transformation import InventoryOwner, Transformation, Use, Yield
+
+if TYPE_CHECKING:
+    from hcraft.build_cache import BuildCacheEntry
+    from hcraft.state import HcraftState
 
 
 def _default_resources_path() -> Path:
@@ -71,23 +95,31 @@ class World:
 
     def __post_init__(self):
         self._requirements = None
+        self._zones_candidates: Optional[List[np.ndarray]] = None
+        self._live_states: "WeakSet[HcraftState]" = WeakSet()
+        self._version = 0
+        self._mapped_file: Optional[str] = None
+        self._build_cache: Optional["BuildCacheEntry"] = None
+        self._fingerprint: Optional[Tuple[int, str]] = None
+        self._frozen = False
 
         if self.order_world:
-            item_rank = partial(
-                _get_node_level, self.requirements, node_type=RequirementNode.ITEM
-            )
+            levels = requirements_levels(self)
+            item_rank = partial(_get_node_level, levels, node_type=RequirementNode.ITEM)
             self.items.sort(key=item_rank)
 
             zone_item_rank = partial(
-                _get_node_level, self.requirements, node_type=RequirementNode.ZONE_ITEM
+                _get_node_level, levels, node_type=RequirementNode.ZONE_ITEM
             )
             self.zones_items.sort(key=zone_item_rank)
 
-            zone_rank = partial(
-                _get_node_level, self.requirements, node_type=RequirementNode.ZONE
-            )
+            zone_rank = partial(_get_node_level, levels, node_type=RequirementNode.ZONE)
             self.zones.sort(key=zone_rank)
 
+        self._items_slots = _slots(self.items)
+        self._zones_slots = _slots(self.zones)
+        self._zones_items_slots = _slots(self.zones_items)
+
         for transfo in self.transformations:
             transfo.build(self)
 
@@ -114,20 +146,255 @@ class World:
 
         """
         if self._requirements is None:
-            self._requirements = Requirements(self)
+            if self._build_cache is not None and self._version == 0:
+                self._requirements = self._build_cache.requirements(self)
+            else:
+                self._requirements = Requirements(self)
         return self._requirements
 
+    @property
+    def fingerprint(self) -> str:
+        """Stable hash of the world transformations and start conditions.
+
+        See `definition_fingerprint` for details.
+        """
+        if self._fingerprint is None or self._fingerprint[0] != self._version:
+            fingerprint = definition_fingerprint(
+                self.transformations,
+                start_zone=self.start_zone,
+                start_items=self.start_items,
+                start_zones_items=self.start_zones_items,
+            )
+            self._fingerprint = (self._version, fingerprint)
+        return self._fingerprint[1]
+
+    @property
+    def version(self) -> int:
+        """Number of times elements were added to the world.
+
+        Objects deriving cached structures from the world can compare it
+        to know if they need to be updated.
+        """
+        return self._version
+
+    @property
+    def frozen(self) -> bool:
+        """Whether the world was frozen to be shared as a template, see `World.freeze`."""
+        return self._frozen
+
+    def freeze(self) -> "World":
+        """Freeze the world so it can be shared by many environments as a template.
+
+        Elements can no longer be added to a frozen world,
+        its transformations can no longer be built on another world
+        and their array operations become read-only.
+        Environments sharing a frozen world only own their state and purpose.
+
+        Returns:
+            The world itself.
+        """
+        for transfo in self.transformations:
+            transfo._frozen = True
+            for operations in transfo._inventory_operations.values():
+                for operation_arr in operations.values():
+                    if operation_arr is not None:
+                        operation_arr.flags.writeable = False
+        self._frozen = True
+        return self
+
+    def _check_not_frozen(self) -> None:
+        if self._frozen:
+            raise ValueError(
+                "Cannot add elements to a frozen world shared as a template,"
+                " build a new world instead."
+            )
+
+    def register_state(self, state: "HcraftState") -> None:
+        """Register a live state to extend when elements are added to the world."""
+        self._live_states.add(state)
+
+    def add_items(self, items: List[Item]) -> List[Item]:
+        """Add items the player can have, without rebuilding the world.
+
+        New items are appended after existing ones so existing slots are kept,
+        transformations and live states are extended with new slots.
+
+        Args:
+            items: Items to add. Items already in the world are ignored.
+
+        Returns:
+            The items that were actually added.
+
+        Raises:
+            ValueError: If the world is frozen.
+        """
+        self._check_not_frozen()
+        new_items = _new_elements(items, self.items)
+        if new_items:
+            self.items += new_items
+            self._items_slots = _slots(self.items)
+            self._extend(n_items=len(new_items))
+        return new_items
+
+    def add_zones(self, zones: List[Zone]) -> List[Zone]:
+        """Add zones, without rebuilding the world.
+
+        New zones are appended after existing ones so existing slots are kept,
+        transformations and live states are extended with new slots.
+
+        Args:
+            zones: Zones to add. Zones already in the world are ignored.
+
+        Returns:
+            The zones that were actually added.
+
+        Raises:
+            ValueError: If the world is frozen.
+        """
+        self._check_not_frozen()
+        new_zones = _new_elements(zones, self.zones)
+        if new_zones:
+            self.zones += new_zones
+            self._zones_slots = _slots(self.zones)
+            self._zones_candidates = None
+            self._extend(n_zones=len(new_zones))
+        return new_zones
+
+    def add_zones_items(self, zones_items: List[Item]) -> List[Item]:
+        """Add items the zones can have, without rebuilding the world.
+
+        New zones items are appended after existing ones so existing slots are kept,
+        transformations and live states are extended with new slots.
+
+        Args:
+            zones_items: Zones items to add. Zones items already in the world are ignored.
+
+        Returns:
+            The zones items that were actually added.
+
+        Raises:
+            ValueError: If the world is frozen.
+        """
+        self._check_not_frozen()
+        new_zones_items = _new_elements(zones_items, self.zones_items)
+        if new_zones_items:
+            self.zones_items += new_zones_items
+            self._zones_items_slots = _slots(self.zones_items)
+            self._extend(n_zones_items=len(new_zones_items))
+        return new_zones_items
+
+    def add_transformations(self, transformations: List["Transformation"]) -> None:
+        """Add transformations, without rebuilding the world.
+
+        Items, zones and zones items used by the new transformations are added first,
+        then only the new transformations are built.
+        Live states are extended with new slots.
+
+        Args:
+            transformations: Transformations to add.
+
+        Raises:
+            ValueError: If the world is frozen.
+        """
+        self._check_not_frozen()
+        zones, items, zones_items = set(), set(), set()
+        for transfo in transformations:
+            zones, items, zones_items = _transformations_elements(
+                transfo, zones, items, zones_items
+            )
+        self.add_items(_sorted_by_name(items))
+        self.add_zones(_sorted_by_name(zones))
+        self.add_zones_items(_sorted_by_name(zones_items))
+
+        for transfo in transformations:
+            transfo.build(self)
+        self.transformations += transformations
+        self._zones_candidates = None
+        self._extend()
+
+    def _extend(
+        self, n_items: int = 0, n_zones: int = 0, n_zones_items: int = 0
+    ) -> None:
+        if n_items or n_zones or n_zones_items:
+            for transfo in self.transformations:
+                transfo.extend(n_items, n_zones, n_zones_items)
+        for state in self._live_states:
+            state.extend()
+        self._requirements = None
+        self._version += 1
+
+    def candidate_transformations(self, zone_slot: Optional[int] = None) -> np.ndarray:
+        """Indexes of transformations that may be valid when the player is in the given zone.
+
+        Transformations restricted to another zone or moving to the given zone
+        can never be valid there, so only the given zone's bucket and
+        the unrestricted transformations are candidates.
+
+        Args:
+            zone_slot: Slot of the zone where the player is.
+                If None, all transformations are candidates.
+
+        Returns:
+            Sorted array of candidate transformations indexes.
+        """
+        if zone_slot is None or self.n_zones == 0:
+            return np.arange(len(self.transformations))
+        if self._zones_candidates is None:
+            self._zones_candidates = self._build_zones_candidates()
+        return self._zones_candidates[zone_slot]
+
+    def _build_zones_candidates(self) -> List[np.ndarray]:
+        zones_buckets: List[List[int]] = [[] for _ in self.zones]
+        for index, transfo in enumerate(self.transformations):
+            if transfo.zone is not None:
+                zones_buckets[self.slot_from_zone(transfo.zone)].append(index)
+                continue
+            for bucket in zones_buckets:
+                bucket.append(index)
+
+        zones_candidates = []
+        for zone, bucket in zip(self.zones, zones_buckets):
+            zones_candidates.append(
+                np.array(
+                    [
+                        index
+                        for index in bucket
+                        if self.transformations[index].destination != zone
+                    ],
+                    dtype=np.int64,
+                )
+            )
+        return zones_candidates
+
     def slot_from_item(self, item: Item) -> int:
         """Item's slot in the world"""
-        return self.items.index(item)
+        return _slot(self._items_slots, item)
 
     def slot_from_zone(self, zone: Zone) -> int:
         """Zone's slot in the world"""
-        return self.zones.index(zone)
+        return _slot(self._zones_slots, zone)
 
     def slot_from_zoneitem(self, zone: Zone) -> int:
         """Item's slot in the world as a zone item."""
-        return self.zones_items.index(zone)
+        return _slot(self._zones_items_slots, zone)
+
+    def __getstate__(self) -> dict:
+        # Live states are weakly referenced, they register again on the unpickled world.
+        state = self.__dict__.copy()
+        state["_live_states"] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._live_states = WeakSet()
+
+    def __reduce__(self):
+        # Worlds mapping a world file are pickled as its path to map it again.
+        if self._mapped_file is not None and self._version == 0:
+            return (_load_mapped_world, (self._mapped_file,))
+        # Pickle compact tables instead of the built transformations,
+        # derived structures like the requirements graph are rebuilt lazily.
+        return (_world_from_tables, (_world_tables(self),))
 
 
 def world_from_transformations(
@@ -138,7 +405,13 @@ def world_from_transformations(
     order_world: bool = True,
 ) -> World:
     """Reads the transformation to build the list of items, zones and zones_items
-    composing the world."""
+    composing the world.
+
+    If a build cache is enabled (see `hcraft.build_cache`),
+    the world is loaded from it when it was already built with the same definition.
+    Its transformations are then equivalent ones in the same order,
+    not the given transformation objects.
+    """
     start_items = start_items if start_items is not None else []
     for i, stack in enumerate(start_items):
         if not isinstance(stack, Stack):
@@ -149,6 +422,108 @@ def world_from_transformations(
             if not isinstance(stack, Stack):
                 start_zones_items[zone][i] = Stack(stack)
 
+    # pylint: disable=import-outside-toplevel
+    from hcraft.build_cache import get_build_cache
+
+    build = partial(
+        _world_from_definition,
+        transformations,
+        start_zone,
+        start_items,
+        start_zones_items,
+        order_world,
+    )
+    build_cache = get_build_cache()
+    if build_cache is None:
+        return build()
+    fingerprint = definition_fingerprint(
+        transformations, start_zone, start_items, start_zones_items
+    )
+    return build_cache.world(fingerprint, order_world, build)
+
+
+def definition_fingerprint(
+    transformations: List["Transformation"],
+    start_zone: Optional[Zone] = None,
+    start_items: Optional[List[Union[Stack, Item]]] = None,
+    start_zones_items: Optional[Dict[Zone, List[Union[Stack, Item]]]] = None,
+) -> str:
+    """Stable hash of a world definition, as given to `world_from_transformations`.
+
+    Transformations are hashed in order with the inventory changes they were created with,
+    start items are hashed regardless of their order.
+
+    Returns:
+        Hexadecimal SHA-256 digest of the definition.
+    """
+    start_stacks = [
+        stack if isinstance(stack, Stack) else Stack(stack)
+        for stack in (start_items or [])
+    ]
+    start_zones_stacks = {
+        zone.name: sorted(
+            _stack_definition(stack if isinstance(stack, Stack) else Stack(stack))
+            for stack in stacks
+        )
+        for zone, stacks in (start_zones_items or {}).items()
+    }
+    definition = {
+        "transformations": [
+            _transformation_definition(transfo) for transfo in transformations
+        ],
+        "start_zone": start_zone.name if start_zone is not None else None,
+        "start_items": sorted(_stack_definition(stack) for stack in start_stacks),
+        "start_zones_items": sorted(start_zones_stacks.items()),
+    }
+    encoded = json.dumps(definition, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _transformation_definition(transfo: "Transformation") -> List[Any]:
+    changes = []
+    for change in transfo._changes_list or []:
+        if isinstance(change.owner, Zone):
+            owner = ["zone", change.owner.name]
+        else:
+            owner = [change.owner.value]
+        is_use = isinstance(change, Use)
+        quantity = change.consume if is_use else change.create
+        changes.append(
+            [
+                "use" if is_use else "yield",
+                owner,
+                change.item.name,
+                _canonical_number(quantity),
+                _canonical_number(change.min),
+                _canonical_number(change.max),
+            ]
+        )
+    # Default names are derived from inventory changes, so only given names are hashed.
+    return [
+        transfo._given_name,
+        transfo.zone.name if transfo.zone is not None else None,
+        transfo.destination.name if transfo.destination is not None else None,
+        changes,
+    ]
+
+
+def _stack_definition(stack: Stack) -> Tuple[str, int]:
+    return (stack.item.name, int(stack.quantity))
+
+
+def _canonical_number(value: Union[int, float]) -> Union[int, str]:
+    if math.isinf(value):
+        return "inf" if value > 0 else "-inf"
+    return int(value)
+
+
+def _world_from_definition(
+    transformations: List["Transformation"],
+    start_zone: Optional[Zone],
+    start_items: List[Stack],
+    start_zones_items: Dict[Zone, List[Stack]],
+    order_world: bool,
+) -> World:
     zones, items, zones_items = _start_elements(
         start_zone, start_items, start_zones_items
     )
@@ -213,11 +588,38 @@ def _transformations_elements(
     return zones, items, zones_items
 
 
+def _new_elements(
+    elements: List[Union[Item, Zone]], existing: List[Union[Item, Zone]]
+) -> List[Union[Item, Zone]]:
+    existing = set(existing)
+    new_elements = []
+    for element in elements:
+        if element not in existing:
+            existing.add(element)
+            new_elements.append(element)
+    return new_elements
+
+
+def _sorted_by_name(elements: Set[Union[Item, Zone]]) -> List[Union[Item, Zone]]:
+    return sorted(elements, key=lambda element: element.name)
+
+
 def _get_node_level(
-    requirements: Requirements, obj: Union[Item, Zone], node_type: RequirementNode
+    levels: Dict[str, int], obj: Union[Item, Zone], node_type: RequirementNode
 ):
     node_name = req_node_name(obj, node_type=node_type)
-    return (requirements.graph.nodes[node_name].get("level", 1000), node_name)
+    return (levels.get(node_name, 1000), node_name)
+
+
+def _slots(elements: List[Union[Item, Zone]]) -> Dict[Union[Item, Zone], int]:
+    return {element: slot for slot, element in enumerate(elements)}
+
+
+def _slot(slots: Dict[Union[Item, Zone], int], element: Union[Item, Zone]) -> int:
+    slot = slots.get(element)
+    if slot is None:
+        raise ValueError(f"{element} is not in the world.")
+    return slot
 
 
 def _add_items_to(stacks: Optional[List[Stack]], items_set: Set[Item]):
@@ -237,3 +639,197 @@ def _add_dict_items_to(
             zones_set.add(zone)
             items_set = _add_items_to(stacks, items_set)
     return items_set, zones_set
+
+
+_OWNERS_CODES = {
+    InventoryOwner.PLAYER: -1,
+    InventoryOwner.CURRENT: -2,
+    InventoryOwner.DESTINATION: -3,
+}
+"""Codes of non-zone owners of inventory changes, zones are coded by their slot."""
+_USE, _YIELD = 0, 1
+
+
+def _world_tables(world: World) -> Dict[str, Any]:
+    """Compact representation of a world with element names tables and flat arrays.
+
+    Transformations are given by the inventory changes they were created with,
+    one entry per change in each `changes_*` array, referencing elements by their slot.
+    """
+    changes_rows = []
+    changes_counts = []
+    for transfo in world.transformations:
+        changes_list = transfo._changes_list or []
+        changes_counts.append(len(changes_list))
+        for change in changes_list:
+            if isinstance(change.owner, Zone):
+                owner = world.slot_from_zone(change.owner)
+            else:
+                owner = _OWNERS_CODES[change.owner]
+            if owner == _OWNERS_CODES[InventoryOwner.PLAYER]:
+                item = world.slot_from_item(change.item)
+            else:
+                item = world.slot_from_zoneitem(change.item)
+            is_use = isinstance(change, Use)
+            quantity = change.consume if is_use else change.create
+            kind = _USE if is_use else _YIELD
+            changes_rows.append((kind, owner, item, quantity, change.min, change.max))
+    changes = np.array(changes_rows, dtype=np.float64).reshape(-1, 6)
+    start_zones_items = [
+        (
+            world.slot_from_zone(zone),
+            world.slot_from_zoneitem(stack.item),
+            stack.quantity,
+        )
+        for zone, stacks in world.start_zones_items.items()
+        for stack in stacks
+    ]
+    transformations = world.transformations
+    return {
+        "items": [item.name for item in world.items],
+        "zones": [zone.name for zone in world.zones],
+        "zones_items": [item.name for item in world.zones_items],
+        "transformations_names": [transfo._given_name for transfo in transformations],
+        "transformations_zones": _compact_ints(
+            [_optional_slot(world, transfo.zone) for transfo in transformations]
+        ),
+        "transformations_destinations": _compact_ints(
+            [_optional_slot(world, transfo.destination) for transfo in transformations]
+        ),
+        "changes_counts": _compact_ints(changes_counts),
+        "changes_kinds": _compact_ints(changes[:, 0]),
+        "changes_owners": _compact_ints(changes[:, 1]),
+        "changes_items": _compact_ints(changes[:, 2]),
+        "changes_quantities": _compact_ints(changes[:, 3]),
+        "changes_mins": _encode_bounds(changes[:, 4]),
+        "changes_maxs": _encode_bounds(changes[:, 5]),
+        "start_zone": _optional_slot(world, world.start_zone),
+        "start_items": _compact_ints(
+            [
+                (world.slot_from_item(stack.item), stack.quantity)
+                for stack in world.start_items
+            ]
+        ).reshape(-1, 2),
+        "start_zones_items": _compact_ints(start_zones_items).reshape(-1, 3),
+        "resources_path": str(world.resources_path),
+    }
+
+
+def _world_from_tables(tables: Dict[str, Any]) -> World:
+    """Rebuild a world from its compact representation, see `_world_tables`."""
+    items = [Item(name) for name in tables["items"]]
+    zones = [Zone(name) for name in tables["zones"]]
+    zones_items = [Item(name) for name in tables["zones_items"]]
+    transformations = _transformations_from_tables(tables, items, zones, zones_items)
+    start_zones_items: Dict[Zone, List[Stack]] = {}
+    for zone_slot, item_slot, quantity in tables["start_zones_items"].tolist():
+        start_zones_items.setdefault(zones[zone_slot], []).append(
+            Stack(zones_items[item_slot], quantity)
+        )
+    return World(
+        items=items,
+        zones=zones,
+        zones_items=zones_items,
+        transformations=transformations,
+        start_zone=_optional_element(zones, tables["start_zone"]),
+        start_items=[
+            Stack(items[item_slot], quantity)
+            for item_slot, quantity in tables["start_items"].tolist()
+        ],
+        start_zones_items=start_zones_items,
+        resources_path=Path(tables["resources_path"]),
+        order_world=False,
+    )
+
+
+def _transformations_from_tables(
+    tables: Dict[str, Any],
+    items: List[Item],
+    zones: List[Zone],
+    zones_items: List[Item],
+) -> List[Transformation]:
+    """Unbuilt transformations of a world compact representation, see `_world_tables`."""
+    owners = {code: owner for owner, code in _OWNERS_CODES.items()}
+    changes = zip(
+        tables["changes_kinds"].tolist(),
+        tables["changes_owners"].tolist(),
+        tables["changes_items"].tolist(),
+        tables["changes_quantities"].tolist(),
+        _decode_bounds(tables["changes_mins"]),
+        _decode_bounds(tables["changes_maxs"]),
+    )
+    changes_lists: List[List[Union[Use, Yield]]] = []
+    for count in tables["changes_counts"].tolist():
+        changes_list = []
+        for kind, owner, item_slot, quantity, min_value, max_value in islice(
+            changes, count
+        ):
+            if owner == _OWNERS_CODES[InventoryOwner.PLAYER]:
+                item = items[item_slot]
+            else:
+                item = zones_items[item_slot]
+            owner = owners[owner] if owner < 0 else zones[owner]
+            change_class = Use if kind == _USE else Yield
+            changes_list.append(
+                change_class(owner, item, quantity, min=min_value, max=max_value)
+            )
+        changes_lists.append(changes_list)
+
+    return [
+        Transformation(
+            name=name,
+            destination=_optional_element(zones, destination),
+            inventory_changes=changes_list if changes_list else None,
+            zone=_optional_element(zones, zone),
+        )
+        for name, zone, destination, changes_list in zip(
+            tables["transformations_names"],
+            tables["transformations_zones"].tolist(),
+            tables["transformations_destinations"].tolist(),
+            changes_lists,
+        )
+    ]
+
+
+def _load_mapped_world(path: str) -> World:
+    # pylint: disable=import-outside-toplevel
+    from hcraft.world_file import load_world
+
+    return load_world(path, mmap=True)
+
+
+def _optional_slot(world: World, zone: Optional[Zone]) -> int:
+    return -1 if zone is None else world.slot_from_zone(zone)
+
+
+def _optional_element(zones: List[Zone], slot: int) -> Optional[Zone]:
+    return None if slot < 0 else zones[slot]
+
+
+def _compact_ints(values) -> np.ndarray:
+    """Integer array with the smallest dtype able to hold the given values."""
+    values = np.asarray(values, dtype=np.int64)
+    if values.size == 0:
+        return values.astype(np.int8)
+    dtype = np.result_type(
+        np.min_scalar_type(values.min()), np.min_scalar_type(values.max())
+    )
+    return values.astype(dtype)
+
+
+_INFINITE_BOUND = np.iinfo(np.int32).max
+
+
+def _encode_bounds(bounds: np.ndarray) -> np.ndarray:
+    """Encode integer bounds that can be infinite as int32, infinities as extreme values."""
+    finite = np.isfinite(bounds)
+    if np.any(np.abs(bounds[finite]) >= _INFINITE_BOUND):
+        raise ValueError("Inventory changes bounds are too large to be encoded.")
+    return np.where(finite, bounds, np.sign(bounds) * _INFINITE_BOUND).astype(np.int32)
+
+
+def _decode_bounds(encoded: np.ndarray) -> List[Union[int, float]]:
+    bounds = encoded.tolist()
+    for index in np.flatnonzero(np.abs(encoded) >= _INFINITE_BOUND).tolist():
+        bounds[index] = np.sign(bounds[index]) * np.inf
+    return bounds
@@ -0,0 +1,299 @@
+"""# World files
+
+Save a built `hcraft.world.World` to disk and load it back ready to step,
+without running the Python code that generated it nor building its transformations again.
+
+A world file is made of two files side by side:
+* A JSON descriptor (`.json`) with the format version, elements names,
+    transformations names, the start state and any user metadata.
+* A NumPy archive (`.npz`) with the transformations inventory changes
+    and their compiled array operations.
+
+## Example
+
+```python
+from hcraft.examples import TowerHcraftEnv
+from hcraft.world_file import load_world, save_world
+
+world = TowerHcraftEnv(height=30, width=30).world
+save_world(world, "tower_30_30.json", metadata={"height": 30, "width": 30})
+
+world = load_world("tower_30_30.json")
+```
+
+Loaded array operations are read-only views of the archive arrays, shared by all transformations.
+Worlds files are meant to be loaded by the same or a later version of hcraft,
+loading a descriptor of an unknown format version raises a `ValueError`.
+
+## Sharing worlds between processes
+
+With `load_world(path, mmap=True)`, array operations are read-only `np.memmap`
+of the archive instead of being read in memory.
+All processes mapping the same world file then share the same physical pages,
+so the memory and startup cost of the array operations do not grow with the number of workers.
+Placing the world file on a memory filesystem (like /dev/shm) makes it a shared memory segment.
+
+Memory-mapped worlds are pickled as their path only,
+so sending them to worker processes (for example in `hcraft.vector.SharedMemoryVectorEnv`)
+maps the same file again, as long as no element was added to the world.
+Archives saved with `compress=True` cannot be memory-mapped.
+
+"""
+
+import json
+import struct
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from hcraft.elements import Item, Stack, Zone
+from hcraft.transformation import InventoryOperation, InventoryOwner, Transformation
+from hcraft.world import (
+    World,
+    _optional_element,
+    _transformations_from_tables,
+    _world_tables,
+)
+
+WORLD_FILE_FORMAT = "hcraft-world"
+WORLD_FILE_VERSION = 1
+"""Version of the world files format written by `save_world`."""
+
+_NAMES_TABLES = ("items", "zones", "zones_items", "transformations_names")
+
+
+def save_world(
+    world: World,
+    path: Union[str, Path],
+    metadata: Optional[Dict[str, Any]] = None,
+    compress: bool = False,
+) -> Tuple[Path, Path]:
+    """Save a built world as a JSON descriptor and a NumPy archive.
+
+    Args:
+        world: Built world to save.
+        path: Path of the JSON descriptor,
+            the archive is saved next to it with the '.npz' suffix.
+        metadata: JSON serializable metadata to save with the world. Defaults to None.
+        compress: If True, compress the archive, making it smaller but slower to load.
+            Defaults to False.
+
+    Returns:
+        Paths of the saved descriptor and archive.
+    """
+    path = Path(path)
+    arrays_path = path.with_suffix(".npz")
+    tables = _world_tables(world)
+    descriptor = {
+        "format": WORLD_FILE_FORMAT,
+        "version": WORLD_FILE_VERSION,
+        "arrays": arrays_path.name,
+        "metadata": metadata if metadata is not None else {},
+        "start_zone": tables.pop("start_zone"),
+        "resources_path": tables.pop("resources_path"),
+    }
+    for name in _NAMES_TABLES:
+        descriptor[name] = tables.pop(name)
+
+    arrays = {f"tables/{name}": array for name, array in tables.items()}
+    arrays.update(_operations_arrays(world))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as descriptor_file:
+        json.dump(descriptor, descriptor_file, indent=1)
+    with open(arrays_path, "wb") as arrays_file:
+        save = np.savez_compressed if compress else np.savez
+        save(arrays_file, **arrays)
+    return path, arrays_path
+
+
+def load_world(path: Union[str, Path], mmap: bool = False) -> World:
+    """Load a world saved with `save_world`, with already built transformations.
+
+    Args:
+        path: Path of the JSON descriptor.
+        mmap: If True, memory-map the array operations instead of reading them.
+            Defaults to False.
+
+    Raises:
+        ValueError: If the file is not a world file of a supported version,
+            or if a compressed archive is memory-mapped.
+    """
+    path = Path(path)
+    descriptor = read_world_descriptor(path)
+    arrays_path = path.parent / descriptor["arrays"]
+    if mmap:
+        arrays = _memmap_npz(arrays_path)
+    else:
+        with np.load(arrays_path) as archive:
+            arrays = {name: archive[name] for name in archive.files}
+    for array in arrays.values():
+        array.flags.writeable = False
+
+    tables = {
+        name[len("tables/") :]: array
+        for name, array in arrays.items()
+        if name.startswith("tables/")
+    }
+    for name in _NAMES_TABLES:
+        tables[name] = descriptor[name]
+    items = [Item(name) for name in descriptor["items"]]
+    zones = [Zone(name) for name in descriptor["zones"]]
+    zones_items = [Item(name) for name in descriptor["zones_items"]]
+    transformations = _transformations_from_tables(tables, items, zones, zones_items)
+    _set_operations(transformations, tables, arrays, n_zones=len(zones))
+
+    start_zones_items: Dict[Zone, List[Stack]] = {}
+    for zone_slot, item_slot, quantity in tables["start_zones_items"].tolist():
+        start_zones_items.setdefault(zones[zone_slot], []).append(
+            Stack(zones_items[item_slot], quantity)
+        )
+    # Transformations are added after the world creation so they are not built again.
+    world = World(
+        items=items,
+        zones=zones,
+        zones_items=zones_items,
+        start_zone=_optional_element(zones, descriptor["start_zone"]),
+        start_items=[
+            Stack(items[item_slot], quantity)
+            for item_slot, quantity in tables["start_items"].tolist()
+        ],
+        start_zones_items=start_zones_items,
+        resources_path=Path(descriptor["resources_path"]),
+        order_world=False,
+    )
+    world.transformations = transformations
+    if mmap:
+        world._mapped_file = str(path.resolve())
+    return world
+
+
+def read_world_descriptor(path: Union[str, Path]) -> Dict[str, Any]:
+    """Read the JSON descriptor of a world file, for example to get its metadata.
+
+    Raises:
+        ValueError: If the file is not a world file of a supported version.
+    """
+    with open(path, "r", encoding="utf-8") as descriptor_file:
+        descriptor = json.load(descriptor_file)
+    if descriptor.get("format") != WORLD_FILE_FORMAT:
+        raise ValueError(f"{path} is not an hcraft world file.")
+    version = descriptor.get("version")
+    if not isinstance(version, int) or version > WORLD_FILE_VERSION:
+        raise ValueError(
+            f"Unsupported world file version {version} in {path},"
+            f" this version of hcraft reads versions up to {WORLD_FILE_VERSION}."
+        )
+    return descriptor
+
+
+def _operations_arrays(world: World) -> Dict[str, np.ndarray]:
+    """Array operations of each owner and operation stacked over transformations having them.
+
+    Transformations having each operation are given by `<key>/transformations`,
+    and those having it set to None by `<key>/none`.
+    """
+    stacked: Dict[str, List[np.ndarray]] = {}
+    transformations: Dict[str, List[int]] = {}
+    none_transformations: Dict[str, List[int]] = {}
+    for index, transfo in enumerate(world.transformations):
+        for owner, operations in transfo._inventory_operations.items():
+            for operation, operation_arr in operations.items():
+                key = _operation_key(owner, operation)
+                if operation_arr is None:
+                    none_transformations.setdefault(key, []).append(index)
+                    continue
+                stacked.setdefault(key, []).append(operation_arr)
+                transformations.setdefault(key, []).append(index)
+
+    arrays = {}
+    for key in set(stacked) | set(none_transformations):
+        arrays[f"{key}/transformations"] = np.array(
+            transformations.get(key, []), dtype=np.int64
+        )
+        arrays[f"{key}/none"] = np.array(
+            none_transformations.get(key, []), dtype=np.int64
+        )
+        if key in stacked:
+            arrays[key] = np.stack(stacked[key])
+    return arrays
+
+
+def _set_operations(
+    transformations: List[Transformation],
+    tables: Dict[str, Any],
+    arrays: Dict[str, np.ndarray],
+    n_zones: int,
+) -> None:
+    for transfo, zone, destination in zip(
+        transformations,
+        tables["transformations_zones"].tolist(),
+        tables["transformations_destinations"].tolist(),
+    ):
+        transfo._inventory_operations = {}
+        if zone >= 0:
+            transfo._zone = _one_hot(zone, n_zones)
+        if destination >= 0:
+            transfo._destination = _one_hot(destination, n_zones)
+
+    for owner in InventoryOwner:
+        for operation in InventoryOperation:
+            key = _operation_key(owner, operation)
+            if f"{key}/transformations" not in arrays:
+                continue
+            operation_arrays = arrays.get(key, ())
+            for index, operation_arr in zip(
+                arrays[f"{key}/transformations"].tolist(), operation_arrays
+            ):
+                operations = transformations[index]._inventory_operations
+                operations.setdefault(owner, {})[operation] = operation_arr
+            for index in arrays[f"{key}/none"].tolist():
+                operations = transformations[index]._inventory_operations
+                operations.setdefault(owner, {})[operation] = None
+
+
+def _memmap_npz(path: Path) -> Dict[str, np.ndarray]:
+    """Memory-map each array of an uncompressed npz archive."""
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, "rb") as archive_file:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"Compressed archive {path} cannot be memory-mapped.")
+            archive_file.seek(info.header_offset)
+            local_header = archive_file.read(_ZIP_LOCAL_HEADER.size)
+            name_length, extra_length = _ZIP_LOCAL_HEADER.unpack(local_header)[-2:]
+            archive_file.seek(name_length + extra_length, 1)
+            version = np.lib.format.read_magic(archive_file)
+            if version == (1, 0):
+                header = np.lib.format.read_array_header_1_0(archive_file)
+            else:
+                header = np.lib.format.read_array_header_2_0(archive_file)
+            shape, fortran_order, dtype = header
+            name = info.filename[: -len(".npy")]
+            if np.prod(shape) == 0:
+                arrays[name] = np.zeros(shape, dtype=dtype)
+                continue
+            arrays[name] = np.memmap(
+                path,
+                dtype=dtype,
+                mode="r",
+                offset=archive_file.tell(),
+                shape=shape,
+                order="F" if fortran_order else "C",
+            )
+    return arrays
+
+
+_ZIP_LOCAL_HEADER = struct.Struct("<4s5H3L2H")
+"""Local file header of zip archives, ending with file name and extra field lengths."""
+
+
+def _operation_key(owner: InventoryOwner, operation: InventoryOperation) -> str:
+    return f"operations/{owner.value}/{operation.value}"
+
+
+def _one_hot(slot: int, size: int) -> np.ndarray:
+    array = np.zeros(size, dtype=np.int32)
+    array[slot] = 1
+    return array
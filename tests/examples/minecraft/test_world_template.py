@@ -0,0 +1,43 @@
+import pytest
+import pytest_check as check
+
+from hcraft.elements import Item
+from hcraft.examples.minecraft.env import MineHcraftEnv, minehcraft_world
+from hcraft.examples.minecraft.zones import FOREST, SWAMP
+
+
+def test_envs_share_the_world_template():
+    env, other_env = MineHcraftEnv(), MineHcraftEnv(purpose="all")
+    check.is_true(env.world is other_env.world)
+    check.is_true(env.world is minehcraft_world(FOREST))
+    check.is_true(env.world.requirements is other_env.world.requirements)
+    check.is_false(MineHcraftEnv(start_zone=SWAMP).world is env.world)
+
+
+def test_envs_sharing_the_template_have_their_own_state():
+    env, other_env = MineHcraftEnv(), MineHcraftEnv()
+    env.reset()
+    observation, _infos = other_env.reset()
+    for _ in range(10):
+        env.step(env.sample_legal_action())
+    check.equal(other_env.state.observation.tolist(), observation.tolist())
+
+
+def test_world_template_is_frozen():
+    world = minehcraft_world()
+    check.is_true(world.frozen)
+    with pytest.raises(ValueError, match="frozen"):
+        world.add_items([Item("new_item")])
+    transfo = world.transformations[0]
+    with pytest.raises(ValueError, match="frozen"):
+        transfo.build(world)
+    for operations in transfo._inventory_operations.values():
+        for operation_arr in operations.values():
+            if operation_arr is not None:
+                check.is_false(operation_arr.flags.writeable)
+
+
+def test_gym_make_uses_the_world_template():
+    gym = pytest.importorskip("gymnasium")
+    env = gym.make("MineHcraft-Diamond-v1")
+    check.is_true(env.unwrapped.world is minehcraft_world())
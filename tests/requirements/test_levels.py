@@ -0,0 +1,50 @@
+import pytest
+import pytest_check as check
+
+from hcraft.examples import (
+    LightRecursiveHcraftEnv,
+    MineHcraftEnv,
+    RecursiveHcraftEnv,
+    TowerHcraftEnv,
+)
+from hcraft.examples.minicraft import MINICRAFT_ENVS
+from hcraft.examples.treasure import TreasureEnv
+from hcraft.requirements import _sweep_levels, requirements_levels
+
+
+@pytest.mark.parametrize(
+    "env_class",
+    [
+        MineHcraftEnv,
+        TowerHcraftEnv,
+        RecursiveHcraftEnv,
+        LightRecursiveHcraftEnv,
+        TreasureEnv,
+        *MINICRAFT_ENVS,
+    ],
+)
+def test_requirements_levels_match_graph_levels(env_class):
+    world = env_class().world
+    levels = requirements_levels(world)
+    graph_levels = dict(world.requirements.graph.nodes(data="level"))
+    check.equal(levels, graph_levels)
+
+
+def test_levels_are_attributed_in_nodes_order():
+    # 'b' comes before 'a' so it only sees 'a' level on the next sweep,
+    # by then 'c' has already been reached directly from 'start' and 'd' by 'c'.
+    in_edges = {
+        "start": [],
+        "b": [("a", 0)],
+        "a": [("start", 1)],
+        "c": [("start", 2)],
+        "d": [("b", 3), ("c", 4)],
+    }
+    levels = _sweep_levels(in_edges)
+    check.equal(levels, {"start": 0, "a": 1, "c": 1, "b": 2, "d": 2})
+
+
+def test_unreachable_nodes_have_no_level():
+    in_edges = {"start": [], "a": [("b", 0)], "b": [("a", 1)]}
+    with pytest.raises(ValueError, match="Incomplete nodes"):
+        _sweep_levels(in_edges)
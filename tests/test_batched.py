@@ -0,0 +1,193 @@
+import copy
+from functools import partial
+
+import numpy as np
+import pytest
+import pytest_check as check
+
+from hcraft.batched import (
+    BatchedHcraftEnv,
+    CompiledTransformations,
+    sample_from_masks,
+)
+from hcraft.examples import MineHcraftEnv, RecursiveHcraftEnv, TowerHcraftEnv
+from hcraft.examples.minicraft import MINICRAFT_ENVS
+from hcraft.examples.treasure import TreasureEnv
+from hcraft.purpose import Purpose
+from hcraft.state import HcraftState
+from hcraft.task import Task
+from tests.envs import classic_env
+
+ENV_FACTORIES = [
+    partial(MineHcraftEnv, max_step=30),
+    partial(TowerHcraftEnv, height=3, width=2, max_step=30),
+    partial(RecursiveHcraftEnv, n_items=4, max_step=30),
+    partial(TreasureEnv, max_step=20),
+] + [partial(env_class, max_step=20) for env_class in MINICRAFT_ENVS]
+
+
+@pytest.mark.parametrize(
+    "env_factory", ENV_FACTORIES, ids=lambda factory: factory.func.__name__
+)
+def test_batched_env_matches_single_envs(env_factory):
+    num_envs = 8
+    batched_env = BatchedHcraftEnv(env_factory(), num_envs=num_envs)
+    envs = [env_factory() for _ in range(num_envs)]
+    rng = np.random.default_rng(42)
+
+    observations, _infos = batched_env.reset(seed=0)
+    expected_observations = [env.reset()[0] for env in envs]
+    check.is_true(np.array_equal(observations, np.stack(expected_observations)))
+
+    for _ in range(50):
+        masks = batched_env.action_masks()
+        expected_masks = np.stack([env.action_masks() for env in envs])
+        check.equal(masks.tolist(), expected_masks.tolist())
+
+        # Mostly legal actions, but also some illegal ones.
+        actions = batched_env.sample_legal_actions(rng)
+        random_actions = rng.integers(batched_env.action_space.n, size=num_envs)
+        actions = np.where(rng.random(num_envs) < 0.3, random_actions, actions)
+
+        observations, rewards, terminated, truncated, infos = batched_env.step(actions)
+        for index, env in enumerate(envs):
+            observation, reward, env_terminated, env_truncated, _ = env.step(
+                actions[index]
+            )
+            if env_terminated or env_truncated:
+                check.is_true(infos["_final_obs"][index])
+                check.equal(infos["final_obs"][index].tolist(), observation.tolist())
+                observation, _infos = env.reset()
+            check.equal(observations[index].tolist(), observation.tolist())
+            check.equal(rewards[index], reward)
+            check.equal(terminated[index], env_terminated)
+            check.equal(truncated[index], env_truncated)
+
+
+@pytest.mark.parametrize("num_threads", [2, 3, 16])
+def test_threaded_batched_env_matches_unthreaded(num_threads: int):
+    env_factory = partial(MineHcraftEnv, max_step=10)
+    num_envs = 10
+    batched_env = BatchedHcraftEnv(env_factory(), num_envs=num_envs)
+    threaded_env = BatchedHcraftEnv(
+        env_factory(), num_envs=num_envs, num_threads=num_threads
+    )
+    rng = np.random.default_rng(0)
+    try:
+        observations, _infos = threaded_env.reset(seed=0)
+        expected_observations, _infos = batched_env.reset(seed=0)
+        check.equal(observations.tolist(), expected_observations.tolist())
+        for _ in range(25):
+            actions = batched_env.sample_legal_actions(rng)
+            *outputs, infos = threaded_env.step(actions)
+            *expected_outputs, expected_infos = batched_env.step(actions)
+            for output, expected_output in zip(outputs, expected_outputs):
+                check.equal(output.tolist(), expected_output.tolist())
+            check.equal(
+                infos["action_is_legal"].tolist(),
+                expected_infos["action_is_legal"].tolist(),
+            )
+            if "_final_obs" in expected_infos:
+                check.equal(
+                    infos["final_obs"].tolist(), expected_infos["final_obs"].tolist()
+                )
+    finally:
+        threaded_env.close()
+
+
+def test_batched_state_item_is_an_hcraft_state():
+    env = BatchedHcraftEnv(classic_env()[0], num_envs=3)
+    env.reset()
+    transformations_names = [transfo.name for transfo in env.world.transformations]
+    search_wood = transformations_names.index("search_wood")
+    env.step(np.array([search_wood, 0, search_wood]))
+    wood = [item for item in env.world.items if item.name == "wood"][0]
+    check.equal([env.state[index].amount_of(wood) for index in range(3)], [1, 0, 1])
+
+
+def test_single_env_can_step_after_batching():
+    env = TowerHcraftEnv(height=2, width=2)
+    BatchedHcraftEnv(env, num_envs=2)
+    env.reset()
+    env.step(0)
+    check.equal(env.current_step, 1)
+
+
+def test_custom_tasks_cannot_be_batched():
+    class SandboxTask(Task):
+        def _is_terminal(self, state) -> bool:
+            return False
+
+        def reward(self, state) -> float:
+            return 0.0
+
+    env = classic_env()[0]
+    env.purpose = Purpose(SandboxTask("sandbox"))
+    with pytest.raises(TypeError):
+        BatchedHcraftEnv(env, num_envs=2)
+
+
+def test_sample_from_masks():
+    masks = np.array([[False, True, False, True], [True, False, False, False]])
+    rng = np.random.default_rng(0)
+    samples = np.stack([sample_from_masks(masks, rng) for _ in range(100)])
+    check.equal(set(samples[:, 0].tolist()), {1, 3})
+    check.equal(set(samples[:, 1].tolist()), {0})
+
+    with pytest.raises(ValueError):
+        sample_from_masks(np.zeros((2, 3), dtype=bool))
+
+
+@pytest.mark.parametrize(
+    "env_factory", ENV_FACTORIES, ids=lambda factory: factory.func.__name__
+)
+def test_expand_matches_transformations(env_factory):
+    env = env_factory()
+    env.reset(seed=0)
+    for _ in range(10):
+        env.step(env.sample_legal_action())
+    state = env.state
+    successors = CompiledTransformations(env.world).expand(state)
+
+    expected_actions, expected_keys = [], []
+    for action in range(len(env.world.transformations)):
+        successor = copy.deepcopy(state)
+        if successor.apply(action):
+            expected_actions.append(action)
+            expected_keys.append(successor.key)
+    check.equal(successors.actions.tolist(), expected_actions)
+    check.equal(successors.parents.tolist(), [0] * len(expected_actions))
+    keys = []
+    for index in range(successors.actions.size):
+        successor = HcraftState(env.world)
+        successor.player_inventory[...] = successors.player_inventory[index]
+        successor.position[...] = successors.position[index]
+        successor.zones_inventories[...] = successors.zones_inventories[index]
+        keys.append(successor.key)
+    check.equal(keys, expected_keys)
+
+
+def test_expand_frontier():
+    env = BatchedHcraftEnv(MineHcraftEnv(max_step=30), num_envs=4)
+    env.reset(seed=0)
+    for _ in range(5):
+        env.step(env.sample_legal_actions())
+    player_inventory = env.state.player_inventory.copy()
+    successors = env.state.expand()
+    check.equal(env.state.player_inventory.tolist(), player_inventory.tolist())
+
+    masks = env.action_masks()
+    check.equal(successors.parents.size, int(masks.sum()))
+    check.equal(np.bincount(successors.parents).tolist(), masks.sum(axis=1).tolist())
+    for parent in range(4):
+        children = successors.parents == parent
+        check.equal(
+            successors.actions[children].tolist(),
+            np.flatnonzero(masks[parent]).tolist(),
+        )
+        first = int(np.flatnonzero(children)[0])
+        state = env.state[parent]
+        state.apply(int(successors.actions[first]))
+        check.equal(
+            successors.player_inventory[first].tolist(), state.player_inventory.tolist()
+        )
@@ -0,0 +1,209 @@
+import json
+import os
+import pickle
+import subprocess
+import sys
+
+import pytest
+import pytest_check as check
+from pytest_mock import MockerFixture
+
+import hcraft.build_cache
+from hcraft.build_cache import BUILD_CACHE_ENV_VAR, enable_build_cache, get_build_cache
+from hcraft.elements import Item, Stack, Zone
+from hcraft.env import HcraftEnv
+from hcraft.examples import MineHcraftEnv, TowerHcraftEnv
+from hcraft.purpose import Purpose, RewardShaping
+from hcraft.task import GetItemTask
+from hcraft.transformation import PLAYER, Transformation, Use, Yield
+from hcraft.world import definition_fingerprint, world_from_transformations
+from hcraft.world_file import load_world, save_world
+
+
+@pytest.fixture(autouse=True)
+def no_global_build_cache(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(hcraft.build_cache, "_build_cache", None)
+
+
+def test_fingerprint_is_stable_across_processes():
+    code = (
+        "from hcraft.examples import MineHcraftEnv;"
+        "print(MineHcraftEnv().world.fingerprint)"
+    )
+    fingerprints = set()
+    for hash_seed in ("1", "2"):
+        process_env = dict(os.environ, PYTHONHASHSEED=hash_seed)
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            env=process_env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        fingerprints.add(output.strip().splitlines()[-1])
+    check.equal(fingerprints, {MineHcraftEnv().world.fingerprint})
+
+
+def test_fingerprint_is_kept_when_world_is_saved_or_pickled(tmp_path):
+    world = TowerHcraftEnv(height=3, width=2).world
+    save_world(world, tmp_path / "tower.json")
+    check.equal(load_world(tmp_path / "tower.json").fingerprint, world.fingerprint)
+    check.equal(pickle.loads(pickle.dumps(world)).fingerprint, world.fingerprint)
+
+
+def test_fingerprint_depends_on_definition():
+    wood, plank = Item("wood"), Item("plank")
+    forest = Zone("forest")
+
+    def fingerprint(quantity: int = 1, start_items=None) -> str:
+        transformations = [
+            Transformation(
+                "search wood", inventory_changes=[Yield(PLAYER, wood)], zone=forest
+            ),
+            Transformation(
+                "craft plank",
+                inventory_changes=[
+                    Use(PLAYER, wood, quantity),
+                    Yield(PLAYER, plank, 4),
+                ],
+            ),
+        ]
+        return definition_fingerprint(
+            transformations, start_zone=forest, start_items=start_items
+        )
+
+    check.equal(fingerprint(), fingerprint())
+    check.not_equal(fingerprint(quantity=2), fingerprint())
+    check.not_equal(fingerprint(start_items=[wood]), fingerprint())
+    check.equal(
+        fingerprint(start_items=[wood, Stack(plank, 2)]),
+        fingerprint(start_items=[Stack(plank, 2), Stack(wood)]),
+    )
+
+
+def test_fingerprint_is_kept_when_default_names_are_read():
+    wood = Item("wood")
+    transformations = [Transformation(inventory_changes=[Yield(PLAYER, wood)])]
+    fingerprint = definition_fingerprint(transformations)
+    check.equal(transformations[0].name, repr(transformations[0]))
+    check.equal(definition_fingerprint(transformations), fingerprint)
+
+    world = TowerHcraftEnv(height=2, width=2).world
+    _names = [transfo.name for transfo in world.transformations]
+    check.equal(world.fingerprint, TowerHcraftEnv(height=2, width=2).world.fingerprint)
+
+
+def test_fingerprint_changes_when_world_is_extended():
+    world = TowerHcraftEnv(height=3, width=2).world
+    fingerprint = world.fingerprint
+    world.add_transformations([Transformation("nothing")])
+    check.not_equal(world.fingerprint, fingerprint)
+
+
+def test_cached_world_is_loaded_instead_of_built(tmp_path, mocker: MockerFixture):
+    build_cache = enable_build_cache(tmp_path)
+    world = TowerHcraftEnv(height=3, width=2).world
+    check.equal((build_cache.hits, build_cache.misses), (0, 1))
+
+    build = mocker.spy(Transformation, "build")
+    cached_world = TowerHcraftEnv(height=3, width=2).world
+    check.equal((build_cache.hits, build_cache.misses), (1, 1))
+    check.equal(build.call_count, 0)
+
+    check.equal(cached_world.items, world.items)
+    check.equal(cached_world.zones, world.zones)
+    check.equal(cached_world.zones_items, world.zones_items)
+    check.equal(cached_world.fingerprint, world.fingerprint)
+    env, cached_env = HcraftEnv(world), HcraftEnv(cached_world)
+    env.reset()
+    cached_env.reset()
+    check.equal(cached_env.action_masks().tolist(), env.action_masks().tolist())
+
+
+def test_cached_world_transformations_are_equivalent_copies(tmp_path):
+    build_cache = enable_build_cache(tmp_path)
+    wood, plank = Item("wood"), Item("plank")
+
+    def transformations():
+        return [
+            Transformation("search wood", inventory_changes=[Yield(PLAYER, wood)]),
+            Transformation(
+                "craft plank",
+                inventory_changes=[Use(PLAYER, wood, 1), Yield(PLAYER, plank, 4)],
+            ),
+        ]
+
+    built = transformations()
+    check.is_true(world_from_transformations(built).transformations[1] is built[1])
+    loaded = transformations()
+    world = world_from_transformations(loaded)
+    check.equal(build_cache.hits, 1)
+    check.is_false(any(transfo in world.transformations for transfo in loaded))
+    check.equal(
+        [transfo.name for transfo in world.transformations],
+        [transfo.name for transfo in loaded],
+    )
+
+
+def test_cached_requirements(tmp_path):
+    enable_build_cache(tmp_path)
+    world = MineHcraftEnv().world
+    requirements_graph = world.requirements.graph
+
+    cached_world = MineHcraftEnv().world
+    cached_requirements = cached_world.requirements
+    check.is_true(cached_requirements.world is cached_world)
+    check.equal(
+        dict(cached_requirements.graph.nodes(data="level")),
+        dict(requirements_graph.nodes(data="level")),
+    )
+    edges_transformations = [
+        transfo
+        for _pred, _node, transfo in cached_requirements.graph.edges(data="obj")
+        if transfo is not None
+    ]
+    check.greater(len(edges_transformations), 0)
+    for transfo in edges_transformations:
+        check.is_true(any(transfo is other for other in cached_world.transformations))
+
+
+def test_reward_shaping_with_cached_requirements(tmp_path):
+    enable_build_cache(tmp_path)
+    task = GetItemTask(Item("diamond"))
+    purposes = []
+    for _ in range(2):
+        purpose = Purpose(
+            task, default_reward_shaping=RewardShaping.REQUIREMENTS_ACHIVEMENTS
+        )
+        MineHcraftEnv(purpose=purpose)
+        purposes.append(purpose)
+    check.equal(
+        [str(task) for task in purposes[1].tasks],
+        [str(task) for task in purposes[0].tasks],
+    )
+
+
+def test_stale_entries_are_rebuilt(tmp_path):
+    build_cache = enable_build_cache(tmp_path)
+    world = TowerHcraftEnv(height=3, width=2).world
+    world_path = build_cache.entry(world.fingerprint, order_world=True).path
+    world_path /= "world.json"
+    descriptor = json.loads(world_path.read_text())
+    descriptor["metadata"]["build_cache"]["hcraft"] = "0.0.0"
+    world_path.write_text(json.dumps(descriptor))
+
+    TowerHcraftEnv(height=3, width=2)
+    check.equal((build_cache.hits, build_cache.misses), (0, 2))
+    TowerHcraftEnv(height=3, width=2)
+    check.equal((build_cache.hits, build_cache.misses), (1, 2))
+
+
+def test_build_cache_from_environment(tmp_path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(
+        hcraft.build_cache, "_build_cache", hcraft.build_cache._FROM_ENVIRONMENT
+    )
+    monkeypatch.setenv(BUILD_CACHE_ENV_VAR, str(tmp_path))
+    build_cache = get_build_cache()
+    check.equal(build_cache.directory, tmp_path)
+    hcraft.build_cache.disable_build_cache()
+    check.is_none(get_build_cache())
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+import pytest_check as check
+
+from hcraft.cache import TransitionCache
+from hcraft.examples import MineHcraftEnv
+from hcraft.examples.tower import TowerHcraftEnv
+from hcraft.purpose import Purpose
+from hcraft.state import HcraftState
+from hcraft.task import GetItemTask
+from tests.custom_checks import check_np_equal
+
+
+def test_state_key_roundtrip():
+    env = MineHcraftEnv()
+    env.reset()
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        env.step(env.sample_legal_action(rng))
+
+    key = env.state.key
+    other_state = HcraftState(env.world)
+    check.not_equal(other_state.key, key)
+    other_state.load_key(key)
+    check.equal(other_state.key, key)
+    check_np_equal(other_state.player_inventory, env.state.player_inventory)
+    check_np_equal(other_state.position, env.state.position)
+    check_np_equal(other_state.zones_inventories, env.state.zones_inventories)
+
+
+def test_cached_env_matches_uncached_env():
+    def _build_env(**kwargs):
+        env = TowerHcraftEnv(height=2, width=2, max_step=20, **kwargs)
+        top_task = GetItemTask(env.items[-1], reward=10)
+        env.purpose = Purpose(timestep_reward=-0.1)
+        env.purpose.add_task(top_task, reward_shaping="required")
+        return env
+
+    env = _build_env()
+    cached_env = _build_env(transition_cache_size=1_000)
+    rng = np.random.default_rng(42)
+    for _ in range(5):
+        env.reset()
+        cached_env.reset()
+        actions = rng.integers(env.action_space.n, size=20)
+        for action in actions:
+            expected = env.step(action)
+            cached = cached_env.step(action)
+            check_np_equal(cached[0], expected[0])
+            for expected_value, cached_value in zip(expected[1:4], cached[1:4]):
+                check.equal(cached_value, expected_value)
+            cached_infos, expected_infos = cached[4], expected[4]
+            check.equal(
+                cached_infos.pop("action_is_legal").tolist(),
+                expected_infos.pop("action_is_legal").tolist(),
+            )
+            check.equal(cached_infos, expected_infos)
+
+    stats = cached_env.transition_cache.stats
+    check.greater(stats["hits"], 0)
+    check.greater(stats["misses"], 0)
+    check.less_equal(stats["size"], 1_000)
+
+
+def test_cache_is_bounded():
+    cache = TransitionCache(maxsize=2)
+    for key in range(3):
+        cache.add_mask(key, np.zeros(3, dtype=bool))
+    check.equal(len(cache), 2)
+    check.equal(cache.evictions, 1)
+    check.is_not_in(0, cache)
+    check.is_none(cache.mask(0))
+    check.is_not_none(cache.mask(2))
+    check.equal(cache.hit_rate, 0.5)
+
+
+def test_cache_maxsize_should_be_positive():
+    with pytest.raises(ValueError):
+        TransitionCache(maxsize=0)
+
+
+def test_cached_masks_are_private_copies():
+    env = TowerHcraftEnv(height=2, width=2, transition_cache_size=1_000)
+    env.reset()
+    mask = env.action_masks()
+    expected = mask.tolist()
+    mask[:] = False
+    cached_mask = env.action_masks()
+    check.is_true(cached_mask.flags.writeable)
+    check.equal(cached_mask.tolist(), expected)
+    cached_mask[:] = False
+    check.equal(env.action_masks().tolist(), expected)
@@ -0,0 +1,98 @@
+import json
+
+import numpy as np
+import pytest
+import pytest_check as check
+
+from hcraft.examples import MineHcraftEnv, TowerHcraftEnv
+
+
+def _comparable_infos(env) -> dict:
+    return {
+        name: value.tolist() if isinstance(value, np.ndarray) else value
+        for name, value in env.infos().items()
+    }
+
+
+def test_resume_from_checkpoint(tmp_path):
+    env = MineHcraftEnv(purpose="all", max_step=100)
+    env.reset(seed=0)
+    for _ in range(3):
+        env.reset()
+        for _ in range(20):
+            env.step(env.sample_legal_action())
+    env.step(0)
+    path = env.save_checkpoint(tmp_path / "mine.ckpt")
+
+    resumed = MineHcraftEnv(purpose="all", max_step=100)
+    resumed.load_checkpoint(path)
+    check.equal(resumed.state.key, env.state.key)
+    check.equal(resumed.current_step, env.current_step)
+    check.equal(resumed.episodes, env.episodes)
+    check.equal(resumed.last_action_valid, env.last_action_valid)
+    check.equal(
+        [task.terminated for task in resumed.purpose.tasks],
+        [task.terminated for task in env.purpose.tasks],
+    )
+    check.equal(_comparable_infos(resumed), _comparable_infos(env))
+
+    # Resumed environments follow exactly the same trajectory.
+    for _ in range(30):
+        action = env.sample_legal_action()
+        check.equal(resumed.sample_legal_action(), action)
+        observation, reward, terminated, truncated, _infos = env.step(action)
+        step = resumed.step(action)
+        check.equal(step[0].tolist(), observation.tolist())
+        check.equal(step[1:4], (reward, terminated, truncated))
+    check.equal(_comparable_infos(resumed), _comparable_infos(env))
+
+
+def test_terminated_tasks_are_resumed(tmp_path):
+    env = TowerHcraftEnv(height=2, width=2)
+    env.reset()
+    terminated = False
+    while not terminated:
+        _obs, _reward, terminated, _truncated, _infos = env.step(
+            env.sample_legal_action()
+        )
+    env.save_checkpoint(tmp_path / "tower.ckpt")
+
+    resumed = TowerHcraftEnv(height=2, width=2)
+    resumed.load_checkpoint(tmp_path / "tower.ckpt")
+    check.is_true(resumed.purpose.terminated)
+    check.equal(_comparable_infos(resumed), _comparable_infos(env))
+
+
+def test_checkpoint_of_another_world(tmp_path):
+    env = TowerHcraftEnv(height=2, width=2)
+    env.reset()
+    env.save_checkpoint(tmp_path / "tower.ckpt")
+    with pytest.raises(ValueError, match="different world"):
+        TowerHcraftEnv(height=3, width=2).load_checkpoint(tmp_path / "tower.ckpt")
+
+
+def test_checkpoint_of_world_with_read_names(tmp_path):
+    env = TowerHcraftEnv(height=2, width=2)
+    env.reset()
+    env.step(env.sample_legal_action())
+    path = env.save_checkpoint(tmp_path / "tower.ckpt")
+
+    resumed = TowerHcraftEnv(height=2, width=2)
+    _names = [transfo.name for transfo in resumed.world.transformations]
+    resumed.load_checkpoint(path)
+    check.equal(resumed.state.key, env.state.key)
+
+
+def test_checkpoint_of_unknown_version(tmp_path):
+    env = TowerHcraftEnv(height=2, width=2)
+    env.reset()
+    path = env.save_checkpoint(tmp_path / "tower.ckpt")
+    with np.load(path) as archive:
+        arrays = {name: archive[name] for name in archive.files}
+    header = json.loads(arrays["header"].tobytes())
+    header["version"] += 1
+    arrays["header"] = np.frombuffer(json.dumps(header).encode("utf-8"), np.uint8)
+    with open(path, "wb") as checkpoint_file:
+        np.savez(checkpoint_file, **arrays)
+    with pytest.raises(ValueError, match="Unsupported checkpoint version"):
+        TowerHcraftEnv(height=2, width=2).load_checkpoint(path)
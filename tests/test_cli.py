@@ -1,7 +1,7 @@
 import pytest
 import pytest_check as check
 
-from hcraft.cli import hcraft_cli
+from hcraft.cli import hcraft_cli, hcraft_serve_cli
 from hcraft.examples import (
     MineHcraftEnv,
     RandomHcraftEnv,
@@ -81,3 +81,28 @@ def test_random_cli():
     )
     check.is_instance(env, RandomHcraftEnv)
     check.equal(env.n_items, 14)
+
+
+def test_serve_cli(tmp_path):
+    socket_path = str(tmp_path / "hcraft.sock")
+    server = hcraft_serve_cli(
+        ["--socket", socket_path, "--num-envs", "3", "--max-step", "5", "tower"]
+    )
+    try:
+        check.equal(server.env.num_envs, 3)
+        check.equal(server.env.max_step, 5)
+        check.is_instance(server.env.env, TowerHcraftEnv)
+    finally:
+        server.server_close()
+
+
+def test_serve_cli_keeps_env_short_options(tmp_path):
+    socket_path = str(tmp_path / "hcraft.sock")
+    server = hcraft_serve_cli(
+        ["--socket", socket_path, "--num-envs", "4", "recursive", "-n", "3"]
+    )
+    try:
+        check.equal(server.env.num_envs, 4)
+        check.equal(server.env.env.world.n_items, 3)
+    finally:
+        server.server_close()
@@ -0,0 +1,134 @@
+from functools import partial
+
+import numpy as np
+import pytest
+import pytest_check as check
+
+from hcraft import dataset
+from hcraft.dataset import generate_dataset, hcraft_dataset_cli, read_manifest
+from hcraft.examples import TowerHcraftEnv
+from hcraft.replay import replay_shard
+from hcraft.trajectories import load_shard
+
+TOWER = partial(TowerHcraftEnv, height=2, width=2, max_step=30)
+
+
+def test_behavior_episodes_are_deduplicated(tmp_path):
+    manifest = generate_dataset(
+        tmp_path, {"tower": TOWER}, seeds=range(4), expert="behavior", num_workers=0
+    )
+    check.equal(len(manifest), 4)
+    stored = [entry for entry in manifest if "shard" in entry]
+    check.equal(len(stored), 1)
+    check.is_true(all(entry["success"] for entry in manifest))
+    for entry in manifest:
+        if "shard" not in entry:
+            check.equal(entry["duplicate_of"], stored[0]["digest"])
+
+    shard = load_shard(tmp_path / stored[0]["shard"], 0)
+    check.equal(shard["actions"].shape, (stored[0]["steps"], 1))
+    check.equal(float(shard["rewards"].sum()), stored[0]["return"])
+    states = replay_shard(tmp_path / stored[0]["shard"], 0)
+    env = TOWER()
+    env.reset()
+    for action in shard["actions"][:, 0]:
+        env.step(int(action))
+    check.equal(
+        states[-1, 0].tolist()[: env.world.n_items], env.state.player_inventory.tolist()
+    )
+
+
+def test_resume_dataset(tmp_path):
+    manifest = generate_dataset(
+        tmp_path, {"tower": TOWER}, seeds=range(3), expert="random", num_workers=0
+    )
+    check.equal([entry["seed"] for entry in manifest], [0, 1, 2])
+
+    # An interrupted generation may leave an incomplete line.
+    with open(tmp_path / "manifest.jsonl", "a", encoding="utf-8") as manifest_file:
+        manifest_file.write('{"env": "tow')
+    manifest = generate_dataset(
+        tmp_path,
+        {"tower": TOWER},
+        seeds=range(5),
+        expert="random",
+        num_workers=0,
+        episodes_per_shard=1,
+    )
+    check.equal([entry["seed"] for entry in manifest], [0, 1, 2, 3, 4])
+    check.equal(read_manifest(tmp_path), manifest)
+    shards = sorted(path.name for path in (tmp_path / "shards").iterdir())
+    check.equal(shards, ["shard-00000", "shard-00001", "shard-00002"])
+
+
+def test_interrupted_manifest_rewrite_keeps_entries(tmp_path, monkeypatch):
+    manifest = generate_dataset(
+        tmp_path, {"tower": TOWER}, seeds=range(3), expert="random", num_workers=0
+    )
+
+    def interrupted_replace(_source, _destination):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(dataset.os, "replace", interrupted_replace)
+    with pytest.raises(KeyboardInterrupt):
+        generate_dataset(
+            tmp_path, {"tower": TOWER}, seeds=range(5), expert="random", num_workers=0
+        )
+    check.equal(read_manifest(tmp_path), manifest)
+
+
+def test_planner_expert(tmp_path):
+    pytest.importorskip("unified_planning")
+    pytest.importorskip("up_enhsp")
+    manifest = generate_dataset(
+        tmp_path, {"tower": TOWER}, seeds=range(2), expert="planner", num_workers=0
+    )
+    check.equal(len(manifest), 2)
+    check.is_true(all(entry["success"] for entry in manifest))
+    check.equal(len([entry for entry in manifest if "shard" in entry]), 1)
+
+
+def test_dataset_with_process_pool(tmp_path):
+    manifest = generate_dataset(
+        tmp_path,
+        {"tower": TOWER},
+        seeds=range(6),
+        expert="random",
+        num_workers=2,
+        episodes_per_shard=2,
+    )
+    check.equal(sorted(entry["seed"] for entry in manifest), list(range(6)))
+    stored = [entry for entry in manifest if "shard" in entry]
+    digests = [entry["digest"] for entry in stored]
+    check.equal(len(set(digests)), len(digests))
+    for entry in stored:
+        shard = load_shard(tmp_path / entry["shard"], 0)
+        resets = np.flatnonzero(shard["resets"][:, 0])
+        check.is_in(entry["first_step"], resets.tolist())
+
+
+def test_dataset_cli(tmp_path):
+    manifest = hcraft_dataset_cli(
+        [
+            "--output",
+            str(tmp_path),
+            "--expert",
+            "random",
+            "--seeds",
+            "2",
+            "--num-workers",
+            "0",
+            "--max-step",
+            "10",
+            "tower",
+            "--height",
+            "2",
+        ]
+    )
+    check.equal(len(manifest), 2)
+    check.is_true(all(entry["steps"] <= 10 for entry in manifest))
+
+
+def test_unknown_expert(tmp_path):
+    with pytest.raises(ValueError):
+        generate_dataset(tmp_path, {"tower": TOWER}, seeds=[0], expert="oracle")
@@ -242,6 +242,20 @@ class TestCreatingEnv:
         check_np_equal(self.env.action_masks(), np.array([1, 1, 1, 1, 0, 0]))
         check_np_equal(infos["action_is_legal"], np.array([1, 1, 1, 1, 0, 0]))
 
+    def test_candidate_actions(self):
+        """candidate actions should exclude transformations restricted to other zones."""
+        move_action = self.transformations.index(
+            self.named_transformations.get("move_to_other_zone")
+        )
+        search_wood_action = self.transformations.index(
+            self.named_transformations.get("search_wood")
+        )
+        check.is_in(search_wood_action, self.env.candidate_actions())
+        self.env.step(move_action)
+        check.is_not_in(move_action, self.env.candidate_actions())
+        check.is_not_in(search_wood_action, self.env.candidate_actions())
+        check_np_equal(self.env.action_masks(), np.array([0, 0, 1, 0, 0, 0]))
+
     def test_max_step(self):
         """max_step should truncate the episode after desired number of steps."""
         env = HcraftEnv(self.world, max_step=3)
@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+import pytest_check as check
+
+from hcraft.examples import MineHcraftEnv, TowerHcraftEnv
+from hcraft.functional import ArrayStates, Transition
+from hcraft.purpose import Purpose
+from hcraft.task import Task
+
+
+def _env_states(env) -> ArrayStates:
+    return ArrayStates(
+        env.state.player_inventory[np.newaxis].copy(),
+        env.state.position[np.newaxis].copy(),
+        env.state.zones_inventories[np.newaxis].copy(),
+        np.array([[task.terminated for task in env.purpose.tasks]]),
+    )
+
+
+def test_transitions_match_env_steps():
+    env = MineHcraftEnv(purpose="all", max_step=200)
+    env.reset(seed=0)
+    transition = Transition(env)
+    rng = np.random.default_rng(0)
+    states = transition.initial_states()
+    check.equal(
+        states.player_inventory.tolist(), _env_states(env).player_inventory.tolist()
+    )
+    for _ in range(200):
+        if rng.random() < 0.3:
+            action = int(rng.integers(transition.n_actions))
+        else:
+            action = env.sample_legal_action()
+        _obs, reward, terminated, _truncated, _infos = env.step(action)
+        states, valid, rewards = transition(states, np.array([action]))
+        expected = _env_states(env)
+        check.equal(bool(valid[0]), env.last_action_valid)
+        check.almost_equal(float(rewards[0]), reward)
+        check.equal(bool(transition.terminated(states)[0]), terminated)
+        for array, expected_array in zip(states, expected):
+            check.equal(array.tolist(), expected_array.tolist())
+        if terminated:
+            break
+
+
+def test_transitions_are_pure():
+    env = TowerHcraftEnv(height=2, width=2)
+    transition = Transition(env)
+    states = transition.initial_states(4)
+    states.tasks_terminated[1] = True
+    before = [array.copy() for array in states]
+    actions = np.arange(4)
+    next_states, valid, rewards = transition(states, actions)
+    for array, expected in zip(states, before):
+        check.equal(array.tolist(), expected.tolist())
+    check.is_false(any(task.terminated for task in env.purpose.tasks))
+
+    # The same transitions give the same results.
+    again = transition(states, actions)
+    for array, expected in zip(again[0], next_states):
+        check.equal(array.tolist(), expected.tolist())
+    check.equal(again[1].tolist(), valid.tolist())
+    check.equal(again[2].tolist(), rewards.tolist())
+    check.equal(
+        transition.action_masks(states)[np.arange(4), actions].tolist(), valid.tolist()
+    )
+
+    with pytest.raises(ValueError):
+        transition(states, np.full(4, transition.n_actions))
+
+
+def test_terminated_tasks_are_not_rewarded_again():
+    env = TowerHcraftEnv(height=2, width=2)
+    env.reset()
+    plan = [env.solving_behavior(task) for task in env.purpose.tasks][0]
+    transition = Transition(env)
+    states = transition.initial_states(2)
+    states.tasks_terminated[1] = True
+    terminated = np.zeros(2, dtype=bool)
+    returns = np.zeros(2)
+    observation = env.state.observation
+    while not env.purpose.terminated:
+        action = plan(observation)
+        observation, _reward, _terminated, _truncated, _infos = env.step(action)
+        states, _valid, rewards = transition(states, np.full(2, action))
+        returns += rewards
+        terminated |= transition.terminated(states)
+    check.equal(terminated.tolist(), [True, True])
+    check.greater(returns[0], returns[1])
+
+
+def test_env_can_step_after_transition():
+    env = TowerHcraftEnv(height=2, width=2)
+    Transition(env)
+    env.reset()
+    env.step(0)
+    check.equal(env.current_step, 1)
+
+
+def test_custom_tasks_cannot_be_transitioned():
+    class SandboxTask(Task):
+        def _is_terminal(self, state) -> bool:
+            return False
+
+        def reward(self, state) -> float:
+            return 0.0
+
+    env = TowerHcraftEnv(height=2, width=2)
+    env.purpose = Purpose(SandboxTask("sandbox"))
+    with pytest.raises(TypeError):
+        Transition(env)
@@ -11,7 +11,9 @@ from hcraft.examples.minecraft.env import MineHcraftEnv
 from hcraft.examples.random_simple.env import RandomHcraftEnv
 from hcraft.examples.recursive import RecursiveHcraftEnv
 from hcraft.examples.tower import TowerHcraftEnv
+from hcraft.purpose import Purpose
 from hcraft.task import GetItemTask, GoToZoneTask, PlaceItemTask, Task
+from hcraft.world import World
 
 if TYPE_CHECKING:
     import gymnasium as gym
@@ -185,6 +187,19 @@ class TestGymMakeMineHcraft:
             f"Diff:\n{expected_tasknames.difference(tasks_names)}",
         )
 
+    def test_single_item_gym_make_kwargs(self):
+        env = _given_env_from_gym_make(
+            MineHcraftEnv, "MineHcraft-Diamond-v1", success_reward=3.0
+        )
+        check.equal(env.purpose.tasks[0]._reward, 3.0)
+
+
+@pytest.mark.parametrize("env_gym_id", HCRAFT_GYM_ENVS)
+def test_registrations_are_lightweight(env_gym_id: str):
+    """Worlds and purposes are only created when environments are made."""
+    for value in gym_module.spec(env_gym_id).kwargs.values():
+        check.is_not_instance(value, (Purpose, World, HcraftEnv))
+
 
 EnvType = TypeVar("EnvType", bound=HcraftEnv)
 
@@ -202,3 +217,19 @@ def _unwrap_env(env: "gym.Env") -> HcraftEnv:
     while not isinstance(env, HcraftEnv):
         env = env.env
     return env
+
+
+def test_vector_env_sample_legal_action():
+    """legal actions should be usable from a gymnasium vector environment."""
+    vector_env = gym_module.vector.SyncVectorEnv(
+        [
+            lambda: TowerHcraftEnv(height=2, width=2, legal_actions_info="bitset")
+            for _ in range(3)
+        ]
+    )
+    _observations, infos = vector_env.reset(seed=0)
+    check.equal(infos["legal_actions_bitset"].shape[0], 3)
+    actions = vector_env.call("sample_legal_action")
+    for env_legal_actions, action in zip(vector_env.call("legal_actions"), actions):
+        check.is_in(action, env_legal_actions)
+    vector_env.step(actions)
@@ -0,0 +1,70 @@
+import ast
+import subprocess
+import sys
+
+import pytest
+import pytest_check as check
+
+HEAVY_MODULES = [
+    "networkx",
+    "matplotlib",
+    "seaborn",
+    "scipy",
+    "hebg",
+    "PIL",
+    "pygame",
+    "unified_planning",
+]
+
+
+def _loaded_heavy_modules(code: str) -> list:
+    code += (
+        "\nimport sys"
+        f"\nprint([name for name in {HEAVY_MODULES!r} if name in sys.modules])"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+    return ast.literal_eval(output.strip().splitlines()[-1])
+
+
+def test_import_hcraft_does_not_load_heavy_modules():
+    check.equal(_loaded_heavy_modules("import hcraft"), [])
+
+
+def test_stepping_an_example_does_not_load_heavy_modules():
+    code = (
+        "from hcraft.examples import MineHcraftEnv\n"
+        "env = MineHcraftEnv(purpose='all')\n"
+        "env.reset()\n"
+        "env.step(env.sample_legal_action())"
+    )
+    check.equal(_loaded_heavy_modules(code), [])
+
+
+def test_cli_entry_points_do_not_load_heavy_modules():
+    check.equal(_loaded_heavy_modules("import hcraft.__main__"), [])
+    code = (
+        "from hcraft.cli import hcraft_cli\n"
+        "env = hcraft_cli(['minecraft'], with_window=False)\n"
+        "env.reset()\n"
+        "from hcraft.dataset import hcraft_dataset_cli\n"
+        "from hcraft.server import HcraftServer"
+    )
+    check.equal(_loaded_heavy_modules(code), [])
+
+
+def test_window_loads_rendering_modules():
+    pytest.importorskip("pygame")
+    code = "from hcraft.cli import hcraft_cli\nhcraft_cli(['minecraft'])"
+    check.is_in("pygame", _loaded_heavy_modules(code))
+
+
+@pytest.mark.parametrize(
+    "attribute", ["HcraftEnv", "Purpose", "requirements", "solving_behaviors"]
+)
+def test_lazy_attributes_are_loaded_on_first_use(attribute: str):
+    import hcraft
+
+    check.is_not_none(getattr(hcraft, attribute))
+    check.is_in(attribute, dir(hcraft))
@@ -0,0 +1,135 @@
+from functools import partial
+
+import numpy as np
+import pytest
+import pytest_check as check
+
+from hcraft.batched import BatchedHcraftEnv
+from hcraft.examples import MineHcraftEnv, RecursiveHcraftEnv, TowerHcraftEnv
+from hcraft.examples.minicraft import MINICRAFT_ENVS
+from hcraft.mixed import MixedBatchedHcraftEnv
+from tests.envs import classic_env
+
+ENV_FACTORIES = [
+    partial(MineHcraftEnv, max_step=30),
+    partial(TowerHcraftEnv, height=3, width=2, max_step=30),
+    partial(RecursiveHcraftEnv, n_items=4, max_step=30),
+] + [partial(env_class, max_step=20) for env_class in MINICRAFT_ENVS]
+
+
+def test_mixed_env_matches_single_envs():
+    num_envs = [2, 1, 3] + [2] * len(MINICRAFT_ENVS)
+    mixed_env = MixedBatchedHcraftEnv(
+        [factory() for factory in ENV_FACTORIES], num_envs=num_envs
+    )
+    envs = [
+        ENV_FACTORIES[world_index]() for world_index in mixed_env.world_index.tolist()
+    ]
+    rng = np.random.default_rng(42)
+
+    def unpadded(array: np.ndarray, index: int, mask: np.ndarray) -> list:
+        return array[index][mask[mixed_env.world_index[index]]].tolist()
+
+    observations, _infos = mixed_env.reset(seed=0)
+    for index, env in enumerate(envs):
+        observation, _infos = env.reset()
+        check.equal(
+            unpadded(observations, index, mixed_env.observation_mask),
+            observation.tolist(),
+        )
+
+    for _ in range(50):
+        masks = mixed_env.action_masks()
+        for index, env in enumerate(envs):
+            check.equal(
+                unpadded(masks, index, mixed_env.transformations_mask),
+                env.action_masks().tolist(),
+            )
+
+        # Mostly legal actions, but also some illegal ones of each world.
+        actions = mixed_env.sample_legal_actions(rng)
+        n_actions = np.array([env.action_space.n for env in envs])
+        random_actions = (rng.random(len(envs)) * n_actions).astype(np.int64)
+        actions = np.where(rng.random(len(envs)) < 0.3, random_actions, actions)
+
+        observations, rewards, terminated, truncated, infos = mixed_env.step(actions)
+        for index, env in enumerate(envs):
+            observation, reward, env_terminated, env_truncated, _ = env.step(
+                actions[index]
+            )
+            if env_terminated or env_truncated:
+                check.is_true(infos["_final_obs"][index])
+                check.equal(
+                    unpadded(infos["final_obs"], index, mixed_env.observation_mask),
+                    observation.tolist(),
+                )
+                observation, _infos = env.reset()
+            check.equal(
+                unpadded(observations, index, mixed_env.observation_mask),
+                observation.tolist(),
+            )
+            check.equal(rewards[index], reward)
+            check.equal(terminated[index], env_terminated)
+            check.equal(truncated[index], env_truncated)
+
+
+def test_single_world_mix_matches_batched_env():
+    env_factory = partial(MineHcraftEnv, max_step=20)
+    mixed_env = MixedBatchedHcraftEnv([env_factory()], num_envs=6)
+    batched_env = BatchedHcraftEnv(env_factory(), num_envs=6)
+    rng = np.random.default_rng(0)
+    observations, _infos = mixed_env.reset(seed=0)
+    expected_observations, _infos = batched_env.reset(seed=0)
+    check.equal(observations.tolist(), expected_observations.tolist())
+    for _ in range(30):
+        actions = batched_env.sample_legal_actions(rng)
+        *outputs, _infos = mixed_env.step(actions)
+        *expected_outputs, _infos = batched_env.step(actions)
+        for output, expected_output in zip(outputs, expected_outputs):
+            check.equal(output.tolist(), expected_output.tolist())
+
+
+def test_padded_actions_are_illegal():
+    small_env, large_env = classic_env()[0], MineHcraftEnv()
+    mixed_env = MixedBatchedHcraftEnv([small_env, large_env], num_envs=1)
+    mixed_env.reset()
+    n_small_actions = small_env.action_space.n
+    check.equal(mixed_env.action_space.n, large_env.action_space.n)
+    check.is_false(np.any(mixed_env.action_masks()[0, n_small_actions:]))
+
+    _obs, rewards, *_ = mixed_env.step(np.array([n_small_actions, 0]))
+    check.equal(rewards[0], small_env.invalid_reward)
+    check.is_false(mixed_env.valid[0])
+
+
+def test_masks_shapes():
+    envs = [classic_env()[0], MineHcraftEnv()]
+    mixed_env = MixedBatchedHcraftEnv(envs, num_envs=[1, 2])
+    check.equal(mixed_env.world_index.tolist(), [0, 1, 1])
+    check.equal(mixed_env.world_rows, [slice(0, 1), slice(1, 3)])
+    for index, env in enumerate(envs):
+        world = env.world
+        check.equal(int(mixed_env.items_mask[index].sum()), world.n_items)
+        check.equal(int(mixed_env.zones_mask[index].sum()), world.n_zones)
+        check.equal(int(mixed_env.zones_items_mask[index].sum()), world.n_zones_items)
+        check.equal(
+            int(mixed_env.transformations_mask[index].sum()),
+            len(world.transformations),
+        )
+    check.equal(
+        mixed_env.observation_mask.shape[1],
+        mixed_env.observation_space.shape[0],
+    )
+
+
+def test_batched_state_item_is_an_hcraft_state_of_its_world():
+    envs = [classic_env()[0], MineHcraftEnv()]
+    mixed_env = MixedBatchedHcraftEnv(envs, num_envs=1)
+    mixed_env.reset()
+    check.is_true(mixed_env.state[0].world is envs[0].world)
+    check.is_true(mixed_env.state[1].world is envs[1].world)
+
+
+def test_num_envs_must_match_envs():
+    with pytest.raises(ValueError):
+        MixedBatchedHcraftEnv([classic_env()[0], MineHcraftEnv()], num_envs=[1])
@@ -0,0 +1,104 @@
+import pickle
+from functools import partial
+
+import numpy as np
+import pytest
+import pytest_check as check
+
+from hcraft.examples import MineHcraftEnv, RecursiveHcraftEnv, TowerHcraftEnv
+from hcraft.examples.minicraft import MINICRAFT_ENVS
+from hcraft.examples.treasure import TreasureEnv
+from hcraft.transformation import Transformation
+
+ENV_FACTORIES = [
+    partial(MineHcraftEnv, purpose="all", max_step=30),
+    partial(TowerHcraftEnv, height=3, width=2, max_step=30),
+    partial(RecursiveHcraftEnv, n_items=4, max_step=30),
+    partial(TreasureEnv, max_step=20),
+] + [partial(env_class, max_step=20) for env_class in MINICRAFT_ENVS]
+
+
+@pytest.mark.parametrize(
+    "env_factory", ENV_FACTORIES, ids=lambda factory: factory.func.__name__
+)
+def test_unpickled_env_behaves_the_same(env_factory):
+    env = env_factory()
+    env.reset(seed=0)
+    for _ in range(5):
+        env.step(env.sample_legal_action())
+    unpickled_env = pickle.loads(pickle.dumps(env))
+
+    world, unpickled_world = env.world, unpickled_env.world
+    check.equal(unpickled_world.items, world.items)
+    check.equal(unpickled_world.zones, world.zones)
+    check.equal(unpickled_world.zones_items, world.zones_items)
+    check.equal(unpickled_world.start_zone, world.start_zone)
+    check.equal(unpickled_world.start_items, world.start_items)
+    check.equal(unpickled_world.start_zones_items, world.start_zones_items)
+    check.equal(
+        [repr(transfo) for transfo in unpickled_world.transformations],
+        [repr(transfo) for transfo in world.transformations],
+    )
+    check.equal(
+        [transfo.name for transfo in unpickled_world.transformations],
+        [transfo.name for transfo in world.transformations],
+    )
+    check.equal(unpickled_env.state.key, env.state.key)
+
+    rng = np.random.default_rng(0)
+    for _ in range(30):
+        check.equal(unpickled_env.action_masks().tolist(), env.action_masks().tolist())
+        action = rng.integers(env.action_space.n)
+        observation, reward, terminated, truncated, _ = env.step(action)
+        unpickled_outputs = unpickled_env.step(action)
+        check.equal(unpickled_outputs[0].tolist(), observation.tolist())
+        check.equal(unpickled_outputs[1:4], (reward, terminated, truncated))
+        if terminated or truncated:
+            env.reset()
+            unpickled_env.reset()
+
+
+def test_unpickled_env_has_live_state():
+    env = MineHcraftEnv()
+    env.reset()
+    unpickled_env = pickle.loads(pickle.dumps(env))
+    unpickled_world = unpickled_env.world
+    check.is_true(unpickled_env.state in unpickled_world._live_states)
+
+
+def test_pickled_world_is_compact():
+    env = TowerHcraftEnv(height=10, width=10)
+    env.world.requirements
+    transformations_payload = sum(
+        len(pickle.dumps(transfo.__dict__)) for transfo in env.world.transformations
+    )
+    check.less(len(pickle.dumps(env.world)) * 10, transformations_payload)
+
+
+def test_unpickled_transformation_must_be_built():
+    env = MineHcraftEnv()
+    transfo = env.world.transformations[-1]
+    unpickled_transfo: Transformation = pickle.loads(pickle.dumps(transfo))
+    check.equal(repr(unpickled_transfo), repr(transfo))
+    check.equal(unpickled_transfo.name, transfo.name)
+    check.is_none(unpickled_transfo._inventory_operations)
+    unpickled_transfo.build(env.world)
+    check.is_true(unpickled_transfo.is_valid(env.state) == transfo.is_valid(env.state))
+
+
+def test_world_state_excludes_live_states():
+    env = TowerHcraftEnv(height=2, width=2)
+    env.reset()
+    world = env.world
+    check.equal(len(world._live_states), 1)
+
+    state = world.__getstate__()
+    check.is_none(state["_live_states"])
+    restored = object.__new__(type(world))
+    restored.__setstate__(pickle.loads(pickle.dumps(state)))
+    check.equal(len(restored._live_states), 0)
+    check.equal(restored.items, world.items)
+
+    unpickled_env = pickle.loads(pickle.dumps(env))
+    check.equal(len(unpickled_env.world._live_states), 1)
+    check.equal(len(world._live_states), 1)
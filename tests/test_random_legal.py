@@ -24,3 +24,52 @@ def test_random_legal_agent():
         total_reward += reward
 
     check.greater_equal(total_reward, 0)
+
+
+def test_legal_actions_match_mask():
+    world = classic_env()[1]
+    env = HcraftEnv(world, max_step=10)
+    env.reset(seed=42)
+    done = False
+    while not done:
+        mask = env.action_masks()
+        legal_actions = env.legal_actions()
+        check.equal(legal_actions.tolist(), np.nonzero(mask)[0].tolist())
+        bitset = env.legal_actions_bitset()
+        unpacked = np.unpackbits(bitset, count=env.action_space.n).astype(bool)
+        check.equal(unpacked.tolist(), mask.tolist())
+
+        action = env.sample_legal_action()
+        check.is_true(mask[action])
+        _observation, _reward, terminated, truncated, _info = env.step(action)
+        done = terminated or truncated
+
+
+def test_sample_legal_action_is_seeded():
+    world = classic_env()[1]
+
+    def seeded_actions(seed: int) -> list:
+        env = HcraftEnv(world)
+        env.reset(seed=seed)
+        actions = []
+        for _ in range(20):
+            action = env.sample_legal_action()
+            actions.append(action)
+            env.step(action)
+        return actions
+
+    check.equal(seeded_actions(0), seeded_actions(0))
+    check.not_equal(seeded_actions(0), seeded_actions(1))
+
+
+def test_bitset_legal_actions_infos():
+    world = classic_env()[1]
+    env = HcraftEnv(world, legal_actions_info="bitset")
+    _observation, infos = env.reset()
+    check.is_not_in("action_is_legal", infos)
+    check.equal(infos["legal_actions_bitset"].dtype, np.uint8)
+
+    env = HcraftEnv(world, legal_actions_info="none")
+    _observation, infos = env.reset()
+    check.is_not_in("action_is_legal", infos)
+    check.is_not_in("legal_actions_bitset", infos)
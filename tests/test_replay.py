@@ -0,0 +1,99 @@
+from functools import partial
+
+import numpy as np
+import pytest
+import pytest_check as check
+
+from hcraft.batched import BatchedHcraftEnv
+from hcraft.examples import MineHcraftEnv, RecursiveHcraftEnv, TowerHcraftEnv
+from hcraft.examples.minicraft import MINICRAFT_ENVS
+from hcraft.examples.treasure import TreasureEnv
+from hcraft.replay import TrajectoryReplayer, replay_shard, state_vector
+from hcraft.trajectories import TrajectoryRecorder
+
+ENV_FACTORIES = [
+    MineHcraftEnv,
+    partial(TowerHcraftEnv, height=3, width=2),
+    partial(RecursiveHcraftEnv, n_items=4),
+    TreasureEnv,
+] + list(MINICRAFT_ENVS)
+
+
+def _random_trajectory(env, n_steps: int, legal_rate: float, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    env.reset(seed=seed)
+    actions, states, valid = [], [], []
+    for _ in range(n_steps):
+        action = int(rng.integers(env.action_space.n))
+        if rng.random() < legal_rate and env.legal_actions().size > 0:
+            action = env.sample_legal_action()
+        env.step(action)
+        actions.append(action)
+        states.append(state_vector(env.state))
+        valid.append(env.last_action_valid)
+    return actions, np.stack(states), valid
+
+
+@pytest.mark.parametrize(
+    "env_factory",
+    ENV_FACTORIES,
+    ids=lambda factory: getattr(factory, "func", factory).__name__,
+)
+@pytest.mark.parametrize("legal_rate", [1.0, 0.7])
+def test_replay_matches_stepping(env_factory, legal_rate: float):
+    env = env_factory()
+    actions, expected_states, expected_valid = _random_trajectory(env, 100, legal_rate)
+    replayer = TrajectoryReplayer(env.world)
+
+    states, valid = replayer.replay(actions)
+    check.equal(states.tolist(), expected_states.tolist())
+    check.equal(valid.tolist(), expected_valid)
+
+    states, valid = replayer.replay(actions, valid=expected_valid)
+    check.equal(states.tolist(), expected_states.tolist())
+
+
+def test_replay_from_given_start():
+    env = MineHcraftEnv()
+    actions, expected_states, _valid = _random_trajectory(env, 40, 0.8)
+    replayer = TrajectoryReplayer(env.world)
+    states, _valid = replayer.replay(actions[20:], start=expected_states[19])
+    check.equal(states.tolist(), expected_states[20:].tolist())
+
+
+def test_replay_refuses_wrong_validities():
+    env = TowerHcraftEnv(height=2, width=2)
+    replayer = TrajectoryReplayer(env.world)
+    with pytest.raises(ValueError):
+        replayer.replay([2], valid=[True])
+    with pytest.raises(ValueError):
+        replayer.replay([env.action_space.n])
+
+
+def test_replay_recorded_shard(tmp_path):
+    num_envs = 4
+    env = BatchedHcraftEnv(MineHcraftEnv(max_step=15), num_envs=num_envs)
+    recorder = TrajectoryRecorder(env, tmp_path, shard_steps=40, keyframe_interval=16)
+    replayer = TrajectoryReplayer(env.world)
+    rng = np.random.default_rng(0)
+    recorder.reset(seed=0)
+    expected_states, done = [], []
+    for _ in range(50):
+        actions = recorder.sample_legal_actions()
+        random_actions = rng.integers(recorder.action_space.n, size=num_envs)
+        actions = np.where(rng.random(num_envs) < 0.3, random_actions, actions)
+        _obs, _rewards, terminated, truncated, _infos = recorder.step(actions)
+        state = env.state
+        expected_states.append(
+            replayer.vectors(
+                state.player_inventory, state.position_slots, state.zones_inventories
+            )
+        )
+        done.append(terminated | truncated)
+    recorder.close()
+
+    states = np.concatenate([replay_shard(tmp_path, 0), replay_shard(tmp_path, 1)])
+    # Done environments are reset, so their final state is not in env.state.
+    not_done = ~np.stack(done)
+    check.is_true(np.any(~not_done))
+    check.equal(states[not_done].tolist(), np.stack(expected_states)[not_done].tolist())
@@ -0,0 +1,117 @@
+import pytest
+import pytest_check as check
+
+from hcraft.examples import MineHcraftEnv, TowerHcraftEnv
+from hcraft.elements import Stack
+from hcraft.examples.minecraft import items as mc_items
+from hcraft.examples.minecraft import zones as mc_zones
+from hcraft.examples.minicraft import MINICRAFT_ENVS
+from hcraft.purpose import Purpose
+from hcraft.search import ALGORITHMS, HeuristicSearch, search_plan
+from hcraft.task import GetItemTask, PlaceItemTask
+
+
+def _terminates(env, plan) -> bool:
+    terminated = False
+    for action in plan:
+        _observation, _reward, terminated, _truncated, _infos = env.step(action)
+    return terminated
+
+
+@pytest.mark.parametrize("algorithm", ALGORITHMS)
+def test_plans_terminate_tower(algorithm):
+    env = TowerHcraftEnv(height=2, width=2)
+    env.reset()
+    result = search_plan(env, algorithm=algorithm)
+    check.is_true(result.solved)
+    check.is_true(_terminates(env, result.plan))
+
+
+def test_astar_plans_are_optimal():
+    env = TowerHcraftEnv(height=2, width=2)
+    env.reset()
+    optimal = search_plan(env, algorithm="astar")
+    check.equal(len(optimal.plan), 7)
+    breadth_first = search_plan(env, algorithm="astar", heuristic="blind")
+    check.equal(len(breadth_first.plan), 7)
+    check.less_equal(optimal.expanded, breadth_first.expanded)
+    bounded = search_plan(env, algorithm="wastar", weight=2.0)
+    check.less_equal(len(bounded.plan), 2 * 7)
+
+
+@pytest.mark.parametrize("env_class", MINICRAFT_ENVS, ids=lambda cls: cls.__name__)
+def test_plans_terminate_minicraft(env_class):
+    env = env_class()
+    env.reset()
+    result = search_plan(env, algorithm="gbfs")
+    check.is_true(result.solved)
+    check.is_true(_terminates(env, result.plan))
+
+
+def test_greedy_search_on_deep_hierarchy():
+    env = TowerHcraftEnv(height=3, width=3)
+    env.reset()
+    result = search_plan(env, algorithm="gbfs")
+    check.equal(len(result.plan), 40)
+    check.is_true(_terminates(env, result.plan))
+
+
+def test_greedy_search_gets_diamond():
+    env = MineHcraftEnv(purpose=GetItemTask(mc_items.DIAMOND))
+    env.reset()
+    result = search_plan(env, algorithm="gbfs")
+    check.is_true(result.solved)
+    check.is_true(_terminates(env, result.plan))
+
+
+def test_optimal_search_places_item_in_zone():
+    env = MineHcraftEnv(
+        purpose=PlaceItemTask(Stack(mc_items.CRAFTING_TABLE), mc_zones.FOREST)
+    )
+    env.reset()
+    result = search_plan(env, algorithm="astar")
+    check.is_true(result.solved)
+    check.is_true(_terminates(env, result.plan))
+
+
+def test_greedy_search_places_item_anywhere():
+    # The portal can only be placed outside of the start zone.
+    env = MineHcraftEnv(purpose=PlaceItemTask(Stack(mc_items.OPEN_ENDER_PORTAL)))
+    env.reset()
+    result = search_plan(env, algorithm="gbfs")
+    check.is_true(result.solved)
+    check.is_true(_terminates(env, result.plan))
+
+
+def test_search_from_current_state():
+    env = TowerHcraftEnv(height=2, width=2)
+    env.reset()
+    plan = search_plan(env, algorithm="astar").plan
+    for action in plan[:3]:
+        env.step(action)
+    result = search_plan(env, algorithm="astar")
+    check.equal(len(result.plan), len(plan) - 3)
+    check.is_true(_terminates(env, result.plan))
+
+
+def test_expansions_limit():
+    env = TowerHcraftEnv(height=2, width=2)
+    env.reset()
+    result = search_plan(env, algorithm="astar", heuristic="blind", max_expansions=2)
+    check.is_false(result.solved)
+    check.equal(result.expanded, 2)
+
+
+def test_unknown_algorithm_or_heuristic():
+    env = TowerHcraftEnv(height=2, width=2)
+    env.reset()
+    with pytest.raises(ValueError, match="Unknown algorithm"):
+        search_plan(env, algorithm="dijkstra")
+    with pytest.raises(ValueError, match="Unknown heuristic"):
+        search_plan(env, heuristic="hadd")
+
+
+def test_purpose_without_terminal_group():
+    env = MineHcraftEnv()
+    with pytest.raises(ValueError, match="without terminal group"):
+        HeuristicSearch(env.world, Purpose())
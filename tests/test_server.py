@@ -0,0 +1,95 @@
+import threading
+from functools import partial
+
+import numpy as np
+import pytest
+import pytest_check as check
+
+from hcraft.batched import BatchedHcraftEnv
+from hcraft.examples import MineHcraftEnv
+from hcraft.server import (
+    Command,
+    HcraftClient,
+    HcraftServer,
+    Status,
+    receive_frame,
+    send_frame,
+)
+
+
+@pytest.fixture
+def server(tmp_path):
+    server = HcraftServer(
+        str(tmp_path / "hcraft.sock"), MineHcraftEnv(max_step=10), num_envs=5
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def test_client_matches_batched_env(server: HcraftServer):
+    batched_env = BatchedHcraftEnv(MineHcraftEnv(max_step=10), num_envs=5)
+    client = HcraftClient(server.socket_path)
+    rng = np.random.default_rng(0)
+    try:
+        check.equal(
+            (client.num_envs, client.n_actions),
+            (5, batched_env.action_space.n),
+        )
+        observations = client.reset(seed=0)
+        expected_observations, _infos = batched_env.reset(seed=0)
+        check.equal(observations.tolist(), expected_observations.tolist())
+        n_done = 0
+        for _ in range(25):
+            check.equal(
+                client.action_masks().tolist(), batched_env.action_masks().tolist()
+            )
+            actions = batched_env.sample_legal_actions(rng)
+            *outputs, final_obs = client.step(actions)
+            *expected_outputs, infos = batched_env.step(actions)
+            for output, expected_output in zip(outputs, expected_outputs):
+                check.equal(output.tolist(), expected_output.tolist())
+            if "_final_obs" in infos:
+                done = infos["_final_obs"]
+                n_done += int(done.sum())
+                check.equal(final_obs[done].tolist(), infos["final_obs"][done].tolist())
+        check.greater(n_done, 0)
+    finally:
+        client.close()
+
+
+def test_invalid_requests_return_errors(server: HcraftServer):
+    client = HcraftClient(server.socket_path)
+    try:
+        with pytest.raises(RuntimeError, match="Actions out of the action space"):
+            client.step(np.full(client.num_envs, -1))
+        with pytest.raises(RuntimeError, match="Expected 5 int64 actions"):
+            client._request(Command.STEP, b"\x00")
+        # The connection stays usable after errors.
+        check.equal(client.reset().shape, (5, client.observation_size))
+    finally:
+        client.close()
+
+
+def test_unknown_command(server: HcraftServer):
+    client = HcraftClient(server.socket_path)
+    try:
+        send_frame(client.connection, 42)
+        status, message = receive_frame(client.connection)
+        check.equal(status, Status.ERROR)
+        check.is_in("Unknown command", message.decode())
+    finally:
+        client.close()
+
+
+def test_clients_are_served_one_after_another(server: HcraftServer):
+    make_client = partial(HcraftClient, server.socket_path)
+    first_client = make_client()
+    first_client.reset(seed=0)
+    first_client.close()
+    second_client = make_client()
+    check.equal(second_client.action_masks().shape, (5, second_client.n_actions))
+    second_client.close()
@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+import pytest_check as check
+
+from hcraft.batched import BatchedHcraftEnv
+from hcraft.examples import MineHcraftEnv, TowerHcraftEnv
+from hcraft.trajectories import TrajectoryRecorder, load_shard, read_recording
+from hcraft.world_file import load_world
+
+
+def _load_all_shards(directory) -> dict:
+    n_shards = len(read_recording(directory)["shards"])
+    shards = [load_shard(directory, index) for index in range(n_shards)]
+    return {
+        name: np.concatenate([shard[name] for shard in shards])
+        for name in ("actions", "rewards", "valid", "terminated", "truncated", "resets")
+    }
+
+
+def test_record_batched_env(tmp_path):
+    num_envs = 8
+    env = BatchedHcraftEnv(MineHcraftEnv(max_step=20), num_envs=num_envs)
+    recorder = TrajectoryRecorder(env, tmp_path, shard_steps=32, keyframe_interval=8)
+    rng = np.random.default_rng(0)
+
+    recorder.reset(seed=0)
+    expected = {name: [] for name in ("actions", "rewards", "valid", "terminated")}
+    states = []
+    for _ in range(70):
+        states.append(env.state.player_inventory.copy())
+        actions = recorder.sample_legal_actions()
+        random_actions = rng.integers(recorder.action_space.n, size=num_envs)
+        actions = np.where(rng.random(num_envs) < 0.3, random_actions, actions)
+        _obs, rewards, terminated, _truncated, _infos = recorder.step(actions)
+        expected["actions"].append(actions.tolist())
+        expected["rewards"].append(rewards.tolist())
+        expected["valid"].append(env.valid.tolist())
+        expected["terminated"].append(terminated.tolist())
+    recorder.close()
+
+    descriptor = read_recording(tmp_path)
+    check.equal([shard["steps"] for shard in descriptor["shards"]], [32, 32, 6])
+    check.equal(descriptor["num_envs"], num_envs)
+    check.equal(load_world(tmp_path / "world.json").fingerprint, env.world.fingerprint)
+
+    recorded = _load_all_shards(tmp_path)
+    check.equal(recorded["actions"].dtype, np.uint8)
+    for name, values in expected.items():
+        check.equal(
+            recorded[name].tolist(),
+            np.array(values).astype(recorded[name].dtype).tolist(),
+        )
+    check.is_true(np.any(~recorded["valid"]))
+    check.equal(recorded["resets"][0].tolist(), [True] * num_envs)
+    done = recorded["terminated"] | recorded["truncated"]
+    check.equal(recorded["resets"][1:].tolist(), done[:-1].tolist())
+
+    shard = load_shard(tmp_path, 1)
+    check.equal(shard["keyframes/steps"].tolist(), [0, 8, 16, 24])
+    for keyframe, step in enumerate(shard["keyframes/steps"]):
+        check.equal(
+            shard["keyframes/player_inventory"][keyframe].tolist(),
+            states[32 + step].tolist(),
+        )
+
+
+def test_record_single_env(tmp_path):
+    env = TowerHcraftEnv(height=2, width=2, max_step=5)
+    with TrajectoryRecorder(env, tmp_path, keyframe_interval=4) as recorder:
+        for episode in range(2):
+            recorder.reset(seed=episode)
+            for action in (0, 1, 2, 2, 2):
+                recorder.step(action)
+
+    recorded = _load_all_shards(tmp_path)
+    check.equal(recorded["actions"][:, 0].tolist(), [0, 1, 2, 2, 2] * 2)
+    check.equal(
+        recorded["resets"][:, 0].tolist(), [True] + [False] * 4 + [True] + [False] * 4
+    )
+    check.equal(recorded["truncated"][:, 0].tolist(), ([False] * 4 + [True]) * 2)
+    check.equal(recorded["valid"][:, 0].tolist(), ([True] * 3 + [False] * 2) * 2)
+    shard = load_shard(tmp_path, 0)
+    check.equal(shard["keyframes/steps"].tolist(), [0, 4, 8])
+    check.equal(shard["keyframes/position"].tolist(), [[-1], [-1], [-1]])
+
+
+def test_partial_recording_is_readable(tmp_path):
+    env = BatchedHcraftEnv(TowerHcraftEnv(height=2, width=2), num_envs=2)
+    recorder = TrajectoryRecorder(env, tmp_path, shard_steps=4)
+    recorder.reset()
+    for _ in range(6):
+        recorder.step(recorder.sample_legal_actions())
+    recorder._wait_pending()
+    check.equal(len(read_recording(tmp_path)["shards"]), 1)
+    recorder.close()
+    check.equal(len(read_recording(tmp_path)["shards"]), 2)
+
+
+def test_shards_written_in_background_have_distinct_files(tmp_path):
+    env = TowerHcraftEnv(height=2, width=2)
+    with TrajectoryRecorder(env, tmp_path, shard_steps=2) as recorder:
+        recorder.reset()
+        for _ in range(5):
+            recorder.step(0)
+    files = [shard["file"] for shard in read_recording(tmp_path)["shards"]]
+    check.equal(files, ["shard-00000.npz", "shard-00001.npz", "shard-00002.npz"])
+
+
+def test_not_a_recording(tmp_path):
+    (tmp_path / "trajectories.json").write_text('{"format": "other"}')
+    with pytest.raises(ValueError):
+        read_recording(tmp_path)
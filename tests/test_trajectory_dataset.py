@@ -0,0 +1,169 @@
+import os
+import shutil
+from functools import partial
+
+import numpy as np
+import pytest
+import pytest_check as check
+
+from hcraft import trajectory_dataset
+from hcraft.batched import BatchedHcraftEnv
+from hcraft.dataset import generate_dataset
+from hcraft.examples import MineHcraftEnv, TowerHcraftEnv
+from hcraft.trajectories import TrajectoryRecorder
+from hcraft.trajectory_dataset import TrajectoryDataset
+
+
+@pytest.fixture
+def batched_recording(tmp_path):
+    """Recording of a batched env and its transitions of each environment in order."""
+    num_envs = 3
+    env = BatchedHcraftEnv(MineHcraftEnv(max_step=12), num_envs=num_envs)
+    recorder = TrajectoryRecorder(env, tmp_path, shard_steps=16, keyframe_interval=8)
+    rng = np.random.default_rng(0)
+    observations, _infos = recorder.reset(seed=0)
+    observations = observations.copy()
+    transitions = [[] for _ in range(num_envs)]
+    for _ in range(40):
+        actions = recorder.sample_legal_actions()
+        random_actions = rng.integers(recorder.action_space.n, size=num_envs)
+        actions = np.where(rng.random(num_envs) < 0.3, random_actions, actions)
+        next_observations, rewards, terminated, truncated, infos = recorder.step(
+            actions
+        )
+        final_observations = next_observations.copy()
+        if "_final_obs" in infos:
+            done = infos["_final_obs"]
+            final_observations[done] = infos["final_obs"][done]
+        for index in range(num_envs):
+            transitions[index].append(
+                (
+                    observations[index].tolist(),
+                    int(actions[index]),
+                    float(np.float32(rewards[index])),
+                    final_observations[index].tolist(),
+                    bool(terminated[index] or truncated[index]),
+                )
+            )
+        observations = next_observations.copy()
+    recorder.close()
+    return tmp_path, [transition for env in transitions for transition in env]
+
+
+def test_dataset_transitions_match_recording(batched_recording):
+    directory, expected = batched_recording
+    dataset = TrajectoryDataset(directory)
+    check.equal(len(dataset), len(expected))
+    batch = dataset.transitions(np.arange(len(dataset)))
+    done = batch["terminated"] | batch["truncated"]
+    transitions = list(
+        zip(
+            batch["observations"].tolist(),
+            batch["actions"].tolist(),
+            batch["rewards"].tolist(),
+            batch["next_observations"].tolist(),
+            done.tolist(),
+        )
+    )
+    check.equal(transitions, expected)
+    check.is_true(isinstance(dataset.indexes[0].arrays["observations"], np.memmap))
+
+    # Episodes end when done, or at the end of the recording.
+    episodes_ends = dataset.episode_offsets[1:] - 1
+    check.greater(dataset.n_episodes, 3)
+    for end in episodes_ends[:-1]:
+        if not done[end]:
+            check.equal(int(end + 1) % 40, 0)
+
+
+def test_sample_subsequences(batched_recording):
+    directory, _expected = batched_recording
+    dataset = TrajectoryDataset(directory, rng=np.random.default_rng(0))
+    batch = dataset.sample_subsequences(64, length=5)
+    check.equal(batch["observations"].shape, (64, 6, dataset.observation_size))
+    check.equal(batch["actions"].shape, (64, 5))
+    # Subsequences never cross episodes.
+    check.is_false(np.any(batch["terminated"][:, :-1] | batch["truncated"][:, :-1]))
+    # The last observation follows the last transition of each subsequence.
+    full = dataset.transitions(np.arange(len(dataset)))
+    for sequence in range(4):
+        first = np.flatnonzero(
+            np.all(full["observations"] == batch["observations"][sequence, 0], axis=1)
+            & (full["actions"] == batch["actions"][sequence, 0])
+        )[0]
+        check.equal(
+            batch["observations"][sequence, -1].tolist(),
+            full["next_observations"][first + 4].tolist(),
+        )
+    with pytest.raises(ValueError):
+        dataset.sample_subsequences(1, length=100)
+
+
+def test_prioritized_sampling(batched_recording):
+    directory, _expected = batched_recording
+    dataset = TrajectoryDataset(directory, rng=np.random.default_rng(0))
+    priorities = np.zeros(len(dataset))
+    priorities[[3, 7]] = 1.0
+    batch = dataset.sample_transitions(50, priorities=priorities)
+    expected = dataset.transitions(np.array([3, 7]))
+    check.equal(
+        {action for action in batch["actions"].tolist()},
+        set(expected["actions"].tolist()),
+    )
+    with pytest.raises(ValueError):
+        dataset.sample_transitions(1, priorities=-np.ones(len(dataset)))
+
+
+def test_index_is_rebuilt_when_recording_grows(tmp_path):
+    env = TowerHcraftEnv(height=2, width=2)
+    recorder = TrajectoryRecorder(env, tmp_path, shard_steps=4)
+    recorder.reset()
+    for _ in range(4):
+        recorder.step(0)
+    recorder._wait_pending()
+    check.equal(len(TrajectoryDataset(tmp_path)), 4)
+    for _ in range(2):
+        recorder.step(1)
+    recorder.close()
+    check.equal(len(TrajectoryDataset(tmp_path)), 6)
+
+
+def test_index_rebuilt_concurrently(tmp_path, monkeypatch):
+    env = TowerHcraftEnv(height=2, width=2)
+    recorder = TrajectoryRecorder(env, tmp_path, shard_steps=4)
+    recorder.reset()
+    for _ in range(6):
+        recorder.step(0)
+    recorder.close()
+
+    replace = os.replace
+
+    def concurrent_replace(source, destination):
+        # Another reader installs the same index first.
+        shutil.copytree(source, destination)
+        replace(source, destination)
+
+    monkeypatch.setattr(trajectory_dataset.os, "replace", concurrent_replace)
+    check.equal(len(TrajectoryDataset(tmp_path)), 6)
+    check.equal(list(tmp_path.glob(".staging-*")), [])
+
+
+def test_dataset_of_generated_demonstrations(tmp_path):
+    tower = partial(TowerHcraftEnv, height=2, width=2, max_step=8)
+    manifest = generate_dataset(
+        tmp_path,
+        {"tower": tower},
+        seeds=range(6),
+        expert="random",
+        num_workers=0,
+        episodes_per_shard=2,
+    )
+    dataset = TrajectoryDataset(tmp_path)
+    stored = [entry for entry in manifest if "shard" in entry]
+    check.equal(dataset.n_episodes, len(stored))
+    check.equal(dataset.episodes_lengths.tolist(), [entry["steps"] for entry in stored])
+    env = tower()
+    first_observation, _infos = env.reset()
+    episode = dataset.episode(dataset.n_episodes - 1)
+    check.equal(episode["observations"][0].tolist(), first_observation.tolist())
+    check.almost_equal(float(episode["rewards"].sum()), stored[-1]["return"], abs=1e-5)
@@ -342,6 +342,12 @@ class TestRepr:
         tranfo = Transformation(zone=Zone("A"))
         check_equal_str(repr(tranfo), "| at A ⟹")
 
+    def test_name_defaults_to_repr(self):
+        tranfo = Transformation(destination=Zone("other zone"))
+        check_equal_str(tranfo.name, repr(tranfo))
+        tranfo.name = "go to other zone"
+        check_equal_str(str(tranfo), "go to other zone")
+
     def test_full(self):
         tranfo = Transformation(
             inventory_changes=[
@@ -0,0 +1,133 @@
+import multiprocessing as mp
+import pickle
+from functools import partial
+
+import numpy as np
+import pytest
+import pytest_check as check
+
+from hcraft.batched import BatchedHcraftEnv
+from hcraft.examples import MineHcraftEnv
+from hcraft.examples.minicraft import MiniHCraftKeyCorridor
+from hcraft import vector
+from hcraft.batched import CompiledTransformations
+from hcraft.vector import SharedMemoryVectorEnv, WarmEnv
+
+
+@pytest.fixture
+def no_warm_envs(monkeypatch):
+    """Start from an empty registry of warm environments of this process."""
+    monkeypatch.setattr(vector, "_WARM_ENVS", {})
+
+
+@pytest.mark.parametrize(
+    "env_factory",
+    [partial(MineHcraftEnv, max_step=20), partial(MiniHCraftKeyCorridor, max_step=20)],
+    ids=["MineHcraft", "MiniHCraftKeyCorridor"],
+)
+def test_shared_memory_vector_env_matches_batched_env(env_factory):
+    num_envs = 10
+    vector_env = SharedMemoryVectorEnv(env_factory, num_envs=num_envs, num_workers=3)
+    batched_env = BatchedHcraftEnv(env_factory(), num_envs=num_envs)
+    rng = np.random.default_rng(0)
+    try:
+        observations, infos = vector_env.reset(seed=0)
+        expected_observations, expected_infos = batched_env.reset(seed=0)
+        check.equal(observations.tolist(), expected_observations.tolist())
+        check.equal(
+            infos["action_is_legal"].tolist(),
+            expected_infos["action_is_legal"].tolist(),
+        )
+
+        for _ in range(30):
+            actions = batched_env.sample_legal_actions(rng)
+            *outputs, infos = vector_env.step(actions)
+            *expected_outputs, expected_infos = batched_env.step(actions)
+            for output, expected_output in zip(outputs, expected_outputs):
+                check.equal(output.tolist(), expected_output.tolist())
+            check.equal(
+                infos["action_is_legal"].tolist(),
+                expected_infos["action_is_legal"].tolist(),
+            )
+            check.equal("_final_obs" in infos, "_final_obs" in expected_infos)
+    finally:
+        vector_env.close()
+
+
+def test_worker_errors_are_raised():
+    vector_env = SharedMemoryVectorEnv(
+        partial(MineHcraftEnv, max_step=20), num_envs=2, num_workers=2
+    )
+    with pytest.raises(RuntimeError, match="Actions out of the action space"):
+        vector_env.step(np.array([-1, -1]))
+    check.is_true(vector_env.closed)
+
+
+def test_close_while_holding_views():
+    vector_env = SharedMemoryVectorEnv(
+        partial(MineHcraftEnv, max_step=20), num_envs=2, num_workers=1, copy=False
+    )
+    observations, _infos = vector_env.reset(seed=0)
+    expected = observations.tolist()
+    vector_env.close()
+    check.is_true(vector_env.closed)
+    check.equal(observations.tolist(), expected)
+    # The shared memory is released once its last view is dropped.
+    del observations, _infos
+    del vector_env
+
+
+def _counting_env_fn(counter, **kwargs) -> MineHcraftEnv:
+    with counter.get_lock():
+        counter.value += 1
+    return MineHcraftEnv(**kwargs)
+
+
+def test_forked_workers_do_not_rebuild_the_env():
+    context = mp.get_context("fork")
+    counter = context.Value("i", 0)
+    vector_env = SharedMemoryVectorEnv(
+        partial(_counting_env_fn, counter, max_step=20),
+        num_envs=8,
+        num_workers=4,
+        context="fork",
+    )
+    try:
+        vector_env.reset(seed=0)
+        vector_env.step(vector_env.sample_legal_actions())
+        check.equal(counter.value, 1)
+    finally:
+        vector_env.close()
+
+
+def test_warm_env_is_built_once_per_process(no_warm_envs):
+    counter = mp.Value("i", 0)
+    warm_env = WarmEnv("counted_mine", partial(_counting_env_fn, counter))
+    env = warm_env()
+    check.is_true(warm_env() is env)
+    check.equal(counter.value, 1)
+
+    unpickled_warm_env = pickle.loads(pickle.dumps(WarmEnv("mine", MineHcraftEnv)))
+    check.is_instance(unpickled_warm_env(), MineHcraftEnv)
+
+
+def test_workers_share_compiled_transformations(monkeypatch):
+    context = mp.get_context("fork")
+    counter = context.Value("i", 0)
+    compile_transformations = CompiledTransformations.__init__
+
+    def counting_init(self, world):
+        with counter.get_lock():
+            counter.value += 1
+        compile_transformations(self, world)
+
+    monkeypatch.setattr(CompiledTransformations, "__init__", counting_init)
+    vector_env = SharedMemoryVectorEnv(
+        partial(MineHcraftEnv, max_step=20), num_envs=8, num_workers=4, context="fork"
+    )
+    try:
+        vector_env.reset(seed=0)
+        vector_env.step(vector_env.sample_legal_actions())
+        check.equal(counter.value, 1)
+    finally:
+        vector_env.close()
@@ -2,7 +2,11 @@ import pytest
 import pytest_check as check
 
 from hcraft.elements import Item, Zone
-from hcraft.world import World
+from hcraft.env import HcraftEnv
+from hcraft.task import GetItemTask
+from hcraft.transformation import PLAYER, Transformation, Yield
+from hcraft.world import World, world_from_transformations
+from tests.envs import classic_env
 
 
 class TestWorld:
@@ -29,3 +33,104 @@ class TestWorld:
     def test_slot_from_zoneitem(self):
         zone_3 = self.zones_items[1]
         check.equal(self.world.slot_from_zoneitem(zone_3), 1)
+
+    def test_slot_from_unknown_element(self):
+        with pytest.raises(ValueError):
+            self.world.slot_from_item(Item("unknown"))
+
+
+def test_candidate_transformations():
+    """candidates should only contain the zone bucket and unrestricted transformations."""
+    start = Zone("start")
+    other = Zone("other")
+    wood = Item("wood")
+    transformations = [
+        Transformation("go_other", destination=other, zone=start),
+        Transformation("go_start", destination=start),
+        Transformation("search_wood", inventory_changes=[Yield(PLAYER, wood)]),
+        Transformation(
+            "chop_in_other", inventory_changes=[Yield(PLAYER, wood)], zone=other
+        ),
+    ]
+    world = world_from_transformations(transformations, start_zone=start)
+
+    start_candidates = world.candidate_transformations(world.slot_from_zone(start))
+    check.equal(start_candidates.tolist(), [0, 2])
+    other_candidates = world.candidate_transformations(world.slot_from_zone(other))
+    check.equal(other_candidates.tolist(), [1, 2, 3])
+    check.equal(world.candidate_transformations().tolist(), [0, 1, 2, 3])
+
+
+class TestWorldEdition:
+    @pytest.fixture(autouse=True)
+    def setup_method(self):
+        self.env, self.world, self.named_transformations, *_ = classic_env()
+        self.env.reset()
+
+    def test_add_items(self):
+        """new items should be appended and pad transformations and live states."""
+        new_item = Item("new_item")
+        added = self.world.add_items([new_item, Item("wood")])
+        check.equal(added, [new_item])
+        check.equal(self.world.items[-1], new_item)
+        check.equal(self.env.state.player_inventory.shape, (self.world.n_items,))
+        craft_plank = self.named_transformations["craft_plank"]
+        craft_plank_ops = craft_plank._inventory_operations[PLAYER]
+        for operation_arr in craft_plank_ops.values():
+            check.equal(operation_arr.shape, (self.world.n_items,))
+        self.env.step(self.world.transformations.index(craft_plank))
+
+    def test_add_transformations(self):
+        """new transformations should be built and usable in live environments."""
+        other_zone = Zone("other_zone")
+        gem, gem_in_zone = Item("gem"), Item("gem_in_zone")
+        new_zone = Zone("new_zone")
+        search_gem = Transformation(
+            "search_gem",
+            inventory_changes=[Yield(PLAYER, gem), Yield(new_zone, gem_in_zone)],
+            zone=other_zone,
+        )
+        go_new_zone = Transformation("go_new_zone", destination=new_zone)
+        n_zones = self.world.n_zones
+        requirements = self.world.requirements
+
+        self.world.add_transformations([search_gem, go_new_zone])
+
+        check.is_in(gem, self.world.items)
+        check.is_in(gem_in_zone, self.world.zones_items)
+        check.equal(self.world.zones[n_zones:], [new_zone])
+        check.is_not(self.world.requirements, requirements)
+        state = self.env.state
+        check.equal(state.position.shape, (self.world.n_zones,))
+        check.equal(
+            state.zones_inventories.shape,
+            (self.world.n_zones, self.world.n_zones_items),
+        )
+        check.equal(
+            state.discovered_transformations.shape, (len(self.world.transformations),)
+        )
+
+        move_action = self.world.transformations.index(
+            self.named_transformations["move_to_other_zone"]
+        )
+        search_gem_action = self.world.transformations.index(search_gem)
+        check.is_false(self.env.action_masks()[search_gem_action])
+        self.env.step(move_action)
+        check.is_in(search_gem_action, self.env.candidate_actions())
+        self.env.step(search_gem_action)
+        check.equal(state.amount_of(gem), 1)
+        check.equal(state.amount_of(gem_in_zone, new_zone), 1)
+
+    def test_add_transformations_rebuilds_tasks(self):
+        """tasks on new items should be usable after edition."""
+        gem = Item("gem")
+        env = HcraftEnv(self.world, purpose=GetItemTask(Item("wood")))
+        env.reset()
+        self.world.add_transformations(
+            [Transformation("search_gem", inventory_changes=[Yield(PLAYER, gem)])]
+        )
+        _obs, reward, terminated, _truncated, _infos = env.step(
+            len(self.world.transformations) - 1
+        )
+        check.equal(reward, 0)
+        check.is_false(terminated)
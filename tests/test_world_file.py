@@ -0,0 +1,153 @@
+import json
+import pickle
+from functools import partial
+
+import numpy as np
+import pytest
+import pytest_check as check
+from pytest_mock import MockerFixture
+
+from hcraft.env import HcraftEnv
+from hcraft.examples import MineHcraftEnv, RecursiveHcraftEnv, TowerHcraftEnv
+from hcraft.examples.minecraft.transformations import (
+    build_minehcraft_transformations,
+)
+from hcraft.examples.minicraft import MINICRAFT_ENVS
+from hcraft.examples.treasure import TreasureEnv
+from hcraft.transformation import Transformation
+from hcraft.world_file import load_world, read_world_descriptor, save_world
+
+ENV_FACTORIES = [
+    MineHcraftEnv,
+    partial(TowerHcraftEnv, height=3, width=2),
+    partial(RecursiveHcraftEnv, n_items=4),
+    TreasureEnv,
+] + list(MINICRAFT_ENVS)
+
+
+@pytest.mark.parametrize(
+    "env_factory",
+    ENV_FACTORIES,
+    ids=lambda factory: getattr(factory, "func", factory).__name__,
+)
+@pytest.mark.parametrize("mmap", [False, True], ids=["read", "mmap"])
+def test_loaded_world_behaves_the_same(env_factory, mmap: bool, tmp_path):
+    world = env_factory().world
+    save_world(world, tmp_path / "world.json")
+    loaded_world = load_world(tmp_path / "world.json", mmap=mmap)
+
+    check.equal(loaded_world.items, world.items)
+    check.equal(loaded_world.zones, world.zones)
+    check.equal(loaded_world.zones_items, world.zones_items)
+    check.equal(loaded_world.start_zone, world.start_zone)
+    check.equal(loaded_world.start_items, world.start_items)
+    check.equal(loaded_world.start_zones_items, world.start_zones_items)
+    check.equal(
+        [transfo.name for transfo in loaded_world.transformations],
+        [transfo.name for transfo in world.transformations],
+    )
+
+    env, loaded_env = HcraftEnv(world), HcraftEnv(loaded_world)
+    env.reset()
+    loaded_env.reset()
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        check.equal(loaded_env.action_masks().tolist(), env.action_masks().tolist())
+        action = rng.integers(env.action_space.n)
+        observation, reward, *_ = env.step(action)
+        loaded_observation, loaded_reward, *_ = loaded_env.step(action)
+        check.equal(loaded_observation.tolist(), observation.tolist())
+        check.equal(loaded_reward, reward)
+
+
+def test_load_does_not_build_transformations(tmp_path, mocker: MockerFixture):
+    save_world(MineHcraftEnv().world, tmp_path / "mine.json")
+    build = mocker.spy(Transformation, "build")
+    load_world(tmp_path / "mine.json")
+    check.equal(build.call_count, 0)
+
+
+def test_loaded_world_can_be_extended(tmp_path):
+    world = TreasureEnv().world
+    save_world(world, tmp_path / "treasure.json")
+    loaded_world = load_world(tmp_path / "treasure.json")
+    env = HcraftEnv(loaded_world)
+    env.reset()
+    new_transformations = [
+        transfo
+        for transfo in build_minehcraft_transformations()
+        if transfo.zone is None and transfo.destination is None
+    ][:3]
+    loaded_world.add_transformations(new_transformations)
+    env.reset()
+    check.equal(env.action_masks().shape, (len(loaded_world.transformations),))
+
+
+def test_metadata_and_version(tmp_path):
+    path, arrays_path = save_world(
+        TreasureEnv().world, tmp_path / "treasure.json", metadata={"seed": 42}
+    )
+    check.equal(arrays_path, tmp_path / "treasure.npz")
+    descriptor = read_world_descriptor(path)
+    check.equal(descriptor["metadata"], {"seed": 42})
+
+    descriptor["version"] += 1
+    path.write_text(json.dumps(descriptor))
+    with pytest.raises(ValueError, match="Unsupported world file version"):
+        load_world(path)
+
+
+def test_not_a_world_file(tmp_path):
+    path = tmp_path / "other.json"
+    path.write_text(json.dumps({"format": "other"}))
+    with pytest.raises(ValueError, match="not an hcraft world file"):
+        load_world(path)
+
+
+def test_mmap_world_operations_are_shared_read_only_maps(tmp_path):
+    save_world(MineHcraftEnv().world, tmp_path / "mine.json")
+    world = load_world(tmp_path / "mine.json", mmap=True)
+    operations = [
+        operation_arr
+        for transfo in world.transformations
+        for owner_operations in transfo._inventory_operations.values()
+        for operation_arr in owner_operations.values()
+        if operation_arr is not None
+    ]
+    check.greater(len(operations), 0)
+    for operation_arr in operations:
+        check.is_instance(operation_arr.base, np.memmap)
+        check.is_false(operation_arr.flags.writeable)
+
+
+def test_mmap_world_is_pickled_as_its_path(tmp_path):
+    world = TowerHcraftEnv(height=4, width=4).world
+    save_world(world, tmp_path / "tower.json")
+    mapped_world = load_world(tmp_path / "tower.json", mmap=True)
+    data = pickle.dumps(mapped_world)
+    check.less(len(data), len(pickle.dumps(world)) / 10)
+
+    unpickled_world = pickle.loads(data)
+    check.equal(unpickled_world.items, world.items)
+    check.equal(len(unpickled_world.transformations), len(world.transformations))
+    env = HcraftEnv(unpickled_world)
+    env.reset()
+    check.equal(env.action_masks().tolist(), HcraftEnv(world).action_masks().tolist())
+
+
+def test_extended_mmap_world_is_pickled_as_tables(tmp_path):
+    save_world(TreasureEnv().world, tmp_path / "treasure.json")
+    world = load_world(tmp_path / "treasure.json", mmap=True)
+    world.add_transformations([Transformation("nothing")])
+    (tmp_path / "treasure.npz").unlink()
+    unpickled_world = pickle.loads(pickle.dumps(world))
+    check.equal(
+        [transfo.name for transfo in unpickled_world.transformations],
+        [transfo.name for transfo in world.transformations],
+    )
+
+
+def test_compressed_world_cannot_be_mapped(tmp_path):
+    save_world(TreasureEnv().world, tmp_path / "treasure.json", compress=True)
+    with pytest.raises(ValueError, match="cannot be memory-mapped"):
+        load_world(tmp_path / "treasure.json", mmap=True)